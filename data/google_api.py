@@ -1,12 +1,14 @@
 import os
 import re
+import json
+import hashlib
 import pandas as pd
 import requests
 from urllib.parse import urlparse, parse_qs, unquote
 from itertools import product
 import time
 import googlemaps
-from datetime import datetime
+from datetime import datetime, timedelta
 import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
@@ -14,6 +16,10 @@ import matplotlib.pyplot as plt
 
 _AT_RE = re.compile(r"@(-?\d+\.\d+),(-?\d+\.\d+)")  # matches @lat,lng
 DEFAULT_CITY = "Vienna, Austria"
+EARTH_RADIUS_M = 6_371_000
+# departure times at which transit is sampled, GoogleMaps looks travel times up by departure bucket
+DEPARTURE_BUCKETS = ["10:00", "12:00", "14:00", "16:00", "18:00", "20:00", "22:00"]
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline")
 
 
 markets = pd.DataFrame([
@@ -59,9 +65,271 @@ def _addresses_from_names(df: pd.DataFrame, default_city: str = DEFAULT_CITY) ->
     return [f"{name}, {default_city}" for name in df["Name"].tolist()]
 
 
+def _coordinates_from_url(url: str) -> tuple[float, float] | None:
+    """Extract (lat, lng) from a map URL, following short-link redirects if needed."""
+    match = _AT_RE.search(url)
+    if match is None:
+        try:
+            final_url = requests.head(url, allow_redirects=True, timeout=10).url
+        except requests.RequestException:
+            return None
+        match = _AT_RE.search(unquote(final_url))
+    if match is None:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+def resolve_coordinates(df: pd.DataFrame, default_city: str = DEFAULT_CITY) -> pd.DataFrame:
+    """
+    Resolve the coordinates of every market once.
+
+    Uses the @lat,lng part of the map URL (column 'Map') and falls back to geocoding
+    "Name, City" when the URL does not contain coordinates.
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of df with the columns 'lat' and 'lng'.
+    """
+    df_result = df.copy()
+    addresses = _addresses_from_names(df, default_city)
+    lats, lngs = [], []
+
+    for i, (_, row) in enumerate(df.iterrows()):
+        coords = _coordinates_from_url(row["Map"]) if "Map" in df.columns else None
+        if coords is None:
+            results = gmaps.geocode(addresses[i], region="at")  # type: ignore
+            location = results[0]["geometry"]["location"]
+            coords = (location["lat"], location["lng"])
+        lats.append(coords[0])
+        lngs.append(coords[1])
+
+    df_result["lat"] = lats
+    df_result["lng"] = lngs
+    return df_result
+
+
+def great_circle_matrix(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """
+    Pairwise great-circle (haversine) distances in meters, vectorized over all pairs.
+
+    This is a lower bound on the walking distance (and, divided by the walking speed,
+    on the walking time) between two markets.
+    """
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lng = np.radians(np.asarray(lng, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def prefilter_pairs(
+    lower_bound: np.ndarray,
+    known: np.ndarray,
+    margin_percent: int,
+    keep_shortest: int = 2,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the pairs that provably cannot survive find_inbetween_way_points.
+
+    The walking distance of a pair is at least its great-circle distance. A pair (o, d) is
+    removed by find_inbetween_way_points if some waypoint k satisfies
+    dist(o, k) + dist(k, d) <= dist(o, d) * (1 + margin_percent / 100) and the pair is not one of
+    the keep_shortest shortest connections of o. Both can be decided from the legs that are
+    already known and the lower bound of (o, d), so the request for (o, d) can be skipped.
+
+    Parameters
+    ----------
+    lower_bound : np.ndarray
+        n x n great-circle distances (see great_circle_matrix).
+    known : np.ndarray
+        n x n walking distances requested so far, np.inf where unknown.
+    margin_percent : int
+        The margin later used by find_inbetween_way_points.
+    keep_shortest : int, optional
+        Number of shortest connections per origin that are always kept, by default 2.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Boolean n x n matrix of the prunable pairs and the n x n matrix of the shortest known
+        via-distance (one waypoint) of every pair.
+    """
+    n = len(lower_bound)
+    known = known.astype(float)
+    np.fill_diagonal(known, np.inf)
+
+    # shortest route over one known waypoint (min-plus product), one origin at a time
+    via = np.empty((n, n))
+    for o in range(n):
+        via[o] = (known[o, :, None] + known).min(axis=0)
+
+    # a pair longer than the keep_shortest-th known connection of its origin cannot be kept as a shortest one
+    kth_known = np.partition(known, keep_shortest - 1, axis=1)[:, keep_shortest - 1]
+    prunable = (via <= lower_bound * (1 + margin_percent / 100.0)) & (lower_bound > kth_known[:, None])
+    np.fill_diagonal(prunable, False)
+    return prunable, via
+
+
+def compute_prefiltered_walking_matrix(
+    df: pd.DataFrame,
+    margin_percent: int,
+    initial_neighbours: int = 3,
+    keep_shortest: int = 2,
+    min_detour: float = 1.0,
+    calibrate_detour: bool = False,
+    coordinates: pd.DataFrame | None = None,
+    cached: pd.DataFrame | None = None,
+) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Compute the walking distance matrix, requesting only pairs that can survive the pruning.
+
+    The coordinates of every market are resolved once. The initial_neighbours nearest pairs
+    (great-circle distance) of every origin are requested first, afterwards one round requests
+    the nearest open pair of every origin, until every pair was either requested or proven
+    prunable by prefilter_pairs.
+
+    The lower bound of a pair is min_detour times its great-circle distance. With the default
+    of 1.0 the skipping is provable: a skipped pair can never survive the pruning.
+    calibrate_detour is a heuristic on top: it raises the factor to the smallest walking /
+    great-circle ratio among the pairs requested so far, which skips far more pairs on street
+    networks, but may skip pairs that would have survived.
+
+    Pairs in cached count as requested, so after adding a market only pairs of that market are
+    requested (and only if they can survive the pruning): more markets only add via-paths, so a
+    pair skipped before stays prunable. This holds for a fixed min_detour, not for calibrate_detour.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame containing the markets (columns 'Name', 'Map', 'Opens', 'Closes').
+    margin_percent : int
+        The margin later used by find_inbetween_way_points.
+    initial_neighbours : int, optional
+        Nearest pairs per origin requested in the first round, by default 3.
+    keep_shortest : int, optional
+        Number of shortest connections per origin that are always kept, by default 2.
+    min_detour : float, optional
+        Factor applied to the great-circle distance, by default 1.0 (provable).
+    calibrate_detour : bool, optional
+        Heuristic: calibrate the factor to the measured walking detours (not provable), by default False.
+    coordinates : pd.DataFrame | None, optional
+        The markets with resolved 'lat' and 'lng' (see resolve_coordinates), resolved if None.
+    cached : pd.DataFrame | None, optional
+        Walking rows of an earlier run, by default None.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, np.ndarray, np.ndarray]
+        The walking distances of the requested (and cached) pairs, the boolean n x n matrix of the skipped
+        pairs and the shortest known via-distances (see add_estimated_pairs).
+    """
+    n = len(df)
+    geo = resolve_coordinates(df) if coordinates is None else coordinates
+    great_circle = great_circle_matrix(geo["lat"].to_numpy(), geo["lng"].to_numpy())
+    lower_bound = great_circle * min_detour
+    index = {name: i for i, name in enumerate(df["Name"])}
+
+    known = np.full((n, n), np.inf)
+    via = np.full((n, n), np.inf)
+    requested = np.eye(n, dtype=bool)
+    skipped = np.zeros((n, n), dtype=bool)
+    rows = np.arange(n)
+
+    frames = []
+    if cached is not None and not cached.empty:
+        cached = cached[cached["origin"].isin(index) & cached["destination"].isin(index)]
+        frames.append(cached)
+        origin_ids = cached["origin"].map(index).to_numpy()
+        destination_ids = cached["destination"].map(index).to_numpy()
+        requested[origin_ids, destination_ids] = True
+        known[origin_ids, destination_ids] = cached["distance_meters"].to_numpy()
+    previously_requested = int(requested.sum())
+
+    nearest_first = np.argsort(np.where(np.eye(n, dtype=bool), np.inf, lower_bound), axis=1)
+    batch = np.zeros((n, n), dtype=bool)
+    batch[rows[:, None], nearest_first[:, :initial_neighbours]] = True
+    batch &= ~requested
+
+    while True:
+        if batch.any():
+            walking = compute_walking_distance_matrix(df, pairs=batch)
+            frames.append(walking)
+            requested |= batch
+            if not walking.empty:
+                for origin, destination, distance in zip(walking["origin"], walking["destination"], walking["distance_meters"]):
+                    known[index[origin], index[destination]] = distance
+
+        if calibrate_detour:
+            measured = np.isfinite(known) & (great_circle > 0)
+            if measured.any():
+                lower_bound = great_circle * max(min_detour, (known[measured] / great_circle[measured]).min())
+
+        prunable, via = prefilter_pairs(lower_bound, known, margin_percent, keep_shortest)
+        skipped |= prunable & ~requested
+
+        # next round: the nearest open pair of every origin
+        open_lower = np.where(requested | skipped, np.inf, lower_bound)
+        nearest = open_lower.argmin(axis=1)
+        has_open = np.isfinite(open_lower[rows, nearest])
+        batch = np.zeros((n, n), dtype=bool)
+        batch[rows[has_open], nearest[has_open]] = True
+        if not batch.any():
+            break
+
+    print("Requested", int(requested.sum()) - previously_requested, "new pairs,",
+          int(requested.sum()) - n, "of", n * (n - 1), "known, skipped", int(skipped.sum()))
+    walking_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if not walking_df.empty:
+        walking_df = _sort_pairs(walking_df, df["Name"].tolist())
+    return walking_df, skipped, via
+
+
+def add_estimated_pairs(
+    walking_df: pd.DataFrame,
+    markets_df: pd.DataFrame,
+    skipped: np.ndarray,
+    via: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Add the skipped pairs with their shortest known via-distance (column 'estimated' = True).
+
+    They only serve as legs for find_inbetween_way_points, so requested pairs can still be
+    pruned via a skipped leg. The via-distance is the length of an actual walking route and
+    therefore an upper bound, so pruning stays conservative. The estimated rows are removed
+    again after pruning.
+    """
+    names = markets_df["Name"].tolist()
+    rows = []
+    for i, j in zip(*np.nonzero(skipped)):
+        rows.append({
+            "origin": names[i],
+            "destination": names[j],
+            "mode": "walking",
+            "distance_meters": int(via[i, j]),
+            "duration_seconds": None,
+            "opens": markets_df.iloc[j]["Opens"],
+            "closes": markets_df.iloc[j]["Closes"],
+            "estimated": True,
+        })
+    df_result = walking_df.copy()
+    df_result["estimated"] = False
+    df_result = pd.concat([df_result, pd.DataFrame(rows)], ignore_index=True)
+    return _sort_pairs(df_result, names)
+
+
+def _sort_pairs(df: pd.DataFrame, names: list[str]) -> pd.DataFrame:
+    # find_inbetween_way_points depends on the row order, keep the order of the full matrix
+    position = {name: i for i, name in enumerate(names)}
+    order = np.lexsort((df["destination"].map(position), df["origin"].map(position)))
+    return df.iloc[order].reset_index(drop=True)
+
+
 def compute_walking_distance_matrix(
     df: pd.DataFrame,
-    units: str = "metric"
+    units: str = "metric",
+    pairs: np.ndarray | None = None
 ) -> pd.DataFrame:
     """
     Compute pairwise walking distance matrix for the given dataframe.
@@ -72,6 +340,8 @@ def compute_walking_distance_matrix(
         DataFrame containing the names of the markets (column 'Name').
     units : str, optional
         Units for distance, by default "metric".
+    pairs : np.ndarray | None, optional
+        Boolean n x n matrix of the pairs to request (see prefilter_pairs), by default all pairs.
 
     Returns
     -------
@@ -84,10 +354,12 @@ def compute_walking_distance_matrix(
     rows_out: list[dict] = []
 
     for i, origin in enumerate(origins):
+        if pairs is not None and not pairs[i].any():
+            continue
         print("Now at:", origin, i + 1, "/", len(origins))
         for j, destination in enumerate(origins):
-            # skip self-pairs
-            if i == j:
+            # skip self-pairs and pairs ruled out by the prefilter
+            if i == j or (pairs is not None and not pairs[i, j]):
                 continue
 
             # Walking request only
@@ -119,35 +391,50 @@ def compute_walking_distance_matrix(
     return pd.DataFrame(rows_out)
 
 
-def apply_public_transport(
+def fetch_transit(
     df_edges: pd.DataFrame,
     markets_df: pd.DataFrame,
     use_departure_now_for_driving: bool = True,
     units: str = "metric",
-    faster_factor: float = 0.5,
+    cached: pd.DataFrame | None = None,
+    departure: str | None = None,
 ) -> pd.DataFrame:
     """\
-    For each existing edge in df_edges (assumed to be walking-only),
-    check whether public transport is sufficiently faster.
+    Request the public transport connection of every edge in df_edges.
 
-    If so, overwrite mode, distance_meters and duration_seconds with the
-    transit values.
+    Edges found in cached (for the same departure) are not requested again.
+    Failed requests are not stored, so they are retried by the next run.
 
     Parameters
     ----------
     df_edges : pd.DataFrame
-        Edge list with at least origin, destination, duration_seconds, distance_meters, mode.
+        Edge list with at least origin, destination, duration_seconds.
     markets_df : pd.DataFrame
         DataFrame with column 'Name' used to build geocodable addresses.
     use_departure_now_for_driving : bool
         Whether to use the current time as departure_time for transit requests.
     units : str
         Units for the Google Maps Distance Matrix API.
-    faster_factor : float
-        Public transport is considered better if
-        transit_seconds <= faster_factor * walking_seconds.
+    cached : pd.DataFrame | None
+        Transit connections of an earlier run, by default None.
+    departure : str | None
+        Departure time "HH:MM" (tomorrow, so it is in the future) instead of
+        the current time, by default None.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per edge with a transit connection (origin, destination,
+        departure ("now" or "HH:MM"), transit_distance_meters, transit_seconds).
     """
-    df_result = df_edges.copy()
+    columns = ["origin", "destination", "departure", "transit_distance_meters", "transit_seconds"]
+    label = departure or "now"
+    if cached is None:
+        cached = pd.DataFrame(columns=columns)
+    if "departure" not in cached:
+        cached = cached.assign(departure="now")
+    cached = cached[cached["departure"] == label]
+    done = set(zip(cached["origin"], cached["destination"]))
 
     # Map market names to addresses
     addresses = _addresses_from_names(markets_df)
@@ -156,12 +443,19 @@ def apply_public_transport(
     }
 
     base_kwargs = {"units": units, "region": "at"}
-    if use_departure_now_for_driving:
+    if departure is not None:
+        hours, minutes = map(int, departure.split(":"))
+        tomorrow = datetime.now().replace(hour=hours, minute=minutes, second=0, microsecond=0) + timedelta(days=1)
+        base_kwargs["departure_time"] = tomorrow  # type: ignore
+    elif use_departure_now_for_driving:
         base_kwargs["departure_time"] = datetime.now()  # type: ignore
 
-    for idx, row in df_result.iterrows():
+    rows_out: list[dict] = []
+    for _, row in df_edges.iterrows():
         origin_name = row["origin"]
         dest_name = row["destination"]
+        if (origin_name, dest_name) in done:
+            continue
 
         origin_addr = name_to_addr.get(origin_name)
         dest_addr = name_to_addr.get(dest_name)
@@ -169,8 +463,7 @@ def apply_public_transport(
         if origin_addr is None or dest_addr is None:
             continue
 
-        walk_seconds = row.get("duration_seconds")
-        if walk_seconds is None:
+        if pd.isna(row.get("duration_seconds")):
             continue
 
         try:
@@ -188,22 +481,86 @@ def apply_public_transport(
         if transit_el.get("status") != "OK":
             continue
 
-        transit_distance = transit_el.get("distance", {})
-        transit_duration = transit_el.get("duration", {})
-        transit_seconds = transit_duration.get("value")
-
+        transit_seconds = transit_el.get("duration", {}).get("value")
         if transit_seconds is None:
             continue
 
+        rows_out.append({
+            "origin": origin_name,
+            "destination": dest_name,
+            "departure": label,
+            "transit_distance_meters": transit_el.get("distance", {}).get("value"),
+            "transit_seconds": transit_seconds,
+        })
+
+    print("Requested", len(rows_out), "new transit connections departing", label)
+    frames = [frame for frame in (cached, pd.DataFrame(rows_out, columns=columns)) if not frame.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def apply_transit(df_edges: pd.DataFrame, transit_df: pd.DataFrame, faster_factor: float = 0.5) -> pd.DataFrame:
+    """\
+    Overwrite mode, distance_meters and duration_seconds of every edge whose
+    transit connection (see fetch_transit) satisfies
+    transit_seconds <= faster_factor * walking_seconds.
+    """
+    df_result = df_edges.copy()
+    transit = {
+        (origin, destination): (distance, seconds)
+        for origin, destination, distance, seconds in zip(
+            transit_df["origin"], transit_df["destination"],
+            transit_df["transit_distance_meters"], transit_df["transit_seconds"],
+        )
+    }
+
+    for idx, row in df_result.iterrows():
+        connection = transit.get((row["origin"], row["destination"]))
+        walk_seconds = row.get("duration_seconds")
+        if connection is None or pd.isna(walk_seconds):
+            continue
+
         # If transit is sufficiently faster, update this edge
+        transit_distance, transit_seconds = connection
         if transit_seconds <= faster_factor * walk_seconds:
             df_result.at[idx, "mode"] = "transit"
-            df_result.at[idx, "distance_meters"] = transit_distance.get("value")
+            df_result.at[idx, "distance_meters"] = transit_distance
             df_result.at[idx, "duration_seconds"] = transit_seconds
 
     return df_result
 
 
+def apply_public_transport(
+    df_edges: pd.DataFrame,
+    markets_df: pd.DataFrame,
+    use_departure_now_for_driving: bool = True,
+    units: str = "metric",
+    faster_factor: float = 0.5,
+) -> pd.DataFrame:
+    """\
+    For each existing edge in df_edges (assumed to be walking-only),
+    check whether public transport is sufficiently faster.
+
+    If so, overwrite mode, distance_meters and duration_seconds with the
+    transit values.
+
+    Parameters
+    ----------
+    df_edges : pd.DataFrame
+        Edge list with at least origin, destination, duration_seconds, distance_meters, mode.
+    markets_df : pd.DataFrame
+        DataFrame with column 'Name' used to build geocodable addresses.
+    use_departure_now_for_driving : bool
+        Whether to use the current time as departure_time for transit requests.
+    units : str
+        Units for the Google Maps Distance Matrix API.
+    faster_factor : float
+        Public transport is considered better if
+        transit_seconds <= faster_factor * walking_seconds.
+    """
+    transit_df = fetch_transit(df_edges, markets_df, use_departure_now_for_driving, units)
+    return apply_transit(df_edges, transit_df, faster_factor)
+
+
 def find_inbetween_way_points(df: pd.DataFrame, margin_percent: int) -> pd.DataFrame:
     """
     Remove direct connections (origin → destination) for which there exists a
@@ -306,28 +663,180 @@ def make_graph(df):
 
     
 
-if __name__ == "__main__":
-    # 1) Build the matrix using names + city for reliable geocoding (walking only)
-    walking_df = compute_walking_distance_matrix(markets)
+def _fingerprint(*inputs) -> str:
+    """sha1 of the JSON encoding of the inputs of a stage."""
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _file_fingerprint(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _read_artifact(path: str) -> pd.DataFrame | None:
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+
+def run_pipeline(
+    markets_df: pd.DataFrame,
+    output_path: str,
+    artifact_dir: str = PIPELINE_DIR,
+    margin_percent: int = 10,
+    faster_factor: float = 0.5,
+    min_detour: float = 1.0,
+    calibrate_detour: bool = False,
+    departure_buckets: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Build the travel time CSV in stages, reusing the artifacts of earlier runs.
+
+    Every stage writes its result to artifact_dir and records the fingerprint of its inputs in
+    manifest.json. A stage whose fingerprint did not change is loaded instead of recomputed,
+    the network stages additionally only request what their artifact does not contain yet:
+
+    1. coordinates (network): the coordinates per (Name, Map), only new markets are resolved.
+    2. walking (network): compute_prefiltered_walking_matrix with the pairs of the last run as
+       cache plus add_estimated_pairs. Adding a market only requests its row and column,
+       a smaller margin_percent may additionally request pairs that were skipped before.
+    3. pruning: find_inbetween_way_points, rerun when the walking pairs or margin_percent change.
+    4. transit (network): fetch_transit for the pruned edges that were not requested before,
+       once per departure bucket.
+    5. output: apply_transit, opening hours from markets_df, minutes and the CSV. Changing
+       opening hours or faster_factor only reruns this stage.
+
+    With departure_buckets, the output has one 'duration_min_HHMM' column per bucket (the travel
+    time when departing in that bucket, see GoogleMaps.set_duration_buckets); mode, distance and
+    duration_walking_min are those of the first bucket.
+
+    Parameters
+    ----------
+    markets_df : pd.DataFrame
+        The markets (columns 'Name', 'Map', 'Opens', 'Closes').
+    output_path : str
+        The travel time CSV.
+    artifact_dir : str, optional
+        The directory of the stage artifacts, by default data/pipeline.
+    margin_percent : int, optional
+        The margin of find_inbetween_way_points, by default 10.
+    faster_factor : float, optional
+        See apply_transit, by default 0.5.
+    min_detour : float, optional
+        See compute_prefiltered_walking_matrix, by default 1.0 (only provably prunable pairs are skipped).
+    calibrate_detour : bool, optional
+        See compute_prefiltered_walking_matrix, by default False. The heuristic is part of the
+        walking fingerprint, so switching it off requests the pairs it skipped.
+    departure_buckets : list[str] | None, optional
+        Ascending departure times ("HH:MM") to sample transit at, by default None (now, no buckets).
+
+    Returns
+    -------
+    pd.DataFrame
+        The final edge list (also written to output_path).
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    manifest_path = os.path.join(artifact_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    paths = {stage: os.path.join(artifact_dir, f"{stage}.csv") for stage in ("coordinates", "walking", "pruned", "transit")}
+
+    def is_fresh(stage: str, fingerprint: str) -> bool:
+        fresh = manifest.get(stage) == fingerprint and os.path.exists(paths[stage])
+        print("Stage", stage, "is up to date" if fresh else "runs")
+        return fresh
+
+    def finish(stage: str, fingerprint: str, df: pd.DataFrame):
+        df.to_csv(paths[stage], index=False)
+        manifest[stage] = fingerprint
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    markets_df = markets_df.reset_index(drop=True)
+    names = markets_df["Name"].tolist()
+    places = markets_df[["Name", "Map"]].values.tolist()
+
+    # 1) coordinates
+    key = _fingerprint(places)
+    if is_fresh("coordinates", key):
+        coordinates = pd.read_csv(paths["coordinates"])
+    else:
+        cached = _read_artifact(paths["coordinates"])
+        if cached is None:
+            cached = pd.DataFrame(columns=["Name", "Map", "lat", "lng"])
+        merged = markets_df.merge(cached[["Name", "Map", "lat", "lng"]], on=["Name", "Map"], how="left")
+        missing = merged["lat"].isna().to_numpy()
+        if missing.any():
+            resolved = resolve_coordinates(markets_df[missing])
+            merged.loc[missing, ["lat", "lng"]] = resolved[["lat", "lng"]].to_numpy()
+        coordinates = merged[["Name", "Map", "lat", "lng"]]
+        finish("coordinates", key, coordinates)
+
+    # 2) walking distances of all pairs that can survive the pruning, plus the estimated pairs
+    key = _fingerprint(names, _file_fingerprint(paths["coordinates"]), margin_percent, min_detour, calibrate_detour)
+    if is_fresh("walking", key):
+        walking_df = pd.read_csv(paths["walking"])
+    else:
+        cached = _read_artifact(paths["walking"])
+        if cached is not None:
+            cached = cached[~cached["estimated"]].drop(columns=["estimated"])
+        walking_df, skipped, via = compute_prefiltered_walking_matrix(
+            markets_df, margin_percent=margin_percent,
+            min_detour=min_detour, calibrate_detour=calibrate_detour,
+            coordinates=coordinates, cached=cached,
+        )
+        walking_df = add_estimated_pairs(walking_df, markets_df, skipped, via)
+        finish("walking", key, walking_df)
     print("Walking matrix shape:", walking_df.shape)
 
-    # 2) Simplify graph by removing edges that can be replaced
-    #    by a path via another market that is at most 20% longer
-    simplified_df = find_inbetween_way_points(walking_df, margin_percent=10)
+    # 3) remove edges that can be replaced by a path via another market
+    key = _fingerprint(_file_fingerprint(paths["walking"]), margin_percent)
+    if is_fresh("pruned", key):
+        simplified_df = pd.read_csv(paths["pruned"])
+    else:
+        simplified_df = find_inbetween_way_points(walking_df, margin_percent=margin_percent)
+        simplified_df = simplified_df[~simplified_df["estimated"]].drop(columns=["estimated"])
+        finish("pruned", key, simplified_df)
     print("Simplified matrix shape:", simplified_df.shape)
 
-    # 3) Enrich remaining edges with public transport where it is
-    #    significantly faster than walking
-    final_df = apply_public_transport(simplified_df, markets)
-
-    # Optional: add a duration in whole minutes for convenience
+    # 4) public transport connections of the remaining edges
+    departures = departure_buckets or [None]
+    key = _fingerprint(_file_fingerprint(paths["pruned"]), departures)
+    if is_fresh("transit", key):
+        transit_df = pd.read_csv(paths["transit"])
+    else:
+        cached = _read_artifact(paths["transit"])
+        transit_df = pd.concat(
+            [fetch_transit(simplified_df, markets_df, cached=cached, departure=d) for d in departures],
+            ignore_index=True,
+        )
+        finish("transit", key, transit_df)
+
+    # 5) output, no network: use transit where it is significantly faster than walking
+    def by_departure(departure):
+        return transit_df[transit_df["departure"] == (departure or "now")]
+
+    final_df = apply_transit(simplified_df, by_departure(departures[0]), faster_factor=faster_factor)
+    for departure in departure_buckets or []:
+        bucket_df = apply_transit(simplified_df, by_departure(departure), faster_factor=faster_factor)
+        final_df[f"duration_min_{departure.replace(':', '')}"] = np.ceil(bucket_df["duration_seconds"] / 60).astype(int)
+    hours = markets_df.set_index("Name")
+    final_df["opens"] = final_df["destination"].map(hours["Opens"])
+    final_df["closes"] = final_df["destination"].map(hours["Closes"])
     final_df["duration_walking_min"] = np.ceil(final_df["duration_seconds"] / 60).astype(int)
     final_df.drop(columns=["duration_seconds"], inplace=True)
-    
-    #save to csv
-    BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # project root
-    DATA_DIR = os.path.join(BASE_DIR, "data")
+    final_df.to_csv(output_path, index=False)
+    return final_df
+
 
+if __name__ == "__main__":
+    MARGIN_PERCENT = 10
+
+    # Stages whose inputs did not change are loaded from data/pipeline instead of recomputed
+    # (delete the directory to start from scratch)
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # project root
+    DATA_DIR = os.path.join(BASE_DIR, "data")
     output_path = os.path.join(DATA_DIR, "datapairwise_travel_times_simplified.csv")
+
+    final_df = run_pipeline(markets, output_path, margin_percent=MARGIN_PERCENT, departure_buckets=DEPARTURE_BUCKETS)
     make_graph(final_df)
-    final_df.to_csv(output_path, index=False)
\ No newline at end of file
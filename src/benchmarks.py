@@ -0,0 +1,552 @@
+import random
+import numpy as np
+import threading
+import tempfile
+import time
+from src.classes.google_maps import GoogleMaps
+from src.classes.ant_optimizer import Ant_Optimizer
+from src.classes.pheromone_library import Pheromone_Library
+from src.classes.batch_planner import Batch_Route_Planner
+from src.classes.island_model import Island_Model
+from src.service import Route_Planning_Service, make_server, query_route, latency_report
+
+
+def benchmark_route_service(
+        requests_per_market: int = 3,
+        budget_ms: int = 200,
+        stay_time: int = 30,
+        seed: int = 42) -> dict[str, float]:
+    """
+    Starts the route planning service locally and measures the client-side latency of route queries.
+
+    Every market is queried requests_per_market times, so later queries run on warm pheromones.
+
+    Parameters:
+    requests_per_market (int, optional): Queries per start market. Defaults to 3.
+    budget_ms (int, optional): Optimisation budget per query. Defaults to 200.
+    stay_time (int, optional): The time spent at each market. Defaults to 30.
+    seed (int, optional): The random seed to use. Defaults to 42.
+
+    Returns:
+    dict: The latency report (count, mean, p50, p99, max in ms).
+    """
+    random.seed(seed)
+    service = Route_Planning_Service(default_budget_ms=budget_ms)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    latencies = []
+    fitness = []
+    try:
+        for _ in range(requests_per_market):
+            for market in service.opening_times:
+                sent = time.perf_counter()
+                result = query_route(base_url, market, stay=stay_time)
+                latencies.append((time.perf_counter() - sent) * 1000)
+                fitness.append(result["fitness"])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = latency_report(latencies)
+    print(f"Route service: {report['count']} requests, budget {budget_ms} ms")
+    print(f"  p50 {report['p50']:.1f} ms | p99 {report['p99']:.1f} ms | max {report['max']:.1f} ms")
+    print(f"  mean fitness {sum(fitness) / len(fitness):.1f}")
+    return report
+
+
+def generations_to_target(optimizer: Ant_Optimizer, target_fitness: float, max_generations: int) -> int | None:
+    """
+    Runs an initialized optimizer until the best fitness of a generation reaches the target.
+
+    Returns:
+    int | None: The generation (1-based) in which the target was reached, None if it was not reached.
+    """
+    for gen in range(1, max_generations + 1):
+        optimizer.run_one_generation()
+        if optimizer.last_stats.max_fitness >= target_fitness: #type: ignore
+            return gen
+        optimizer.advance_to_next_generation()
+    return None
+
+
+def benchmark_pheromone_warm_start(
+        target_fitness: float = 1750,
+        training_generations: int = 20,
+        max_generations: int = 20,
+        ants_per_colony: int = 10,
+        mutation: int = 3,
+        seed: int = 42) -> tuple[int | None, int | None]:
+    """
+    Compares generations-to-target of a cold start against a warm start from the pheromone library.
+
+    A training run stores its pheromones (stay time 30) in a temporary library, the warm run uses a
+    neighbouring parameter set (stay time 35) and is initialised via the nearest-neighbour lookup.
+
+    Returns:
+    tuple: (cold generations, warm generations), None where the target was not reached.
+    """
+    maps = GoogleMaps()
+    all_markets, opening_times = maps.get_all_markets()
+
+    def make_optimizer(stay_time, library):
+        optimizer = Ant_Optimizer(
+            maps_service_objekt = maps,
+            num_colonies        = len(all_markets),
+            ants_per_colony     = ants_per_colony,
+            stay_time           = stay_time,
+            mutation            = mutation,
+            verbose             = 0,
+            pheromone_library   = library
+        )
+        optimizer.initialize_colonies(all_markets, opening_times)
+        return optimizer
+
+    with tempfile.TemporaryDirectory() as directory:
+        library = Pheromone_Library(directory)
+
+        random.seed(seed)
+        maps.set_pheromones()
+        training = make_optimizer(30, library)
+        generations_to_target(training, float("inf"), training_generations)
+        training.store_pheromones()
+
+        random.seed(seed + 1)
+        maps.set_pheromones()
+        cold = generations_to_target(make_optimizer(35, None), target_fitness, max_generations)
+
+        random.seed(seed + 1)
+        maps.set_pheromones()
+        warm = generations_to_target(make_optimizer(35, library), target_fitness, max_generations)
+
+    print(f"Generations to fitness {target_fitness}: cold {cold}, warm start {warm}")
+    return cold, warm
+
+
+def benchmark_batch_planning(
+        num_profiles: int = 200,
+        ants_per_colony: int = 10,
+        generations: int = 10,
+        seed: int = 42) -> dict:
+    """
+    Plans routes for random visitor profiles in one batch and reports the throughput.
+
+    Profiles draw a start market, a start time between opening and opening + 2h (in 30 min steps),
+    a stay time of 20, 30 or 45 minutes and a day limit of 1 or 2.
+
+    Returns:
+    dict: The metrics of Batch_Route_Planner.plan.
+    """
+    random.seed(seed)
+    maps = GoogleMaps()
+    all_markets, opening_times = maps.get_all_markets()
+
+    profiles = []
+    for _ in range(num_profiles):
+        idx = random.randrange(len(all_markets))
+        opens = opening_times[idx].hour * 60 + opening_times[idx].minute + 30 * random.randint(0, 4)
+        profiles.append({
+            "start_market": all_markets[idx],
+            "start_time": f"{opens // 60:02d}:{opens % 60:02d}",
+            "stay_time": random.choice([20, 30, 45]),
+            "max_days": random.choice([1, 2]),
+        })
+
+    planner = Batch_Route_Planner(maps, ants_per_colony=ants_per_colony, generations=generations)
+    routes, metrics = planner.plan(profiles)
+
+    print(f"Batch planning: {metrics['profiles']} profiles in {metrics['groups']} groups, "
+          f"{metrics['colonies']} colonies, {metrics['seconds']:.2f}s")
+    print(f"  {metrics['profiles_per_second']:.1f} profiles/s | {metrics['tours_per_second']:.0f} ant tours/s")
+    print(f"  mean visited {sum(r['visited'] for r in routes) / len(routes):.2f}")
+    return metrics
+
+
+def benchmark_anytime(
+        budgets_ms: tuple[int, ...] = (50, 100, 300, 1000),
+        ants_per_colony: int = 20,
+        mutation: int = 3,
+        seed: int = 42) -> dict[int, dict[str, float]]:
+    """
+    Runs the anytime mode of the optimizer (all start markets, one colony each) under several
+    wall-clock budgets and reports the latency and the quality reached.
+
+    Returns:
+    dict: budget → latency report (see latency_report) plus mean best fitness, generations and ant tours.
+    """
+    maps = GoogleMaps()
+    all_markets, opening_times = maps.get_all_markets()
+
+    reports = {}
+    for budget_ms in budgets_ms:
+        random.seed(seed)
+        latencies, fitness, generations, tours = [], [], [], []
+        for _ in range(3):
+            maps.set_pheromones()
+            optimizer = Ant_Optimizer(
+                maps_service_objekt = maps,
+                num_colonies        = len(all_markets),
+                ants_per_colony     = ants_per_colony,
+                mutation            = mutation,
+                verbose             = 0
+            )
+            optimizer.initialize_colonies(all_markets, opening_times)
+            started = time.perf_counter()
+            result = optimizer.run_anytime(budget_ms)
+            latencies.append((time.perf_counter() - started) * 1000)
+            fitness.append(result["fitness"])
+            generations.append(result["generations"])
+            tours.append(result["ant_tours"])
+
+        report = latency_report(latencies)
+        report.update({
+            "fitness": sum(fitness) / len(fitness),
+            "generations": sum(generations) / len(generations),
+            "ant_tours": sum(tours) / len(tours),
+        })
+        reports[budget_ms] = report
+        print(f"Anytime {budget_ms:5d} ms: p50 {report['p50']:7.1f} ms | max {report['max']:7.1f} ms | "
+              f"fitness {report['fitness']:.1f} | {report['generations']:.1f} generations | {report['ant_tours']:.0f} tours")
+    return reports
+
+
+def _open_store_worker(directory: str) -> float:
+    started = time.perf_counter()
+    maps = GoogleMaps(graph_store=directory)
+    maps.feasible_edges(maps.markets[0], 12 * 60, 30)
+    return (time.perf_counter() - started) * 1000
+
+
+def benchmark_graph_store(repeats: int = 5, workers: int = 4) -> dict[str, float]:
+    """
+    Compares the open time of the csv graph with the memory-mapped graph store, in this process
+    and in worker processes that all map the same store.
+
+    Returns:
+    dict: Mean open times in ms (csv, store, store in worker processes).
+    """
+    from multiprocessing import Pool
+
+    with tempfile.TemporaryDirectory() as directory:
+        GoogleMaps().save_graph_store(directory)
+
+        def mean_ms(make):
+            started = time.perf_counter()
+            for _ in range(repeats):
+                make()
+            return (time.perf_counter() - started) * 1000 / repeats
+
+        report = {
+            "csv_ms": mean_ms(GoogleMaps),
+            "store_ms": mean_ms(lambda: GoogleMaps(graph_store=directory)),
+        }
+        with Pool(workers) as pool:
+            times = pool.map(_open_store_worker, [directory] * workers)
+        report["store_worker_ms"] = sum(times) / len(times)
+
+    print(f"Graph open: csv {report['csv_ms']:.1f} ms | store {report['store_ms']:.1f} ms | "
+          f"store in {workers} workers {report['store_worker_ms']:.1f} ms")
+    return report
+
+
+def benchmark_islands(
+        island_counts: tuple[int, ...] = (1, 2, 4),
+        seconds: float = 10,
+        num_colonies: int = 10,
+        ants_per_colony: int = 20,
+        migration_interval: int = 5,
+        channel: str = "queue",
+        checkpoints: tuple[float, ...] = (0.25, 0.5, 1.0),
+        seed: int = 42) -> dict[int, dict]:
+    """
+    Runs the island model with several island counts under the same wall-clock budget.
+
+    Every island runs num_colonies colonies, so more islands walk more tours in the same time if there are
+    enough cores.
+
+    Returns:
+    dict: island count → throughput (ant tours, tours per second, generations per island) and the best
+        fitness reached after each checkpoint share of the budget.
+    """
+    reports = {}
+    for count in island_counts:
+        model = Island_Model(
+            num_islands        = count,
+            num_colonies       = num_colonies,
+            ants_per_colony    = ants_per_colony,
+            migration_interval = migration_interval,
+            channel            = channel,
+            seed               = seed
+        )
+        result = model.run(seconds=seconds)
+        history = result["best_fitness_history"]
+        best_at = {
+            share: max((f for t, f in history if t <= share * seconds), default=float("-inf"))
+            for share in checkpoints
+        }
+        reports[count] = {
+            "ant_tours": result["ant_tours"],
+            "tours_per_second": result["tours_per_second"],
+            "generations": [island["generations"] for island in result["islands"]],
+            "best_fitness": result["best_fitness"],
+            "best_fitness_at": best_at,
+        }
+        print(f"{count} islands: {result['tours_per_second']:8.0f} tours/s | best "
+              + " | ".join(f"{share * seconds:.1f}s {fitness:.2f}" for share, fitness in best_at.items()))
+    return reports
+
+
+def benchmark_candidate_lists(
+        ks: tuple[int | None, ...] = (None, 3, 5, 8),
+        promoted: int = 2,
+        generations: int = 15,
+        repeats: int = 3,
+        ants_per_colony: int = 20,
+        mutation: int = 3,
+        dense: bool = True,
+        seed: int = 42) -> dict[int | None, dict[str, float]]:
+    """
+    Compares the ants with candidate lists of several sizes k against the full neighbor scan (None).
+
+    With dense the shortest-path closure is enabled, so every market has an edge to every reachable
+    market, like on a city-scale graph.
+
+    Returns:
+    dict: k → seconds per generation, mean best fitness and mean average fitness of the last generation.
+    """
+    maps = GoogleMaps()
+    if dense:
+        maps.enable_closure()
+    all_markets, opening_times = maps.get_all_markets()
+    print(f"{len(maps.edge_origin)} edges, {len(maps.edge_origin) / len(all_markets):.1f} per market")
+
+    reports = {}
+    for k in ks:
+        if k is None:
+            maps.disable_candidate_lists()
+        else:
+            maps.enable_candidate_lists(k, promoted)
+        seconds, best, average = [], [], []
+        for repeat in range(repeats):
+            random.seed(seed + repeat)
+            maps.set_pheromones()
+            optimizer = Ant_Optimizer(
+                maps_service_objekt = maps,
+                num_colonies        = len(all_markets),
+                ants_per_colony     = ants_per_colony,
+                mutation            = mutation,
+                verbose             = 0
+            )
+            optimizer.initialize_colonies(all_markets, opening_times)
+            started = time.perf_counter()
+            for generation in range(generations):
+                optimizer.run_one_generation()
+                if generation != generations - 1:
+                    optimizer.advance_to_next_generation()
+            seconds.append((time.perf_counter() - started) / generations)
+            best.append(optimizer.last_stats.best_fitness) # type: ignore
+            average.append(optimizer.last_stats.avg_fitness) # type: ignore
+
+        reports[k] = {
+            "seconds_per_generation": sum(seconds) / repeats,
+            "best_fitness": sum(best) / repeats,
+            "avg_fitness": sum(average) / repeats,
+        }
+        label = "full scan" if k is None else f"k={k}"
+        print(f"{label:>9}: {reports[k]['seconds_per_generation'] * 1000:7.1f} ms/generation | "
+              f"best {reports[k]['best_fitness']:.2f} | avg {reports[k]['avg_fitness']:.2f}")
+    maps.disable_candidate_lists()
+    return reports
+
+
+def benchmark_lookahead(
+        lookaheads: tuple[float, ...] = (0.0, 1.0, 2.0, 4.0),
+        generations: int = 15,
+        repeats: int = 3,
+        ants_per_colony: int = 20,
+        mutation: int = 3,
+        target_fitness: float = 1850.0,
+        seed: int = 42) -> dict[float, dict[str, float]]:
+    """
+    Compares the reachability term of the transition rule (see Ant.lookahead_factor) against the plain
+    pheromone rule (lookahead 0).
+
+    A tour counts as wasted if it visits less than half as many markets as the best tour of its generation.
+
+    Returns:
+    dict: lookahead → mean average fitness, share of wasted tours, generations until the best fitness
+        reaches target_fitness (generations + 1 if never) and seconds per generation.
+    """
+    maps = GoogleMaps()
+    all_markets, opening_times = maps.get_all_markets()
+
+    reports = {}
+    for lookahead in lookaheads:
+        fitness, wasted, to_target, seconds = [], [], [], []
+        for repeat in range(repeats):
+            random.seed(seed + repeat)
+            maps.set_pheromones()
+            optimizer = Ant_Optimizer(
+                maps_service_objekt = maps,
+                num_colonies        = len(all_markets),
+                ants_per_colony     = ants_per_colony,
+                mutation            = mutation,
+                verbose             = 0,
+                lookahead           = lookahead
+            )
+            optimizer.initialize_colonies(all_markets, opening_times)
+            reached = generations + 1
+            started = time.perf_counter()
+            for generation in range(1, generations + 1):
+                optimizer.run_one_generation()
+                stats = optimizer.last_stats
+                visited = np.concatenate([colony.visited_counts for colony in optimizer.colonies])
+                wasted.append(float((visited < visited.max() / 2).mean()))
+                fitness.append(stats.avg_fitness) # type: ignore
+                if reached > generations and stats.best_fitness >= target_fitness: # type: ignore
+                    reached = generation
+                if generation != generations:
+                    optimizer.advance_to_next_generation()
+            seconds.append((time.perf_counter() - started) / generations)
+            to_target.append(reached)
+
+        reports[lookahead] = {
+            "avg_fitness": float(np.mean(fitness)),
+            "wasted_tours": float(np.mean(wasted)),
+            "generations_to_target": float(np.mean(to_target)),
+            "seconds_per_generation": float(np.mean(seconds)),
+        }
+        report = reports[lookahead]
+        print(f"lookahead {lookahead:3.1f}: avg fitness {report['avg_fitness']:7.1f} | wasted {report['wasted_tours']:.1%} | "
+              f"target after {report['generations_to_target']:.1f} generations | {report['seconds_per_generation'] * 1000:.0f} ms/generation")
+    return reports
+
+
+def benchmark_multi_day(
+        generations: int = 15,
+        repeats: int = 3,
+        max_days: int = 2,
+        ants_per_colony: int = 20,
+        mutation: int = 3,
+        target_fitness: float = 1800.0,
+        seed: int = 42) -> dict[str, dict[str, float]]:
+    """
+    Compares multi-day tours with random day starts (the default) against a Day_Planner
+    (learned and reachability-scored day starts, best days reused as DNA).
+
+    The best tours of both variants are close after a few generations, the day starts mostly change how fast
+    the whole population improves, so the target is measured on the average fitness of a generation.
+
+    Returns:
+    dict: "random" / "planned" → mean average fitness, mean best fitness, generations until the average fitness
+        reaches target_fitness (generations + 1 if never), the markets per day of the best tours and
+        seconds per generation.
+    """
+    maps = GoogleMaps()
+    all_markets, opening_times = maps.get_all_markets()
+
+    reports = {}
+    for name, day_planning in (("random", False), ("planned", True)):
+        fitness, best, to_target, per_day, seconds = [], [], [], [], []
+        for repeat in range(repeats):
+            random.seed(seed + repeat)
+            maps.set_pheromones()
+            optimizer = Ant_Optimizer(
+                maps_service_objekt = maps,
+                num_colonies        = len(all_markets),
+                ants_per_colony     = ants_per_colony,
+                mutation            = mutation,
+                verbose             = 0,
+                ants_multiple_days  = True,
+                max_days            = max_days,
+                day_planning        = day_planning
+            )
+            optimizer.initialize_colonies(all_markets, opening_times)
+            reached = generations + 1
+            best_fitness, best_days = float("-inf"), []
+            started = time.perf_counter()
+            for generation in range(1, generations + 1):
+                optimizer.run_one_generation()
+                stats = optimizer.last_stats
+                fitness.append(stats.avg_fitness) # type: ignore
+                if stats.best_fitness > best_fitness: # type: ignore
+                    best_fitness = float(stats.best_fitness) # type: ignore
+                    colony = max(optimizer.colonies, key=lambda c: c.fitness_values.max())
+                    best_days = colony.get_ant(int(colony.fitness_values.argmax())).markets_per_day()
+                if reached > generations and stats.avg_fitness >= target_fitness: # type: ignore
+                    reached = generation
+                if generation != generations:
+                    optimizer.advance_to_next_generation()
+            seconds.append((time.perf_counter() - started) / generations)
+            best.append(best_fitness)
+            to_target.append(reached)
+            per_day.append(best_days + [0] * (max_days - len(best_days)))
+
+        reports[name] = {
+            "avg_fitness": float(np.mean(fitness)),
+            "best_fitness": float(np.mean(best)),
+            "generations_to_target": float(np.mean(to_target)),
+            "markets_per_day": np.mean(per_day, axis=0).tolist(),
+            "seconds_per_generation": float(np.mean(seconds)),
+        }
+        report = reports[name]
+        days = " / ".join(f"{m:.1f}" for m in report["markets_per_day"])
+        print(f"{name:7s}: avg fitness {report['avg_fitness']:7.1f} | best {report['best_fitness']:7.1f} | "
+              f"target after {report['generations_to_target']:.1f} generations | markets per day {days} | "
+              f"{report['seconds_per_generation'] * 1000:.0f} ms/generation")
+    return reports
+
+
+def benchmark_route_cache(
+        queries: int = 200,
+        distinct_starts: int = 40,
+        jitter_min: int = 10,
+        budget_ms: int = 50,
+        cache_size: int = 256,
+        seed: int = 42) -> dict[str, dict]:
+    """
+    Measures the result cache of the route planning service (see Route_Cache) on repeated, near-identical queries.
+
+    The queries are drawn from distinct_starts (market, start time) pairs, every query shifts the start time by up
+    to jitter_min minutes. The same queries are answered by a service without and with the cache.
+
+    Returns:
+    dict: "uncached" / "cached" → latency report (see latency_report), mean fitness and, with the cache, its statistics.
+    """
+    random.seed(seed)
+    maps = GoogleMaps()
+    all_markets, opening_times = maps.get_all_markets()
+    starts = [random.randrange(len(all_markets)) for _ in range(distinct_starts)]
+    stream = []
+    for _ in range(queries):
+        index = random.choice(starts)
+        minute = opening_times[index].hour * 60 + opening_times[index].minute + random.randint(0, jitter_min)
+        stream.append((all_markets[index], f"{minute // 60:02d}:{minute % 60:02d}"))
+
+    reports = {}
+    for name, cache_size_used in (("uncached", 0), ("cached", cache_size)):
+        random.seed(seed)
+        service = Route_Planning_Service(maps, default_budget_ms=budget_ms, result_cache_size=cache_size_used)
+        latencies, fitness = [], []
+        for market, start_time in stream:
+            sent = time.perf_counter()
+            result = service.plan_route(market, start_time)
+            latencies.append((time.perf_counter() - sent) * 1000)
+            fitness.append(result["fitness"])
+        reports[name] = {"latency_ms": latency_report(latencies), "mean_fitness": sum(fitness) / len(fitness)}
+        if service.route_cache is not None:
+            reports[name]["cache"] = service.cache_stats()
+
+        report = reports[name]["latency_ms"]
+        print(f"{name:8s}: p50 {report['p50']:6.2f} ms | p99 {report['p99']:6.2f} ms | mean {report['mean']:6.2f} ms | "
+              f"mean fitness {reports[name]['mean_fitness']:.1f}")
+        if "cache" in reports[name]:
+            stats = reports[name]["cache"]
+            print(f"          hits {stats['hits']} | reuses {stats['reuses']} | misses {stats['misses']} | "
+                  f"hit rate {stats['hit_rate']:.1%}")
+    return reports
+
+
+if __name__ == "__main__":
+    benchmark_route_service()
@@ -1,5 +1,7 @@
 import random
 from .google_maps import GoogleMaps
+from .option_cache import Option_Cache
+from .day_planner import Day_Planner
 from datetime import timedelta
 from datetime import datetime
 from datetime import time, date
@@ -18,7 +20,10 @@ class Ant:
             mutation:int =1,
             verbose:int = 0,
             max_days: int = 1,
-            days : int = 1
+            days : int = 1,
+            option_cache: Option_Cache|None = None,
+            lookahead: float = 0.0,
+            day_planner: Day_Planner|None = None
             ):
 
         # Surrounding context
@@ -36,6 +41,12 @@ class Ant:
             generation (int, optional): The generation of the ants. Defaults to 0.
             mutation (int, optional): The mutation type of the ants. Defaults to 1.
             verbose (int, optional): The verbosity level of the ant. Defaults to 0.
+            option_cache (Option_Cache | None, optional): Shared cache of option lists (see Option_Cache). Defaults to None.
+            lookahead (float, optional): Exponent of the reachability term of the pheromone rules (mutation 3 and 4):
+                moves are weighted by (1 + unvisited markets still reachable afterwards) ** lookahead
+                (see GoogleMaps.reachability). 0 disables it. Defaults to 0.0.
+            day_planner (Day_Planner | None, optional): Chooses the start of every further day and its DNA
+                (see Day_Planner). If None, a new day starts at a random unvisited market. Defaults to None.
 
         Attributes:
             maps (GoogleMaps): The Google Maps service object.
@@ -52,6 +63,9 @@ class Ant:
             verbose (int): The verbosity level of the ant.
             visited (list): A list of all the markets the ant has visited.
             path (list): A list of tuples containing the market and time the ant has visited.
+            arrival_min (list): The arrival time in minutes for every entry of path.
+            visited_mask (int): Bitmask of the visited market ids (key of the option cache).
+            day_starts (list): The index in visited at which every day starts.
         """
         self.maps = maps_service_objekt
 
@@ -59,6 +73,40 @@ class Ant:
         h, m = map(int, time_limit.split(":"))
         self.time_limit_min = h*60 + m
         
+        self.name = name
+        self.stay_time = stay_time
+        self.verbose = verbose
+        self.option_cache = option_cache
+        self.lookahead = lookahead
+        self.day_planner = day_planner
+        self.reset(start_market, start_time, DNA, generation, mutation, max_days, days)
+
+    def reset(
+            self,
+            start_market:str,
+            start_time:str,
+            DNA:list|None=None,
+            generation:int =0,
+            mutation:int =1,
+            max_days: int = 1,
+            days : int = 1
+            ):
+        """
+        Resets the journey of the ant so the same object can walk another tour.
+
+        Used by Ant_Colony to simulate a whole colony with a single Ant object instead of
+        allocating a new one for every ant in every generation. The map, time limit and
+        stay time are kept.
+
+        Args:
+            start_market (str): The starting market of the ant.
+            start_time (str | time): The starting time of the ant. Can be given as a string ("HH:MM") or a datetime.time object.
+            DNA (list, optional): The DNA of the ant. Defaults to None.
+            generation (int, optional): The generation of the ant. Defaults to 0.
+            mutation (int, optional): The mutation type of the ant. Defaults to 1.
+            max_days (int, optional): The maximum number of days. Defaults to 1.
+            days (int, optional): The current day. Defaults to 1.
+        """
         self.start_market = start_market
         if isinstance(start_time, str):
             h,m = map(int, start_time.split(":"))
@@ -67,10 +115,8 @@ class Ant:
             self.current_min = start_time.hour*60 + start_time.minute
         else:
             raise ValueError("Unsupported start_time type")
-        self.name = name
         self.start_time = self.current_min
         self.current_market = start_market
-        self.stay_time = stay_time
         self.DNA = DNA or []
         self.generation = generation
         self.mutation = mutation
@@ -79,9 +125,14 @@ class Ant:
         self.visited = []
         self.visited.append(start_market)
         self.path = [(start_market, start_time)]
-        self.verbose = verbose
+        # arrival minute for every entry of path (same order)
+        self.arrival_min = [self.current_min]
+        self.visited_mask = 1 << self.maps.market_index[start_market]
+        self._entry = None  # option cache entry of the last evaluate_possibilities
+        self.day_starts = [0]
         self.days = days
         self.max_days = max_days
+
     def evaluate_possibilities(self): 
         """
         Evaluates all possible next markets that the ant can move to.
@@ -95,35 +146,62 @@ class Ant:
         
         # Time when the ant would leave the current market
         self.current_min += self.stay_time
+        self._entry = None
         if self.current_min > self.time_limit_min:  # Exceeds overall time limit
             return []
-        
-        options = []
-
-        # Get all neighboring markets and travel times from the current one
-        neighbors = self.maps.get_destinations(self.current_market)
-
-        for dest, (travel_time, pheromone, open_min, close_min) in neighbors.items():
-            # Skip if this market has already been visited
-            if dest in self.visited:
-                continue
 
-            # Calculate time to arrive, opening and closing at the destination market
-            arrival_time = self.current_min + travel_time
+        # Same market, departure minute and visited markets → same options
+        if self.option_cache is not None:
+            key = (self.maps.market_index[self.current_market], self.current_min, self.visited_mask)
+            self._entry = self.option_cache.get(key)
+            if self._entry is not None:
+                return self._entry[0]
 
-            # Check time constraints
-            if arrival_time < open_min:                         # Arrive before opening
-                continue
-            if arrival_time + self.stay_time > close_min:       # Leave before closing
-                continue
+        options = []
 
-            # Collect valid options
-            options.append((dest, travel_time, pheromone))
+        pheromones = self.maps.pheromone
+        durations = self.maps.durations_at(self.current_min)  # travel times of this departure (O(1))
+
+        # With candidate lists only the candidates of the market are scanned,
+        # all out-edges only if none of them is feasible (see GoogleMaps.enable_candidate_lists)
+        market_id = self.maps.market_index[self.current_market]
+        scans = (True,) if self.maps.candidate_list_complete(market_id) else (True, False)
+        for candidates_only in scans:
+            # Neighboring markets that the ant reaches after opening and can leave before closing
+            # (precomputed departure windows per stay time, see GoogleMaps.departure_windows)
+            edges = self.maps.feasible_edges(self.current_market, self.current_min, self.stay_time, candidates_only)
+
+            for edge in edges:
+                dest = self.maps.markets[self.maps.edge_destination[edge]]
+                # Skip if this market has already been visited
+                if dest in self.visited:
+                    continue
+
+                # Collect valid options
+                options.append((dest, int(durations[edge]), float(pheromones[edge])))
+            if options:
+                break
+
+        if self.option_cache is not None:
+            self._entry = self.option_cache.put(key, options) # type: ignore
         # Return all possible next markets that the ant can move to
         if self.verbose == 3:
             print(f"options: {options}")
         return options
 
+    def lookahead_factor(self, dest:str, travel_time:int) -> float:
+        """
+        The reachability term of a move: (1 + unvisited markets still reachable after it) ** lookahead.
+
+        Args:
+            dest (str): The next market.
+            travel_time (int): The travel time to it (the ant is about to depart, see evaluate_possibilities).
+        """
+        dest_id = self.maps.market_index[dest]
+        reachable = self.maps.reachable_mask(dest_id, self.current_min + travel_time, self.stay_time, self.time_limit_min)
+        unvisited = reachable & ~(self.visited_mask | (1 << dest_id))
+        return (1 + unvisited.bit_count()) ** self.lookahead
+
     def move(self):
         """
         Move the ant to the next market.
@@ -149,7 +227,10 @@ class Ant:
             all_markets, opening_times = self.maps.get_all_markets(visited_markets=self.visited)
             if all_markets and self.days < self.max_days:
                 # Pick a new starting market for the next day
-                idx = random.randrange(len(all_markets))
+                if self.day_planner is not None:
+                    idx = self.day_planner.choose_start(self.visited_mask, all_markets, opening_times)
+                else:
+                    idx = random.randrange(len(all_markets))
                 new_start_market = all_markets[idx]
                 new_start_time_obj = opening_times[idx]
 
@@ -159,13 +240,21 @@ class Ant:
                 self.current_min = new_start_time_obj.hour * 60 + new_start_time_obj.minute
                 self.start_time = f"{new_start_time_obj.hour:02d}:{new_start_time_obj.minute:02d}"
 
-                # Track new day and force pheromone-based behavior
+                # Track new day and force pheromone-based behavior,
+                # guided by the best known day from this start if the planner has one
                 self.days += 1
                 self.mutation = 3
+                if self.day_planner is not None:
+                    self.DNA = self.day_planner.day_dna(new_start_market)
+                    if self.DNA:
+                        self.mutation = 4
 
                 # Record the new day's starting point in the path and visited list
+                self.day_starts.append(len(self.visited))
                 self.visited.append(new_start_market)
+                self.visited_mask |= 1 << self.maps.market_index[new_start_market]
                 self.path.append((new_start_market, self.start_time))
+                self.arrival_min.append(self.current_min)
 
                 # Re-evaluate possible moves from the new starting point
                 options = self.evaluate_possibilities()
@@ -199,12 +288,19 @@ class Ant:
             alpha = 1.0  # pheromone influence
             beta = 2.0   # distance influence
 
-            weights = []
-            for dest, travel_time, pheromone in options:
-                # Classic ACO transition rule
-                minutes = travel_time
-                w = (pheromone ** alpha) * ((1 / minutes) ** beta)
-                weights.append(w)
+            if self._entry is not None and self._entry[1] is not None:
+                weights = self._entry[1]  # same options, same weights
+            else:
+                weights = []
+                for dest, travel_time, pheromone in options:
+                    # Classic ACO transition rule
+                    minutes = travel_time
+                    w = (pheromone ** alpha) * ((1 / minutes) ** beta)
+                    if self.lookahead > 0:
+                        w *= self.lookahead_factor(dest, travel_time)
+                    weights.append(w)
+                if self._entry is not None:
+                    self._entry[1] = weights
 
             next_market, travel_time, pheromone = random.choices(
                 options, weights=weights, k=1
@@ -225,6 +321,8 @@ class Ant:
                     * ((1 / minutes) ** beta)
                     * (dna_boost ** gamma)
                 )
+                if self.lookahead > 0:
+                    w *= self.lookahead_factor(dest, travel_time)
                 weights.append(w)
 
             next_market, travel_time, pheromone = random.choices(
@@ -236,9 +334,11 @@ class Ant:
         self.old_market = self.current_market
         self.current_market = next_market
         self.visited.append(next_market)
+        self.visited_mask |= 1 << self.maps.market_index[next_market]
         h = self.current_min // 60
         m = self.current_min % 60
         self.path.append((next_market, f"{h:02d}:{m:02d}"))
+        self.arrival_min.append(self.current_min)
         if self.verbose == 3:
             print(f"{self.name}\n")
             print(f"Moved from {self.old_market} to {self.current_market} at {h:02d}:{m:02d}\n")
@@ -246,6 +346,13 @@ class Ant:
             
         return True  # Move was successful
     
+    def markets_per_day(self) -> list[int]:
+        """
+        Returns the number of markets visited on every day.
+        """
+        ends = self.day_starts[1:] + [len(self.visited)]
+        return [end - start for start, end in zip(self.day_starts, ends)]
+
     def set_multiple_days(self, amount_days:int):
         """
         Set the multiple_days attribute of the Ant.
@@ -1,6 +1,10 @@
 import random
+import numpy as np
 from .google_maps import GoogleMaps
 from .ant import Ant
+from .option_cache import Option_Cache
+from .day_planner import Day_Planner, day_bounds
+from .tour_evaluator import Tour_Evaluator, to_minutes
 
 class Ant_Colony:
     def __init__(
@@ -15,7 +19,10 @@ class Ant_Colony:
         generation:int=0,
         mutation:int=1,
         verbose:int= 2,
-        max_days: int = 1
+        max_days: int = 1,
+        option_cache_size:int = 0,
+        lookahead:float = 0.0,
+        day_planner:Day_Planner|None = None
     ):
         """
         Initialises an Ant_Colony object with the given parameters.
@@ -30,6 +37,11 @@ class Ant_Colony:
             initial_DNA (list, optional): The initial DNA of the ants. Defaults to None.
             generation (int, optional): The generation of the ants. Defaults to 0.
             mutation (int, optional): The mutation type of the ants. Defaults to 1.
+            option_cache_size (int, optional): Size of the LRU cache of option lists shared by the ants
+                (see Option_Cache), 0 disables it. Defaults to 0.
+            lookahead (float, optional): Weight of the reachability term of the ants (see Ant). Defaults to 0.0.
+            day_planner (Day_Planner | None, optional): Chooses the day starts of multi-day tours, usually shared
+                by all colonies (see Day_Planner). Defaults to None (random day starts).
 
         Attributes:
             maps (GoogleMaps): The Google Maps service object.
@@ -41,8 +53,18 @@ class Ant_Colony:
             initial_DNA (list): The initial DNA of the ants.
             generation (int): The generation of the ants.
             mutation (int): The mutation type of the ants.
-            ants (list): A list of all the ants in the colony.
-            fitness_scores (dict): A dictionary containing the fitness scores of the ants.
+            ants (list): All ants of the colony, materialised on demand from the arrays.
+            dna (np.ndarray): The DNA of every ant as market ids, padded with -1.
+            dna_len (np.ndarray): The DNA length of every ant.
+            tours (np.ndarray): The visited markets of every ant as market ids, padded with -1.
+            arrival_min (np.ndarray): The arrival minute at every visited market.
+            visited_counts (np.ndarray): The number of visited markets of every ant.
+            end_min (np.ndarray): The time in minutes at which every ant stopped.
+            days_used (np.ndarray): The number of days every ant used.
+            tour_days (np.ndarray): The day (0-based) of every visited market.
+            fitness_values (np.ndarray): The fitness of every ant.
+            option_cache (Option_Cache | None): The option cache of the colony.
+            evaluator (Tour_Evaluator): Checks the time feasibility of bred children.
         """
 
         self.maps = maps_service_objekt
@@ -56,40 +78,198 @@ class Ant_Colony:
         self.mutation = mutation
         self.verbose = verbose
         self.max_days = max_days
-        # all the ants in this colony
-        self.ants = self.spawn_ants()
-        
 
-    def spawn_ants(self) -> list:
+        # Population storage (struct of arrays, one row per ant).
+        # A tour visits every market at most once, so the number of markets bounds all rows.
+        # Unused entries are -1.
+        width = len(self.maps.markets)
+        self.dna = np.full((number_of_ants, width), -1, dtype=np.int32)
+        self.dna_len = np.zeros(number_of_ants, dtype=np.int32)
+        self.tours = np.full((number_of_ants, width), -1, dtype=np.int32)
+        self.arrival_min = np.zeros((number_of_ants, width), dtype=np.int32)
+        self.visited_counts = np.zeros(number_of_ants, dtype=np.int32)
+        self.end_min = np.zeros(number_of_ants, dtype=np.int32)
+        self.days_used = np.ones(number_of_ants, dtype=np.int32)
+        self.tour_days = np.zeros((number_of_ants, width), dtype=np.int8)
+        self.fitness_values = np.zeros(number_of_ants, dtype=np.float64)
+
+        # second DNA buffer, step_generation writes the children here and swaps
+        self._next_dna = np.full_like(self.dna, -1)
+        self._next_dna_len = np.zeros_like(self.dna_len)
+
+        # numpy generator for the batched breeding, seeded from random so random.seed stays reproducible
+        self.rng = np.random.default_rng(random.getrandbits(64))
+
+        self.evaluator = Tour_Evaluator(self.maps, self.stay_time, self.time_limit)
+        self.start_min = to_minutes(self.start_time)
+
+        self.option_cache = Option_Cache(self.maps, option_cache_size) if option_cache_size > 0 else None
+        self.lookahead = lookahead
+        self.day_planner = day_planner
+
+        # a single ant walks all tours of this colony (see Ant.reset)
+        self._worker = Ant(
+            name = f"{self.start_market} Ant 1",
+            maps_service_objekt=self.maps,
+            start_market=self.start_market,
+            start_time=self.start_time,
+            stay_time=self.stay_time,
+            time_limit=self.time_limit,
+            generation=self.generation,
+            mutation=self.mutation,
+            verbose = self.verbose,
+            max_days= self.max_days,
+            option_cache = self.option_cache,
+            lookahead = self.lookahead,
+            day_planner = self.day_planner
+        )
+
+        self.spawn_ants()
+
+    @property
+    def ants(self) -> list[Ant]:
         """
-        Resets the list of ants and spawns a new set of ants.
+        All ants of the colony, materialised from the population arrays.
 
-        The new ants are given the same parameters as the old ants, but with a new DNA, which is a copy of the initial DNA.
+        The ants are built on demand for inspection only, changing them does not change the colony.
+        """
+        return [self.get_ant(i) for i in range(self.number_of_ants)]
+
+    def get_ant(self, index:int) -> Ant:
+        """
+        Materialises a single ant from the population arrays.
+
+        Args:
+            index (int): The index of the ant in the colony.
+
+        Returns:
+            Ant: An ant with the DNA, path, visited markets and end time of the stored tour.
+        """
+        ant = Ant(
+            name = f"{self.start_market} Ant {index+1}",
+            maps_service_objekt=self.maps,
+            start_market=self.start_market,
+            start_time=self.start_time,
+            stay_time=self.stay_time,
+            time_limit=self.time_limit,
+            DNA=self.get_dna(index),
+            generation=self.generation,
+            mutation=self.mutation,
+            verbose = self.verbose,
+            max_days= self.max_days
+        )
+
+        count = self.visited_counts[index]
+        if count == 0:  # not walked yet
+            return ant
+
+        visited = self.maps.decode(self.tours[index, :count])
+        minutes = self.arrival_min[index, :count].tolist()
+        ant.visited = visited
+        ant.arrival_min = minutes
+        ant.path = [(visited[0], self.start_time)] + [
+            (market, f"{minute // 60:02d}:{minute % 60:02d}")
+            for market, minute in zip(visited[1:], minutes[1:])
+        ]
+        ant.current_market = visited[-1]
+        ant.current_min = int(self.end_min[index])
+        ant.days = int(self.days_used[index])
+        ant.day_starts = [first for first, _ in day_bounds(self.tour_days[index, :count])]
+        return ant
+
+    def get_dna(self, index:int) -> list[str]:
+        """
+        Returns the DNA of an ant as a list of market names.
+
+        Args:
+            index (int): The index of the ant in the colony.
 
-        The new ants are then added to the list of ants.
+        Returns:
+            list[str]: The DNA of the ant.
+        """
+        return self.maps.decode(self.dna[index, :self.dna_len[index]])
+
+    def spawn_ants(self):
+        """
+        Resets the population arrays for a new set of ants.
+
+        Every ant gets a copy of the initial DNA and an empty tour.
         
         """
+        initial = self.maps.encode(self.initial_DNA)[:self.dna.shape[1]]
+
+        self.dna.fill(-1)
+        self.dna[:, :len(initial)] = initial
+        self.dna_len.fill(len(initial))
+        self.tours.fill(-1)
+        self.visited_counts.fill(0)
+        self.end_min.fill(0)
+        self.days_used.fill(1)
+        self.fitness_values.fill(0)
+
+    def resize(self, number_of_ants:int):
+        """
+        Changes the number of ants of the colony, used between generations (after step_generation).
 
-        ants = [] # reset for new ants
+        The first ants keep their DNA, added ants copy the DNA of random existing ants.
+        The tour arrays are reallocated empty.
 
-        for i in range(self.number_of_ants):
-            
-            ant = Ant(
-                name = f"{self.start_market} Ant {i+1}",
-                maps_service_objekt=self.maps,
-                start_market=self.start_market,
-                start_time=self.start_time,
-                stay_time=self.stay_time,
-                time_limit=self.time_limit,
-                DNA=self.initial_DNA.copy(),
-                generation=self.generation,
-                mutation=self.mutation,
-                verbose = self.verbose,
-                max_days= self.max_days
-            )
+        Args:
+            number_of_ants (int): The new number of ants (at least 1).
+        """
+        if number_of_ants == self.number_of_ants:
+            return
+        rows = np.arange(min(number_of_ants, self.number_of_ants))
+        if number_of_ants > self.number_of_ants:
+            extra = self.rng.integers(self.number_of_ants, size=number_of_ants - self.number_of_ants)
+            rows = np.concatenate([rows, extra])
+
+        self.dna = self.dna[rows]
+        self.dna_len = self.dna_len[rows]
+        self._next_dna = np.full_like(self.dna, -1)
+        self._next_dna_len = np.zeros_like(self.dna_len)
+
+        width = self.tours.shape[1]
+        self.tours = np.full((number_of_ants, width), -1, dtype=np.int32)
+        self.arrival_min = np.zeros((number_of_ants, width), dtype=np.int32)
+        self.visited_counts = np.zeros(number_of_ants, dtype=np.int32)
+        self.end_min = np.zeros(number_of_ants, dtype=np.int32)
+        self.days_used = np.ones(number_of_ants, dtype=np.int32)
+        self.tour_days = np.zeros((number_of_ants, width), dtype=np.int8)
+        self.fitness_values = np.zeros(number_of_ants, dtype=np.float64)
+        self.number_of_ants = number_of_ants
+
+    def seed_dna(self, markets:list[str], index:int|None = None):
+        """
+        Replaces the DNA of one ant, e.g. with a good tour found elsewhere (see Island_Model).
+        Used between generations (after step_generation).
+
+        Args:
+            markets (list[str]): The new DNA as market names.
+            index (int | None, optional): The ant, a random one if None. Defaults to None.
+        """
+        if index is None:
+            index = int(self.rng.integers(self.number_of_ants))
+        encoded = self.maps.encode(markets)[:self.dna.shape[1]]
+        self.dna[index] = -1
+        self.dna[index, :len(encoded)] = encoded
+        self.dna_len[index] = len(encoded)
+
+    def _ensure_width(self):
+        """
+        Widens the population arrays if markets were added to the map (GoogleMaps.add_market) since they were allocated.
+        """
+        width = len(self.maps.markets)
+        missing = width - self.tours.shape[1]
+        if missing <= 0:
+            return
+        pad = ((0, 0), (0, missing))
+        self.dna = np.pad(self.dna, pad, constant_values=-1)
+        self._next_dna = np.pad(self._next_dna, pad, constant_values=-1)
+        self.tours = np.pad(self.tours, pad, constant_values=-1)
+        self.arrival_min = np.pad(self.arrival_min, pad)
+        self.tour_days = np.pad(self.tour_days, pad)
 
-            ants.append(ant)
-        return ants
     def fitness(self, ant):
         """
         Calculates the fitness of an ant.
@@ -105,7 +285,7 @@ class Ant_Colony:
         # if same length prefer the one with less time used -> (simple fitness function, may be improved)
         return len(ant.visited) * 100 - ant.current_min / 60
 
-    def selection(self, survival_rate=0.2):
+    def selection(self, survival_rate=0.2) -> np.ndarray:
 
         # Fitness of all ants
         """
@@ -119,81 +299,113 @@ class Ant_Colony:
             survival_rate (float, optional): The survival rate of the ants. Defaults to 0.2.
 
         Returns:
-            list: A list of the surviving ants.
+            np.ndarray: The indices of the surviving ants.
         """
-        scored_ants = [(ant, self.fitness(ant)) for ant in self.ants]
-        fitness_values = [score for (_, score) in scored_ants]
+        weights = self.fitness_values
 
         # Fitness can be negative, shift to positive values (for roulette wheel)
-        min_f = min(fitness_values)
+        min_f = weights.min()
         if min_f < 0:
             # shift all fitness values so minimum becomes 1
-            fitness_values = [f - min_f + 1 for f in fitness_values]
+            weights = weights - min_f + 1
 
         # determine number of survivors
-        num_survivors = max(2, int(len(self.ants) * survival_rate))
+        num_survivors = max(2, int(self.number_of_ants * survival_rate))
 
         # Selection by roulette wheel
-        survivors = random.choices(
-            self.ants,
-            weights=fitness_values,
-            k=num_survivors
-        )
+        total = weights.sum()
+        if total > 0:
+            return self.rng.choice(self.number_of_ants, size=num_survivors, p=weights / total)
+        return self.rng.integers(self.number_of_ants, size=num_survivors)
 
-        return survivors
-    
-    def breed(self, parent1, parent2):
+    def breed(self, parent1:int, parent2:int) -> np.ndarray:
         """
         Breeds two ants and returns their offspring.
 
-        The breeding process consists of a simple one-point crossover.
-
-        The DNA of the offspring is a combination of the DNA of the two parents, where the point of crossover is chosen randomly.
+        Single pair version of breed_batch.
 
         Args:
-            parent1 (Ant): The first ant to breed.
-            parent2 (Ant): The second ant to breed.
+            parent1 (int): The index of the first ant to breed.
+            parent2 (int): The index of the second ant to breed.
 
         Returns:
-            list: The DNA of the offspring.
+            np.ndarray: The DNA of the offspring as market ids.
         """
+        children, lengths = self.breed_batch(np.array([parent1]), np.array([parent2]))
+        return children[0, :lengths[0]]
 
-        # Extract path without times
-        dna1 = [m for (m, _) in parent1.path]
-        dna2 = [m for (m, _) in parent2.path]
-
-        # if DNA too short, return the longer one
-        if len(dna1) < 2 or len(dna2) < 2:
-            return dna1 if len(dna1) > len(dna2) else dna2
-        
-        # random sequence of possible crossover points
-        max_point = min(len(dna1), len(dna2)) - 1
-        possible_points = list(range(1, max_point + 1))
-        random.shuffle(possible_points)
+    def breed_batch(self, parents1:np.ndarray, parents2:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Breeds many pairs of ants at once and returns the DNA of all offspring.
 
-        valid_child = None
+        The breeding process consists of a simple one-point crossover: the child is dna1[:point] + dna2[point:],
+        where the point is chosen uniformly among all points at which the edge (dna1[point-1] → dna2[point])
+        exists in the map. The valid points of all pairs are found in one lookup in the edge-id matrix.
 
-        # Check if poitn of crossover is a valid move
-        for point in possible_points:
-            left_end = dna1[point - 1]
-            right_start = dna2[point]
+        For single-day colonies all candidate children are checked by the Tour_Evaluator: only the points whose
+        child has the longest time-feasible prefix are kept, and the child is cut after that prefix, so the DNA
+        never contains moves the ants cannot make.
 
-            # Check: does the edge (left_end → right_start) exist in the map?
-            if (left_end, right_start) in set((row["origin"], row["destination"]) for _, row in self.maps.df.iterrows()):
-                return dna1[:point] + dna2[point:]
+        If a parent's tour is shorter than 2 or no valid crossover point exists, the child gets the longer tour.
 
-        # If no valid crossover point found, return the longer DNA
-        if valid_child is None:
-            return dna1 if len(dna1) > len(dna2) else dna2
+        Args:
+            parents1 (np.ndarray): Indices of the first parents.
+            parents2 (np.ndarray): Indices of the second parents.
 
-        return valid_child
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The DNA block (pairs × markets, padded with -1) and the DNA lengths.
+        """
+        dna1 = self.tours[parents1]
+        dna2 = self.tours[parents2]
+        len1 = self.visited_counts[parents1]
+        len2 = self.visited_counts[parents2]
+        width = dna1.shape[1]
+
+        # point - 1 for every candidate crossover point (1 .. min length - 1)
+        positions = np.arange(width - 1)
+        in_range = positions[None, :] <= (np.minimum(len1, len2) - 2)[:, None]
+
+        # Check: does the edge (left_end → right_start) exist in the map?
+        left_end = dna1[:, :-1].clip(0)
+        right_start = dna2[:, 1:].clip(0)
+        valid = in_range & (self.maps.edge_id[left_end, right_start] >= 0)
+
+        feasible_len = None
+        if self.max_days == 1 and valid.any():
+            # the children of all valid (pair, point) candidates in one batch
+            pair, position = np.nonzero(valid)
+            candidates = np.where(np.arange(width)[None, :] <= position[:, None], dna1[pair], dna2[pair])
+            _, candidate_len, _ = self.evaluator.evaluate(candidates, self.start_min)
+            feasible_len = np.full(valid.shape, -1, dtype=np.int64)
+            feasible_len[pair, position] = candidate_len
+            valid &= feasible_len == feasible_len.max(axis=1, keepdims=True)
+
+        # random valid point per pair (highest random key among the valid points)
+        keys = np.where(valid, self.rng.random(valid.shape), -1.0)
+        points = keys.argmax(axis=1) + 1
+        crossover = valid.any(axis=1)
+
+        # columns taken from the first parent: the crossover point, or all/none for the longer tour
+        take_first = len1 > len2
+        cut = np.where(crossover, points, np.where(take_first, width, 0))
+        lengths = np.where(crossover | ~take_first, len2, len1)
+
+        if feasible_len is not None:
+            # cut the children after their feasible prefix
+            chosen = feasible_len[np.arange(len(points)), points - 1]
+            lengths = np.where(crossover, np.minimum(lengths, chosen), lengths)
+
+        children = np.where(np.arange(width)[None, :] < cut[:, None], dna1, dna2)
+        children[np.arange(width)[None, :] >= lengths[:, None]] = -1
+        return children, lengths
 
     def step_generation(self):
         """
         Advances the generation of the Ant Colony by one step.
 
-        Selects ants based on their fitness and breeds new ants by performing crossover operations on the selected ants.
-        The resulting new ants replace the old ants in the AntColony.
+        Selects ants based on their fitness, draws all parent pairs at once and breeds the whole
+        next generation in one batch (see breed_batch).
+        The children's DNA is written into the second DNA buffer, which then replaces the current one.
 
         Returns:
             None
@@ -201,57 +413,66 @@ class Ant_Colony:
 
         # sourvivors
         survivors = self.selection()
-        new_ants = []
-
-        # breeding
-        while len(new_ants) < self.number_of_ants:
-            parent1, parent2 = random.sample(survivors, 2)
 
-            # breed() returns a DNA LIST
-            child_dna = self.breed(parent1, parent2)
+        # two different survivor slots for every child
+        first = self.rng.integers(len(survivors), size=self.number_of_ants)
+        second = self.rng.integers(len(survivors) - 1, size=self.number_of_ants)
+        second += second >= first
 
-            # create a NEW Ant object with that DNA
-            ant = Ant(
-                name = f"{self.start_market} Ant {len(new_ants)+1}",
-                maps_service_objekt=self.maps,
-                start_market=self.start_market,
-                start_time=self.start_time,
-                stay_time=self.stay_time,
-                time_limit=self.time_limit,
-                DNA=child_dna.copy(),
-                generation=self.generation + 1,
-                mutation=self.mutation,
-                max_days= self.max_days
-            )
+        # breeding
+        children, lengths = self.breed_batch(survivors[first], survivors[second])
+        self._next_dna[:] = children
+        self._next_dna_len[:] = lengths
 
-            new_ants.append(ant)
+        self.dna, self._next_dna = self._next_dna, self.dna
+        self.dna_len, self._next_dna_len = self._next_dna_len, self.dna_len
 
         self.generation += 1
-        self.ants = new_ants
+        self.tours.fill(-1)
+        self.visited_counts.fill(0)
 
     def move_ants(self) -> list[tuple[list[tuple[str, str]], float]]:
         """
-        Move all ants in the AntColony one step forward.
+        Move all ants in the AntColony until they can no longer move.
 
-        For each ant, move it to the next market until it can no longer move.
-        Then, advance the generation by one step and replace the old ants with the new ones.
+        The tours are walked by a single reusable ant and stored in the population arrays
+        (tours, arrival times, visited counts, end times and fitness values).
 
         Returns:
-            None
+            list: A list of (edges, fitness) tuples, one per ant.
         """
 
+        self._ensure_width()
         paths = []
+        ant = self._worker
 
-        for ant in self.ants:
+        for i in range(self.number_of_ants):
+            ant.name = f"{self.start_market} Ant {i+1}"
+            ant.reset(
+                start_market=self.start_market,
+                start_time=self.start_time,
+                DNA=self.get_dna(i),
+                generation=self.generation,
+                mutation=self.mutation,
+                max_days=self.max_days
+            )
             while ant.move():
                 pass
 
-            # ant.path: [(market, time), (market, time), ...]
-            markets_only = [m for (m, _) in ant.path]
-        
+            # store the tour
+            count = len(ant.visited)
+            self.tours[i, :count] = self.maps.encode(ant.visited)
+            self.arrival_min[i, :count] = ant.arrival_min
+            self.visited_counts[i] = count
+            self.end_min[i] = ant.current_min
+            self.days_used[i] = ant.days
+            for day, start in enumerate(ant.day_starts):
+                self.tour_days[i, start:count] = day
+            self.fitness_values[i] = self.fitness(ant)
+
             # make edges → [(m0, m1), (m1, m2), ...]
-            edges = list(zip(markets_only[:-1], markets_only[1:]))
-            paths.append((edges, self.fitness(ant)))
+            edges = list(zip(ant.visited[:-1], ant.visited[1:]))
+            paths.append((edges, self.fitness_values[i].item()))
         if self.verbose == 2:
             print(paths)
         
@@ -261,16 +482,13 @@ class Ant_Colony:
     
     def set_multiple_days(self, amount_days:int):
         """
-        Set the ants_multiple_days attribute for all ants in the AntColony.
+        Set the maximum number of days for all ants in the AntColony.
 
         This attribute determines whether the ants can move multiple days or not.
 
         Args:
-            None
+            amount_days (int): The maximum number of days.
         Returns:
             None
         """
         self.max_days = amount_days
-        for ant in self.ants:
-            ant.set_multiple_days(amount_days)
-            
\ No newline at end of file
@@ -1,7 +1,13 @@
 import random
+import time
+import numpy as np
 from .google_maps import GoogleMaps
 from .ant import Ant
 from .ant_colony import Ant_Colony
+from .generation_stats import Generation_Stats
+from .pheromone_library import Pheromone_Library
+from .budget_scheduler import Budget_Scheduler
+from .day_planner import Day_Planner
 
 class Ant_Optimizer:
     def __init__(self, 
@@ -15,7 +21,13 @@ class Ant_Optimizer:
                  mutation:int=1,
                  verbose:int = 1,
                  ants_multiple_days:bool = False,
-                 max_days:int = 1
+                 max_days:int = 1,
+                 pheromone_library:Pheromone_Library|None = None,
+                 adaptive_budget:bool = False,
+                 total_ants:int|None = None,
+                 option_cache_size:int = 0,
+                 lookahead:float = 0.0,
+                 day_planning:bool = False
                  ):
 
 
@@ -33,6 +45,18 @@ class Ant_Optimizer:
             mutation (int, optional): The mutation type of the ants. Defaults to 1.
             verbose (int, optional): The verbosity of the ants. Defaults to 1.
             ants_multiple_days (bool, optional): Whether the ants can visit markets multiple times in a single day. Defaults to False.
+            pheromone_library (Pheromone_Library | None, optional): If given, the pheromones are initialised from the
+                nearest stored parameter set and store_pheromones saves the learned ones. Defaults to None.
+            adaptive_budget (bool, optional): Re-allocate the ants across the colonies after every generation
+                (see Budget_Scheduler) instead of giving every colony ants_per_colony ants. Defaults to False.
+            total_ants (int | None, optional): The ants per generation over all colonies when adaptive_budget is
+                set. Defaults to num_colonies * ants_per_colony.
+            option_cache_size (int, optional): Size of the per-colony LRU cache of option lists
+                (see Option_Cache), 0 disables it. Defaults to 0.
+            lookahead (float, optional): Weight of the reachability term in the transition rule of the ants
+                (see Ant and GoogleMaps.reachability), 0 disables it. Defaults to 0.0.
+            day_planning (bool, optional): Choose the day starts of multi-day tours with a learned Day_Planner
+                shared by all colonies instead of at random. Defaults to False.
         """
         self.maps = maps_service_objekt
 
@@ -47,12 +71,33 @@ class Ant_Optimizer:
         self.verbose = verbose
         self.colonies = []  # list of AntColonies
         self.ants_multiple_days = ants_multiple_days
+        self.observers = []  # callables receiving the Generation_Stats of every generation
+        self.last_stats = None
+        self.adaptive_budget = adaptive_budget
+        self.total_ants = total_ants
+        self.option_cache_size = option_cache_size
+        self.lookahead = lookahead
+        self.day_planner = Day_Planner(self.maps, self.stay_time, self.time_limit) if day_planning else None
+        self.scheduler = None
+        self.ant_tours = 0  # tours walked by all ants so far
+        self.generation_complete = True  # False if the last generation stopped at a deadline
 
         if self.ants_multiple_days:
             self.max_days = max_days
         else:
             self.max_days = 1
 
+        # warm start from previously learned pheromones
+        self.pheromone_library = pheromone_library
+        self.warm_start_key = None
+        # parameters the library was looked up with, store_pheromones stores under the same ones
+        self.library_params = (self.stay_time, self.time_limit, self.mutation, self.max_days)
+        if self.pheromone_library is not None:
+            found = self.pheromone_library.lookup(self.maps, *self.library_params)
+            if found is not None:
+                pheromones, self.warm_start_key, _ = found
+                self.maps.set_pheromones(pheromones)
+
 
     def initialize_colonies(self, all_markets, open_times):
         """
@@ -92,40 +137,252 @@ class Ant_Optimizer:
                 generation=self.generation,
                 mutation=self.mutation,
                 verbose = self.verbose,
-                max_days = self.max_days
+                max_days = self.max_days,
+                option_cache_size = self.option_cache_size,
+                lookahead = self.lookahead,
+                day_planner = self.day_planner
             )
 
             self.colonies.append(colony)
 
+        if self.adaptive_budget:
+            self.scheduler = Budget_Scheduler(len(self.colonies), self.ants_per_colony, self.total_ants)
+
 
-    def run_one_generation(self) -> list[tuple[list[tuple[str, str]], float]]:
+    def run_one_generation(self, deadline:float|None = None) -> list[tuple[list[tuple[str, str]], float]]:
         """
         Run one generation of the algorithm.
 
         Move all ants in all colonies one step forward and update the pheromone map.
+        With a deadline the clock is checked between colonies. At least one colony is moved, the
+        generation ends early once the deadline passed (generation_complete is then False and the
+        statistics only cover the moved colonies). Only advance after complete generations.
+
+        Args:
+            deadline (float | None, optional): time.perf_counter() value after which no further colony is moved. Defaults to None.
 
         Returns:
             list: A list of paths taken by the ants in each colony.
         """
 
         paths = []
+        moved = []
 
         for colony in self.colonies:
+            if deadline is not None and moved and time.perf_counter() >= deadline:
+                break
             path = colony.move_ants() # [(edges, cost), ...]
             paths.extend(path) # flatten
-            
-        
+            self.ant_tours += colony.number_of_ants
+            moved.append(colony)
+
+        self.generation_complete = len(moved) == len(self.colonies)
         self.maps.update_pheromones(paths)
+        if self.day_planner is not None and self.max_days > 1:
+            self.day_planner.update(moved)
         if self.verbose ==1:
             print(paths[0])
 
+        self.last_stats = self.compute_stats(paths, moved)
+        for observer in self.observers:
+            observer(self.last_stats)
+
         return paths
+
+    def compute_stats(self, paths: list[tuple[list[tuple[str, str]], float]], colonies:list[Ant_Colony]|None = None) -> Generation_Stats:
+        """
+        Aggregates the fitness values and visited counts the colonies stored while moving.
+
+        Args:
+            paths (list): The paths of the generation in colony order, as returned by move_ants.
+            colonies (list[Ant_Colony] | None, optional): The colonies that moved, in order. Defaults to all colonies.
+
+        Returns:
+            Generation_Stats: The statistics of the generation.
+        """
+        colonies = self.colonies if colonies is None else colonies
+        num = len(colonies)
+        avg_visited = np.empty(num)
+        max_visited = np.empty(num)
+        avg_fitness = np.empty(num)
+        max_fitness = np.empty(num)
+        best_index = np.empty(num, dtype=np.int64)
+        total_fitness = 0.0
+        total_ants = 0
+
+        for i, colony in enumerate(colonies):
+            avg_visited[i] = colony.visited_counts.mean()
+            max_visited[i] = colony.visited_counts.max()
+            avg_fitness[i] = colony.fitness_values.mean()
+            best_index[i] = colony.fitness_values.argmax()
+            max_fitness[i] = colony.fitness_values[best_index[i]]
+            total_fitness += colony.fitness_values.sum()
+            total_ants += colony.number_of_ants
+
+        # position of the best ant in the flattened paths list
+        best_colony = int(max_fitness.argmax())
+        offset = sum(colony.number_of_ants for colony in colonies[:best_colony])
+        best_path, best_fitness = paths[offset + best_index[best_colony]]
+
+        return Generation_Stats(
+            generation=self.generation,
+            colony_markets=[colony.start_market for colony in colonies],
+            colony_avg_visited=avg_visited,
+            colony_max_visited=max_visited,
+            colony_avg_fitness=avg_fitness,
+            colony_max_fitness=max_fitness,
+            avg_fitness=total_fitness / total_ants,
+            max_fitness=float(max_fitness[best_colony]),
+            best_path=best_path,
+            best_fitness=best_fitness
+        )
+
+    def option_cache_stats(self) -> dict[str, float]:
+        """
+        Returns the hit-rate statistics of the option caches summed over all colonies (see Option_Cache.stats).
+        """
+        total = {"hits": 0, "misses": 0, "size": 0, "evictions": 0, "invalidations": 0}
+        for colony in self.colonies:
+            if colony.option_cache is not None:
+                for name, value in colony.option_cache.stats().items():
+                    if name in total:
+                        total[name] += value
+        lookups = total["hits"] + total["misses"]
+        total["hit_rate"] = total["hits"] / lookups if lookups else 0.0
+        return total
+
+    def add_observer(self, observer):
+        """
+        Registers a callable that receives the Generation_Stats after every generation.
+
+        Args:
+            observer (Callable[[Generation_Stats], None]): The observer.
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Removes a previously registered observer.
+
+        Args:
+            observer (Callable[[Generation_Stats], None]): The observer.
+        """
+        self.observers.remove(observer)
+
     def advance_to_next_generation(self):
+        """
+        Breeds the next generation of every colony and, with adaptive_budget, re-allocates the ants
+        based on the statistics of the last generation.
+        """
         for colony in self.colonies:
             colony.step_generation()
-        
+
+        if self.scheduler is not None and self.last_stats is not None and self.generation_complete:
+            ants = np.array([colony.number_of_ants for colony in self.colonies])
+            self.scheduler.update(self.last_stats, ants)
+            for colony, number_of_ants in zip(self.colonies, self.scheduler.allocate()):
+                colony.resize(int(number_of_ants))
+
         self.generation += 1
     
+    def run_anytime(self, budget_ms:float, target_generations:int = 10, max_generations:int|None = None,
+                    min_ants:int = 2, max_ants:int|None = None) -> dict:
+        """
+        Runs initialized colonies until a wall-clock budget is used up and returns the best route found.
+
+        The ants per colony are scaled to the budget: after every generation the measured time per ant tour
+        is used to size the colonies so that about target_generations generations fit into the budget
+        (between min_ants and max_ants). The clock is checked between colonies, so the run ends at most
+        one colony after the deadline. The best route is kept over all generations, also from the last
+        partial one.
+
+        Args:
+            budget_ms (float): The time budget in milliseconds.
+            target_generations (int, optional): The number of generations the ants are scaled for. Defaults to 10.
+            max_generations (int | None, optional): Stop after this many generations even if time is left. Defaults to None.
+            min_ants (int, optional): The minimum ants per colony. Defaults to 2.
+            max_ants (int | None, optional): The maximum ants per colony. Defaults to ants_per_colony.
+
+        Returns:
+            dict: The best route (markets, arrival_min, path, fitness, days, markets_per_day) and the progress metadata
+                (generations, partial_generation, ant_tours, ants_per_colony, elapsed_ms, budget_ms,
+                deadline_met, last_improvement_ms, best_fitness_history).
+        """
+        if not self.colonies:
+            raise ValueError("Colonies are not initialized")
+        max_ants = max_ants or self.ants_per_colony
+        started = time.perf_counter()
+        deadline = started + budget_ms / 1000
+
+        best_ant, best_fitness = None, float("-inf")
+        last_improvement = 0.0
+        history = []
+        generations = 0
+        tours_before = self.ant_tours
+
+        while True:
+            generation_started = time.perf_counter()
+            tours = self.ant_tours
+            self.run_one_generation(deadline)
+            now = time.perf_counter()
+            if self.generation_complete:
+                generations += 1
+
+            # best ant of the moved colonies (the colonies are moved in order)
+            for colony in self.colonies[:len(self.last_stats.colony_markets)]: # type: ignore
+                index = int(colony.fitness_values.argmax())
+                if colony.fitness_values[index] > best_fitness:
+                    best_fitness = float(colony.fitness_values[index])
+                    best_ant = colony.get_ant(index)
+                    last_improvement = now - started
+            history.append(best_fitness)
+
+            if now >= deadline or not self.generation_complete:
+                break
+            if max_generations is not None and generations >= max_generations:
+                break
+
+            # scale the colonies to the remaining time
+            seconds_per_tour = (now - generation_started) / max(1, self.ant_tours - tours)
+            generations_left = max(1, target_generations - generations)
+            ants = int((deadline - now) / (generations_left * len(self.colonies) * seconds_per_tour))
+            ants = min(max(ants, min_ants), max_ants)
+
+            if self.scheduler is not None:
+                self.scheduler.total_ants = max(ants, self.scheduler.min_ants) * len(self.colonies)
+            self.advance_to_next_generation()
+            if self.scheduler is None:
+                for colony in self.colonies:
+                    colony.resize(ants)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "markets": list(best_ant.visited), # type: ignore
+            "arrival_min": list(best_ant.arrival_min), # type: ignore
+            "path": [(m, f"{t // 60:02d}:{t % 60:02d}") for m, t in zip(best_ant.visited, best_ant.arrival_min)], # type: ignore
+            "fitness": best_fitness,
+            "days": best_ant.days, # type: ignore
+            "markets_per_day": best_ant.markets_per_day(), # type: ignore
+            "generations": generations,
+            "partial_generation": not self.generation_complete,
+            "ant_tours": self.ant_tours - tours_before,
+            "ants_per_colony": [colony.number_of_ants for colony in self.colonies],
+            "elapsed_ms": elapsed * 1000,
+            "budget_ms": budget_ms,
+            "deadline_met": elapsed * 1000 <= budget_ms,
+            "last_improvement_ms": last_improvement * 1000,
+            "best_fitness_history": history,
+        }
+
+    def store_pheromones(self):
+        """
+        Saves the current pheromones to the pheromone library under the parameters the optimizer looked them up
+        with, so a run that switched to multiple days (set_ants_multiple_days) warm-starts the next identical run.
+        """
+        if self.pheromone_library is None:
+            raise ValueError("No pheromone library given")
+        self.pheromone_library.store(self.maps, *self.library_params)
+
     def set_ants_multiple_days(self, amount_max_days: int):
         self.max_days = amount_max_days
         for colony in self.colonies:
@@ -0,0 +1,154 @@
+import time
+from .google_maps import GoogleMaps
+from .ant_optimizer import Ant_Optimizer
+
+class Batch_Route_Planner:
+    def __init__(
+        self,
+        maps_service_objekt:GoogleMaps,
+        ants_per_colony:int = 20,
+        generations:int = 20,
+        mutation:int = 3,
+        time_limit:str = "23:00", # cause latest market closes there
+        verbose:int = 0
+    ):
+        """
+        Plans routes for many visitor profiles on one shared graph.
+
+        Profiles with the same stay time, time limit and day limit are grouped and run in one Ant_Optimizer,
+        with one colony per distinct (start market, start time), so their ants are simulated together and share
+        the pheromones of the group. All groups share the graph and its per-stay-time departure windows
+        (GoogleMaps.departure_windows).
+
+        Args:
+            maps_service_objekt (GoogleMaps): The shared graph.
+            ants_per_colony (int, optional): The number of ants per colony. Defaults to 20.
+            generations (int, optional): The number of generations per group. Defaults to 20.
+            mutation (int, optional): The mutation type of the ants. Defaults to 3.
+            time_limit (str, optional): The time limit for profiles that do not set one. Defaults to "23:00".
+            verbose (int, optional): 1 prints one line per group. Defaults to 0.
+        """
+        self.maps = maps_service_objekt
+        self.ants_per_colony = ants_per_colony
+        self.generations = generations
+        self.mutation = mutation
+        self.time_limit = time_limit
+        self.verbose = verbose
+
+        all_markets, opening_times = self.maps.get_all_markets()
+        self.opening_times = {m: t.strftime("%H:%M") for m, t in zip(all_markets, opening_times)}
+
+    def normalise_profile(self, profile:dict) -> dict:
+        """
+        Fills in the defaults of a visitor profile.
+
+        A profile is a dict with the keys start_market (required), start_time ("HH:MM", defaults to the opening
+        time of the market), stay_time (defaults to 30), time_limit (defaults to the planner's) and max_days (defaults to 1).
+        """
+        start_market = profile["start_market"]
+        if start_market not in self.opening_times:
+            raise ValueError(f"Unknown market: {start_market}")
+        return {
+            "start_market": start_market,
+            "start_time": profile.get("start_time") or self.opening_times[start_market],
+            "stay_time": int(profile.get("stay_time", 30)),
+            "time_limit": profile.get("time_limit") or self.time_limit,
+            "max_days": int(profile.get("max_days", 1)),
+        }
+
+    def group_profiles(self, profiles:list[dict]) -> dict[tuple, dict[tuple[str, str], list[int]]]:
+        """
+        Groups normalised profiles that can be simulated in one optimizer.
+
+        Returns:
+            dict: (stay_time, time_limit, max_days) → {(start_market, start_time): [profile indices]}
+        """
+        groups = {}
+        for i, profile in enumerate(profiles):
+            key = (profile["stay_time"], profile["time_limit"], profile["max_days"])
+            start = (profile["start_market"], profile["start_time"])
+            groups.setdefault(key, {}).setdefault(start, []).append(i)
+        return groups
+
+    def plan(self, profiles:list[dict]) -> tuple[list[dict], dict]:
+        """
+        Plans one route per visitor profile.
+
+        Args:
+            profiles (list[dict]): The visitor profiles (see normalise_profile).
+
+        Returns:
+            tuple[list[dict], dict]: One route per profile (same order) and aggregate metrics
+                (profiles, groups, colonies, ant tours, seconds, profiles and tours per second).
+        """
+        started = time.perf_counter()
+        profiles = [self.normalise_profile(p) for p in profiles]
+        groups = self.group_profiles(profiles)
+
+        routes = [None] * len(profiles)
+        tours = 0
+        colonies = 0
+
+        for (stay_time, time_limit, max_days), starts in groups.items():
+            group_started = time.perf_counter()
+            self.maps.set_pheromones()  # every group learns its own pheromones
+
+            optimizer = Ant_Optimizer(
+                maps_service_objekt = self.maps,
+                num_colonies        = len(starts),
+                ants_per_colony     = self.ants_per_colony,
+                stay_time           = stay_time,
+                time_limit          = time_limit,
+                mutation            = self.mutation,
+                verbose             = 0,
+                ants_multiple_days  = max_days > 1,
+                max_days            = max_days
+            )
+            start_list = list(starts)
+            start_order = {start: i for i, start in enumerate(start_list)}
+            # one colony per start, sorted back into start_list order
+            optimizer.initialize_colonies([m for m, _ in start_list], [t for _, t in start_list])
+            optimizer.colonies.sort(key=lambda c: start_order[(c.start_market, c.start_time)])
+
+            # best ant per colony over all generations
+            best = [(float("-inf"), None)] * len(start_list)
+            for gen in range(self.generations):
+                optimizer.run_one_generation()
+                for i, colony in enumerate(optimizer.colonies):
+                    index = int(colony.fitness_values.argmax())
+                    if colony.fitness_values[index] > best[i][0]:
+                        best[i] = (float(colony.fitness_values[index]), colony.get_ant(index))
+                if gen != self.generations - 1:
+                    optimizer.advance_to_next_generation()
+
+            for (start, indices), (fitness, ant) in zip(starts.items(), best):
+                route = {
+                    "route": [
+                        (market, f"{minute // 60:02d}:{minute % 60:02d}")
+                        for market, minute in zip(ant.visited, ant.arrival_min) # type: ignore
+                    ],
+                    "visited": len(ant.visited), # type: ignore
+                    "days": ant.days, # type: ignore
+                    "fitness": fitness,
+                }
+                for i in indices:
+                    routes[i] = {**profiles[i], **route}
+
+            tours += len(start_list) * self.ants_per_colony * self.generations
+            colonies += len(start_list)
+            if self.verbose == 1:
+                print(f"Group stay {stay_time}, limit {time_limit}, days {max_days}: "
+                      f"{sum(len(i) for i in starts.values())} profiles, {len(start_list)} colonies, "
+                      f"{time.perf_counter() - group_started:.2f}s")
+
+        seconds = time.perf_counter() - started
+        metrics = {
+            "profiles": len(profiles),
+            "groups": len(groups),
+            "colonies": colonies,
+            "ant_tours": tours,
+            "seconds": seconds,
+            "profiles_per_second": len(profiles) / seconds if seconds > 0 else float("inf"),
+            "tours_per_second": tours / seconds if seconds > 0 else float("inf"),
+        }
+        return routes, metrics # type: ignore
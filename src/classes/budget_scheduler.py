@@ -0,0 +1,78 @@
+import numpy as np
+from .generation_stats import Generation_Stats
+
+class Budget_Scheduler:
+    def __init__(self, num_colonies:int, ants_per_colony:int, total_ants:int|None = None, min_ants:int = 2, exploration:float = 0.5):
+        """
+        Bandit-style allocation of ants to the colonies (start markets) of an Ant_Optimizer.
+
+        After every generation each colony gets an upper-confidence score: its best fitness so far, scaled to
+        [0, 1] over all colonies, plus an exploration bonus that shrinks with the number of tours it already got
+        (UCB1). The ants of the next generation are shared out in proportion to the scores. Every colony keeps
+        at least min_ants ants, so no start market is ever discarded and a late bloomer can win ants back.
+
+        Args:
+            num_colonies (int): The number of colonies.
+            ants_per_colony (int): The ants per colony of the uniform allocation (one "pull" of a colony).
+            total_ants (int | None, optional): The ants per generation over all colonies.
+                Defaults to num_colonies * ants_per_colony.
+            min_ants (int, optional): The minimum number of ants per colony. Defaults to 2.
+            exploration (float, optional): The weight of the exploration bonus. Defaults to 0.5.
+
+        Attributes:
+            best_fitness (np.ndarray): The best fitness every colony reached so far.
+            tours (np.ndarray): The number of tours every colony walked so far.
+            allocation (np.ndarray): The current number of ants per colony.
+        """
+        self.ants_per_colony = ants_per_colony
+        self.total_ants = total_ants if total_ants is not None else num_colonies * ants_per_colony
+        self.min_ants = min_ants
+        self.exploration = exploration
+        if self.total_ants < num_colonies * min_ants:
+            raise ValueError(f"total_ants must be at least {num_colonies * min_ants} for {num_colonies} colonies")
+
+        self.best_fitness = np.full(num_colonies, -np.inf)
+        self.tours = np.zeros(num_colonies, dtype=np.int64)
+        self.allocation = np.full(num_colonies, ants_per_colony, dtype=np.int64)
+
+    def update(self, stats:Generation_Stats, ants:np.ndarray):
+        """
+        Records the result of a generation.
+
+        Args:
+            stats (Generation_Stats): The statistics of the generation (colony order).
+            ants (np.ndarray): The number of ants every colony used in the generation.
+        """
+        self.best_fitness = np.maximum(self.best_fitness, stats.colony_max_fitness)
+        self.tours += ants
+
+    def scores(self) -> np.ndarray:
+        """
+        The upper-confidence score of every colony (observed value + exploration bonus).
+        """
+        spread = self.best_fitness.max() - self.best_fitness.min()
+        value = (self.best_fitness - self.best_fitness.min()) / spread if spread > 0 else np.zeros(len(self.tours))
+
+        pulls = np.maximum(self.tours / self.ants_per_colony, 1e-9)
+        total = max(pulls.sum(), 1.0)
+        return value + self.exploration * np.sqrt(np.log(total) / pulls)
+
+    def allocate(self) -> np.ndarray:
+        """
+        Computes the number of ants per colony for the next generation (largest remainder rounding).
+
+        Returns:
+            np.ndarray: The ants per colony, summing up to total_ants.
+        """
+        scores = self.scores()
+        spare = self.total_ants - self.min_ants * len(scores)
+        share = spare * scores / scores.sum() if scores.sum() > 0 else np.full(len(scores), spare / len(scores))
+
+        extra = np.floor(share).astype(np.int64)
+        remaining = spare - extra.sum()
+        if remaining > 0:
+            # stable order, ties go to the earlier colony
+            extra[np.argsort(-(share - extra), kind="stable")[:remaining]] += 1
+
+        self.allocation = self.min_ants + extra
+        return self.allocation
@@ -0,0 +1,141 @@
+import random
+import numpy as np
+from .google_maps import GoogleMaps
+from .tour_evaluator import to_minutes
+
+
+class Day_Planner:
+    def __init__(self,
+                 maps_service_objekt:GoogleMaps,
+                 stay_time:int = 30,
+                 time_limit:str = "23:00",
+                 alpha:float = 1.0,
+                 beta:float = 1.0,
+                 evaporation:float = 0.2,
+                 min_pheromone:float = 0.05):
+        """
+        Chooses where the ants start their next day (see Ant.move) instead of a random unvisited market.
+
+        A new day starts at an unvisited market m at its opening time, chosen with probability proportional to
+
+            start_pheromone[m] ** alpha * (1 + unvisited markets reachable from m that day) ** beta
+
+        The reachable markets come from the precomputed single-day reachability bitsets
+        (GoogleMaps.reachable_mask). The start pheromones are learned: after every generation (update) they
+        evaporate and every day start gets a deposit for the markets its day covered (averaged over
+        the day starts of the generation).
+
+        The planner also keeps the best day found so far for every start market (most markets, then the
+        earliest end). An ant starting a day there gets that day as DNA, so good days are reused across ants
+        and colonies.
+
+        Args:
+            maps_service_objekt (GoogleMaps): The graph.
+            stay_time (int, optional): The time spent at each market. Defaults to 30.
+            time_limit (str, optional): The latest departure from a market ("HH:MM"). Defaults to "23:00".
+            alpha (float, optional): The weight of the start pheromones. Defaults to 1.0.
+            beta (float, optional): The weight of the reachable markets. Defaults to 1.0.
+            evaporation (float, optional): The share of the start pheromones that evaporates per update. Defaults to 0.2.
+            min_pheromone (float, optional): Lower bound of the start pheromones, so no start is ruled out. Defaults to 0.05.
+
+        Attributes:
+            start_pheromone (np.ndarray): The learned pheromone of every market as a day start.
+            best_days (dict[int, tuple[int, int, list[int]]]): Per start market id the best day
+                (markets, end minute, market ids).
+        """
+        self.maps = maps_service_objekt
+        self.stay_time = stay_time
+        self.time_limit_min = to_minutes(time_limit)
+        self.alpha = alpha
+        self.beta = beta
+        self.evaporation = evaporation
+        self.min_pheromone = min_pheromone
+        self.start_pheromone = np.ones(len(self.maps.markets))
+        self.best_days = {}
+
+    def choose_start(self, visited_mask:int, markets:list[str], opening_times:list) -> int:
+        """
+        Chooses the start of the next day among the unvisited markets.
+
+        Args:
+            visited_mask (int): The visited markets of the ant (see Ant.visited_mask).
+            markets (list[str]): The unvisited markets.
+            opening_times (list): Their opening times (datetime.time), aligned with markets.
+
+        Returns:
+            int: The index of the chosen market in markets.
+        """
+        self._ensure_size()
+        weights = []
+        for market, opening in zip(markets, opening_times):
+            market_id = self.maps.market_index[market]
+            reachable = self.maps.reachable_mask(
+                market_id, opening.hour * 60 + opening.minute, self.stay_time, self.time_limit_min
+            )
+            unvisited = (reachable & ~visited_mask).bit_count()
+            weights.append(self.start_pheromone[market_id] ** self.alpha * (1 + unvisited) ** self.beta)
+        return random.choices(range(len(markets)), weights=weights, k=1)[0]
+
+    def day_dna(self, market:str) -> list[str]:
+        """
+        Returns the best known day starting at market (empty if there is none yet).
+        """
+        best = self.best_days.get(self.maps.market_index[market])
+        return self.maps.decode(best[2]) if best is not None else []
+
+    def update(self, colonies:list):
+        """
+        Learns from the tours of a generation: evaporates the start pheromones, deposits on every day start
+        that followed a finished day and keeps the best day per start market.
+
+        Args:
+            colonies (list[Ant_Colony]): The colonies that moved this generation.
+        """
+        self._ensure_size()
+        deposit = np.zeros(len(self.maps.markets))
+        starts = 0
+
+        for colony in colonies:
+            for i in range(colony.number_of_ants):
+                count = colony.visited_counts[i]
+                if count == 0:
+                    continue
+                tour = colony.tours[i, :count]
+                days = colony.tour_days[i, :count]
+                for day, (first, last) in enumerate(day_bounds(days)):
+                    start = int(tour[first])
+                    covered = last - first
+                    if day > 0:
+                        deposit[start] += covered
+                        starts += 1
+                    best = self.best_days.get(start)
+                    end = int(colony.arrival_min[i, last - 1])
+                    if best is None or (covered, -end) > (best[0], -best[1]):
+                        self.best_days[start] = (covered, end, tour[first:last].tolist())
+
+        self.start_pheromone *= 1 - self.evaporation
+        if starts:
+            self.start_pheromone += deposit / starts
+        np.maximum(self.start_pheromone, self.min_pheromone, out=self.start_pheromone)
+
+    def _ensure_size(self):
+        """
+        Extends the start pheromones if markets were added to the map (GoogleMaps.add_market).
+        """
+        missing = len(self.maps.markets) - len(self.start_pheromone)
+        if missing > 0:
+            self.start_pheromone = np.concatenate([self.start_pheromone, np.ones(missing)])
+
+
+def day_bounds(days:np.ndarray) -> list[tuple[int, int]]:
+    """
+    Splits a tour into its days.
+
+    Args:
+        days (np.ndarray): The day (0-based) of every visited market of the tour.
+
+    Returns:
+        list[tuple[int, int]]: The (first, end) positions of every day, end exclusive.
+    """
+    starts = np.flatnonzero(np.diff(days, prepend=-1) != 0).tolist()
+    return list(zip(starts, starts[1:] + [len(days)]))
@@ -0,0 +1,142 @@
+import numpy as np
+
+class Generation_Stats:
+    def __init__(
+        self,
+        generation:int,
+        colony_markets:list[str],
+        colony_avg_visited:np.ndarray,
+        colony_max_visited:np.ndarray,
+        colony_avg_fitness:np.ndarray,
+        colony_max_fitness:np.ndarray,
+        avg_fitness:float,
+        max_fitness:float,
+        best_path:list[tuple[str, str]],
+        best_fitness:float
+    ):
+        """
+        Aggregated statistics of one generation, computed by Ant_Optimizer.run_one_generation.
+
+        All per-colony arrays are aligned with colony_markets (one entry per colony).
+
+        Args:
+            generation (int): The generation of the optimizer when the statistics were taken.
+            colony_markets (list[str]): The start market of every colony.
+            colony_avg_visited (np.ndarray): The average number of visited markets per colony.
+            colony_max_visited (np.ndarray): The maximum number of visited markets per colony.
+            colony_avg_fitness (np.ndarray): The average fitness per colony.
+            colony_max_fitness (np.ndarray): The maximum fitness per colony.
+            avg_fitness (float): The average fitness over all ants.
+            max_fitness (float): The maximum fitness over all ants.
+            best_path (list[tuple[str, str]]): The edges of the best path of this generation.
+            best_fitness (float): The fitness of the best path.
+
+        Attributes:
+            ranking (np.ndarray): Colony indices sorted by average visited markets (best → worst).
+        """
+        self.generation = generation
+        self.colony_markets = colony_markets
+        self.colony_avg_visited = colony_avg_visited
+        self.colony_max_visited = colony_max_visited
+        self.colony_avg_fitness = colony_avg_fitness
+        self.colony_max_fitness = colony_max_fitness
+        self.avg_fitness = avg_fitness
+        self.max_fitness = max_fitness
+        self.best_path = best_path
+        self.best_fitness = best_fitness
+
+        # stable sort so ties keep the colony order
+        self.ranking = np.argsort(-colony_avg_visited, kind="stable")
+
+    def top_markets(self, cut_off:float) -> list[tuple[str, float]]:
+        """
+        Returns the best start markets by average visited markets, e.g. as culling candidates.
+
+        Args:
+            cut_off (float): The share of colonies to return (at least one).
+
+        Returns:
+            list[tuple[str, float]]: (start market, average visited) sorted best → worst.
+        """
+        cutoff_count = max(1, int(len(self.ranking) * cut_off))
+        return [
+            (self.colony_markets[i], float(self.colony_avg_visited[i]))
+            for i in self.ranking[:cutoff_count]
+        ]
+
+
+class Generation_History:
+    def __init__(self, markets:list[str], generations:int = 100):
+        """
+        Observer that records Generation_Stats into preallocated numeric arrays.
+
+        Register it with Ant_Optimizer.add_observer. If more generations are recorded than
+        preallocated, the arrays grow by doubling.
+
+        Args:
+            markets (list[str]): All markets, defines the columns of the per-market arrays.
+            generations (int, optional): The number of generations to preallocate. Defaults to 100.
+
+        Attributes:
+            avg_fitness (np.ndarray): Average fitness per generation.
+            max_fitness (np.ndarray): Maximum fitness per generation.
+            avg_visited (np.ndarray): generations × markets, average visited markets of the colonies
+                starting at that market, averaged over the colonies (NaN if there is no such colony).
+            max_visited (np.ndarray): generations × markets, maximum visited markets over those colonies.
+            count (int): The number of recorded generations.
+        """
+        self.markets = markets
+        self.market_index = {market: i for i, market in enumerate(markets)}
+        self.count = 0
+        self.avg_fitness = np.full(generations, np.nan)
+        self.max_fitness = np.full(generations, np.nan)
+        self.avg_visited = np.full((generations, len(markets)), np.nan)
+        self.max_visited = np.full((generations, len(markets)), np.nan)
+
+    def __call__(self, stats:Generation_Stats):
+        """
+        Records one generation.
+
+        Args:
+            stats (Generation_Stats): The statistics of the generation.
+        """
+        if self.count == len(self.avg_fitness):
+            self._grow()
+
+        row = self.count
+        self.avg_fitness[row] = stats.avg_fitness
+        self.max_fitness[row] = stats.max_fitness
+
+        # several colonies can share a start market (e.g. a batch with different start times)
+        columns = np.array([self.market_index[m] for m in stats.colony_markets], dtype=np.int64)
+        colonies = np.bincount(columns, minlength=len(self.markets))
+        started = colonies > 0
+        totals = np.bincount(columns, weights=stats.colony_avg_visited, minlength=len(self.markets))
+        self.avg_visited[row, started] = totals[started] / colonies[started]
+        max_visited = np.full(len(self.markets), -np.inf)
+        np.maximum.at(max_visited, columns, stats.colony_max_visited)
+        self.max_visited[row, started] = max_visited[started]
+        self.count += 1
+
+    def _grow(self):
+        size = max(1, 2 * len(self.avg_fitness))
+        grown = {}
+        for name in ("avg_fitness", "max_fitness", "avg_visited", "max_visited"):
+            old = getattr(self, name)
+            new = np.full((size,) + old.shape[1:], np.nan)
+            new[:len(old)] = old
+            grown[name] = new
+        self.__dict__.update(grown)
+
+    def market_series(self, history:np.ndarray, market:str) -> np.ndarray:
+        """
+        Returns the recorded values of one market column.
+
+        Args:
+            history (np.ndarray): avg_visited or max_visited.
+            market (str): The start market.
+
+        Returns:
+            np.ndarray: The values of the recorded generations (NaN where the market had no colony).
+        """
+        return history[:self.count, self.market_index[market]]
@@ -1,10 +1,29 @@
+import re
+import hashlib
+import numpy as np
 import pandas as pd
 from datetime import time
 from datetime import timedelta
 from pathlib import Path
+from .graph_store import save_graph_store, open_graph_store
+from .pheromone_recorder import Pheromone_Recorder
+
+# time-dependent travel time columns of the csv, 'duration_min_1400' = departures from 14:00 on
+BUCKET_COLUMN = re.compile(r"duration_min_(\d{2})(\d{2})")
+
+
+def bucket_column(start_min:int) -> str:
+    return f"duration_min_{start_min // 60:02d}{start_min % 60:02d}"
+
+
+def bucket_start(column:str) -> int:
+    hours, minutes = BUCKET_COLUMN.fullmatch(column).groups() # type: ignore
+    return int(hours) * 60 + int(minutes)
+
 
 class GoogleMaps:
-    def __init__(self, pheromone_decay_factor:float = 0.9, pheromone_constant:float = 1) -> None:
+    def __init__(self, pheromone_decay_factor:float = 0.9, pheromone_constant:float = 1,
+                 graph_store:str|Path|None = None) -> None:
         """
         Initialises the GoogleMaps object by reading the pairwise travel times from a csv file.
 
@@ -14,10 +33,48 @@ class GoogleMaps:
 
         The 'duration_walking_min' column should contain the duration of travel in minutes between each origin and destination.
 
+        Optional 'duration_min_HHMM' columns (e.g. 'duration_min_1400') give time-dependent travel times for departures
+        from HH:MM on (until the next bucket), see set_duration_buckets.
+
         The data will be stored in a pandas DataFrame object which can be accessed through the 'df' attribute.
 
+        If graph_store is given, the graph is instead opened from a columnar store written by save_graph_store.
+        The columns are memory mapped (shared between processes, open time independent of the graph size)
+        and df is only built when it is first accessed.
+
         """
-        
+        assert 0 <= pheromone_decay_factor <=1
+        self.decay_factor = pheromone_decay_factor
+        self.pheromone_constant = pheromone_constant
+        self.max_pheromone = 100
+
+        # graph version, incremented by every update (see set_opening_hours, add_edge, ...)
+        self.version = 0
+        self._graph_hash = None  # (version, hash)
+        # incremented whenever the pheromone values change (update_pheromones, set_pheromones)
+        self.pheromone_version = 0
+        # opt-in pheromone history (see record_pheromones)
+        self.pheromone_recorder = None
+
+        # shortest-path closure (see enable_closure)
+        self.closure_enabled = False
+        self.closure_next = None
+
+        # candidate lists of the ants (see enable_candidate_lists)
+        self.candidate_k = None
+        self.candidate_promoted = 0
+        # incremented whenever the candidate settings change, the graph version is left alone
+        self.candidate_version = 0
+        self._candidates = None  # ((version, pheromone_version, candidate_version), offsets, order, complete)
+        # (stay_time, time_limit_min, bucket_minutes) -> (version, bitmasks), see reachability
+        self._reachability = {}
+
+        if graph_store is None:
+            self._load_csv()
+        else:
+            self._open_graph_store(graph_store)
+
+    def _load_csv(self):
         # haven't found a better way to do this
         CSV_PATH = Path(__file__).resolve().parents[2] / "data" / "datapairwise_travel_times_simplified.csv"
 
@@ -29,12 +86,213 @@ class GoogleMaps:
         self.df["opens_min"] = self.df["opens"].apply(to_minutes)
         self.df["closes_min"] = self.df["closes"].apply(to_minutes)
 
-        self.df["pheromone"] = 1
-        assert 0 <= pheromone_decay_factor <=1
-        self.decay_factor = pheromone_decay_factor
-        self.pheromone_constant = pheromone_constant
-        self.max_pheromone = 100
-    
+        # integer ids for all markets (sorted by name, same order as get_all_markets).
+        # Ids are stable: removed markets keep their id, added markets are appended.
+        self.markets = sorted(set(self.df["origin"]) | set(self.df["destination"]))
+        self.market_index = {market: i for i, market in enumerate(self.markets)}
+
+        # opening hours per market id
+        hours = self.df.groupby("destination")[["opens_min", "closes_min"]].first().reindex(self.markets)
+        self.market_opens_min = hours["opens_min"].fillna(0).to_numpy(dtype=np.int32)
+        self.market_closes_min = hours["closes_min"].fillna(24 * 60 - 1).to_numpy(dtype=np.int32)
+        self.market_active = np.ones(len(self.markets), dtype=bool)
+
+        self.df["pheromone"] = 1.0
+        self._rebuild_edge_index()
+
+    def _open_graph_store(self, directory:str|Path):
+        arrays, markets, meta = open_graph_store(directory)
+        self._df = None  # built on first access of df
+        self._store = arrays
+
+        self.markets = list(markets)
+        self.market_index = {market: i for i, market in enumerate(self.markets)}
+        self.market_opens_min = arrays["market_opens_min"]
+        self.market_closes_min = arrays["market_closes_min"]
+        self.market_active = arrays["market_active"]
+
+        self.edge_origin = arrays["edge_origin"]
+        self.edge_destination = arrays["edge_destination"]
+        self.edge_duration = arrays["edge_duration"]
+        self.edge_opens = arrays["edge_opens"]
+        self.edge_closes = arrays["edge_closes"]
+        self.edge_virtual = np.zeros(len(self.edge_origin), dtype=bool)
+        self.edge_id = arrays["edge_id"]
+        self.edge_offsets = arrays["edge_offsets"]
+        self.edge_order = arrays["edge_order"]
+        self._set_bucket_arrays(arrays.get("duration_buckets"), arrays.get("edge_duration_buckets"))
+
+        # pheromones are the only per-process state
+        self.pheromone = np.ones(len(self.edge_origin), dtype=np.float64)
+        self._departure_windows = {}
+        self._graph_hash = (self.version, meta["graph_hash"])
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        The edges as a DataFrame (one row per edge, row = edge index of all edge arrays).
+        """
+        if self._df is None:
+            self._df = self._build_df()
+        return self._df
+
+    @df.setter
+    def df(self, value:pd.DataFrame):
+        self._df = value
+
+    def _build_df(self) -> pd.DataFrame:
+        """
+        Builds df from the (memory mapped) columns of a graph store.
+        """
+        names = np.asarray(self.markets, dtype=object)
+        distance = self._store["edge_distance"]
+        def to_times(minutes):
+            return [time(*divmod(int(m), 60)) for m in minutes]
+        return pd.DataFrame({
+            "origin": names[self.edge_origin],
+            "destination": names[self.edge_destination],
+            "mode": np.where(self._store["edge_transit"], "transit", "walking"),
+            "distance_meters": np.where(distance >= 0, distance, np.nan),
+            "opens": to_times(self.edge_opens),
+            "closes": to_times(self.edge_closes),
+            "duration_walking_min": np.asarray(self.edge_duration, dtype=np.int64),
+            "opens_min": np.asarray(self.edge_opens, dtype=np.int64),
+            "closes_min": np.asarray(self.edge_closes, dtype=np.int64),
+            "origin_id": np.asarray(self.edge_origin, dtype=np.int64),
+            "destination_id": np.asarray(self.edge_destination, dtype=np.int64),
+            **{
+                bucket_column(int(start)): np.asarray(self.edge_duration_buckets[:, b], dtype=np.int64) # type: ignore
+                for b, start in enumerate(self.duration_buckets if self.duration_buckets is not None else [])
+            },
+        })
+
+    def _rebuild_edge_index(self):
+        """
+        (Re)builds everything derived from the rows of df: market id columns, the edge-id matrix,
+        the edge attribute arrays and the outgoing edges per market. Clears the departure window cache.
+
+        Only needed after edges or markets were added or removed. Pheromones move with their rows:
+        if df has a 'pheromone' column it is taken over into the pheromone array.
+        """
+        self.df = self.df.reset_index(drop=True)
+        if "pheromone" in self.df:
+            self.pheromone = self.df.pop("pheromone").to_numpy(dtype=np.float64, copy=True)
+        self.df["origin_id"] = self.df["origin"].map(self.market_index).astype(int)
+        self.df["destination_id"] = self.df["destination"].map(self.market_index).astype(int)
+
+        # edge_id[i, j] is the row of the edge from market i to market j in df, -1 if there is none
+        self.edge_id = np.full((len(self.markets), len(self.markets)), -1, dtype=np.int32)
+        self.edge_id[self.df["origin_id"].to_numpy(), self.df["destination_id"].to_numpy()] = np.arange(len(self.df))
+
+        # edge attributes as arrays (index = row of df) for the hot path of the ants
+        self.edge_origin = self.df["origin_id"].to_numpy(dtype=np.int32)
+        self.edge_destination = self.df["destination_id"].to_numpy(dtype=np.int32)
+        self.edge_duration = self.df["duration_walking_min"].to_numpy(dtype=np.int32)
+        self.edge_opens = self.df["opens_min"].to_numpy(dtype=np.int32)
+        self.edge_closes = self.df["closes_min"].to_numpy(dtype=np.int32)
+        # time-dependent travel times, missing values (e.g. virtual edges) use the static duration
+        columns = sorted((c for c in self.df.columns if BUCKET_COLUMN.fullmatch(c)), key=bucket_start)
+        if columns:
+            durations = self.df[columns].to_numpy(dtype=np.float64)
+            durations = np.where(np.isnan(durations), self.edge_duration[:, None], durations)
+            self._set_bucket_arrays(np.array([bucket_start(c) for c in columns]), durations)
+        else:
+            self._set_bucket_arrays(None, None)
+        # True for the virtual edges of the shortest-path closure
+        if "virtual" in self.df:
+            self.edge_virtual = self.df["virtual"].fillna(False).to_numpy(dtype=bool)
+        else:
+            self.edge_virtual = np.zeros(len(self.df), dtype=bool)
+
+        # adjacency offsets: edge_order[edge_offsets[i]:edge_offsets[i+1]] are the edges leaving market i (in df order)
+        self.edge_order = np.argsort(self.edge_origin, kind="stable")
+        self.edge_offsets = np.zeros(len(self.markets) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_origin, minlength=len(self.markets)), out=self.edge_offsets[1:])
+
+        # (stay_time, bucket) -> (earliest, latest) departure per edge, see departure_windows
+        self._departure_windows = {}
+        self._reachability = {}
+
+    def _set_bucket_arrays(self, starts:np.ndarray|None, durations:np.ndarray|None):
+        """
+        Sets the time-dependent travel times: starts are the bucket start minutes (sorted), durations the
+        edges × buckets travel times (stored as int16, column-major so every bucket is one contiguous array).
+        """
+        if starts is None:
+            self.duration_buckets = None
+            self.edge_duration_buckets = None
+            self.minute_bucket = None
+            return
+        self.duration_buckets = np.asarray(starts, dtype=np.int16)
+        self.edge_duration_buckets = np.asfortranarray(durations, dtype=np.int16)
+        # bucket of every minute of the day, minutes before the first bucket use the first one
+        self.minute_bucket = (np.searchsorted(self.duration_buckets, np.arange(24 * 60), side="right") - 1).clip(0).astype(np.int8)
+
+    def set_duration_buckets(self, buckets:list[str]|None, durations:np.ndarray|None = None):
+        """
+        Sets time-dependent travel times: durations[e, b] is the travel time over edge e when departing between
+        buckets[b] and the next bucket (before the first bucket the first one applies).
+
+        The ants, solvers and Tour_Evaluator look the travel time up by departure minute; edge_duration stays the
+        static travel time (pheromone deposits, shortest paths). None removes the buckets. Pheromones are kept.
+
+        Args:
+            buckets (list[str] | None): The bucket start times ("HH:MM"), ascending.
+            durations (np.ndarray | None, optional): edges × buckets travel times in minutes (df order).
+        """
+        for column in [c for c in self.df.columns if BUCKET_COLUMN.fullmatch(c)]:
+            del self.df[column]
+        if buckets is not None:
+            starts = [self._parse_minutes(b) for b in buckets]
+            if starts != sorted(set(starts)):
+                raise ValueError("Buckets must be ascending")
+            durations = np.asarray(durations)
+            if durations.shape != (len(self.edge_origin), len(starts)):
+                raise ValueError(f"Expected durations of shape {(len(self.edge_origin), len(starts))}, got {durations.shape}")
+            for b, start in enumerate(starts):
+                self.df[bucket_column(start)] = durations[:, b]
+            self._set_bucket_arrays(np.array(starts), durations)
+        else:
+            self._set_bucket_arrays(None, None)
+        self._departure_windows = {}
+        self.version += 1
+        self._refresh_closure()
+
+    def durations_at(self, departure_min:int) -> np.ndarray:
+        """
+        Returns the travel time of every edge (df order) when departing at departure_min.
+
+        O(1): the static edge_duration, or the contiguous column of the departure's bucket.
+        """
+        if self.minute_bucket is None:
+            return self.edge_duration
+        return self.edge_duration_buckets[:, self.minute_bucket[min(departure_min, 24 * 60 - 1)]] # type: ignore
+
+    def travel_times(self, edges:np.ndarray, departure_min:np.ndarray|int) -> np.ndarray:
+        """
+        Returns the travel times over edges when departing at departure_min (element-wise, vectorized).
+        """
+        if self.minute_bucket is None:
+            return self.edge_duration[edges]
+        buckets = self.minute_bucket[np.clip(departure_min, 0, 24 * 60 - 1)]
+        return self.edge_duration_buckets[edges, buckets].astype(np.int64) # type: ignore
+
+    @property
+    def adjacency(self) -> np.ndarray:
+        """
+        adjacency[i, j] is True if there is a direct edge from market i to market j.
+        """
+        return self.edge_id >= 0
+
+    def out_edges(self, market_id:int) -> np.ndarray:
+        """
+        Returns the rows of all edges leaving a market (in df order).
+
+        Args:
+            market_id (int): The id of the market.
+        """
+        return self.edge_order[self.edge_offsets[market_id]:self.edge_offsets[market_id + 1]]
+
     def get_destinations(self, origin: str) -> dict[str, tuple[int, float, time, time]]:
         """
         Returns a dictionary containing the destinations and their respective travel times, pheromone values, opening and closing times for a given origin.
@@ -45,24 +303,72 @@ class GoogleMaps:
         Returns:
             dict[str, tuple[int, float, time, time]]: A dictionary containing the destinations as keys and tuples containing the duration, pheromone, opening and closing times as values.
         """
-        subset = self.df.loc[
-            self.df["origin"] == origin, 
-            ["destination", "duration_walking_min", "pheromone", "opens_min", "closes_min"]
-        ]
-    
+        if origin not in self.market_index:
+            return {}
+
         # Convert to dictionary: destination → (duration, pheromone, opens, closes)
         destinations = {
-            row["destination"]: (
-                int(row["duration_walking_min"]),
-                float(row["pheromone"]),
-                int(row["opens_min"]),
-                int(row["closes_min"]),
+            self.markets[self.edge_destination[edge]]: (
+                int(self.edge_duration[edge]),
+                float(self.pheromone[edge]),
+                int(self.edge_opens[edge]),
+                int(self.edge_closes[edge]),
             )
-            for _, row in subset.iterrows()
+            for edge in self.out_edges(self.market_index[origin])
         }
 
         return destinations
     
+    def departure_windows(self, stay_time:int, departure_min:int|None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the departure window of every edge for a given stay time.
+
+        Leaving the origin at minute d over edge e is feasible iff earliest[e] <= d <= latest[e], i.e. the ant
+        arrives after the destination opens and can stay stay_time minutes before it closes.
+        The arrays are computed once per stay time (and duration bucket) and shared by everyone using this object.
+
+        Args:
+            stay_time (int): The time spent at each market.
+            departure_min (int | None, optional): With duration buckets, the windows use the travel times of the
+                bucket of this departure (and are only valid for departures in that bucket). Defaults to None
+                (static travel times).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The earliest and latest departure minute per edge (in df order).
+        """
+        bucket = None
+        if departure_min is not None and self.minute_bucket is not None:
+            bucket = int(self.minute_bucket[min(departure_min, 24 * 60 - 1)])
+        windows = self._departure_windows.get((stay_time, bucket))
+        if windows is None:
+            durations = self.edge_duration if bucket is None else self.edge_duration_buckets[:, bucket] # type: ignore
+            earliest = self.edge_opens - durations
+            latest = self.edge_closes - stay_time - durations
+            windows = (earliest, latest)
+            self._departure_windows[(stay_time, bucket)] = windows
+        return windows
+
+    def feasible_edges(self, origin:str, departure_min:int, stay_time:int, candidates_only:bool = False) -> np.ndarray:
+        """
+        Returns the rows of all edges leaving origin that satisfy the opening hours when departing at departure_min.
+
+        Args:
+            origin (str): The market the ant leaves.
+            departure_min (int): The departure time in minutes.
+            stay_time (int): The time spent at each market.
+            candidates_only (bool, optional): Only check the candidate list of origin (see enable_candidate_lists).
+                Defaults to False.
+
+        Returns:
+            np.ndarray: The feasible edge rows (in df order).
+        """
+        if candidates_only:
+            edges = self.candidate_edges(self.market_index[origin])
+        else:
+            edges = self.out_edges(self.market_index[origin])
+        earliest, latest = self.departure_windows(stay_time, departure_min)
+        return edges[(earliest[edges] <= departure_min) & (latest[edges] >= departure_min)]
+
     def update_pheromones(self, paths: list[tuple[list[tuple[str, str]], float]]):
         """
         Update pheromones based on a list of (path, cost) tuples.
@@ -73,20 +379,146 @@ class GoogleMaps:
                    fitness = how many markets visited
         """
         # 1) Evaporation
-        self.df["pheromone"] *= self.decay_factor
+        self.pheromone_version += 1
+        self.pheromone *= self.decay_factor
 
-        # 2) Deposit
+        # 2) Deposit, collected for all paths and added in one go
+        edge_rows = []
+        deposits = []
         for edges, fitness in paths:
             deposit = self.pheromone_constant * fitness
             for (origin, destination) in edges:
-                self.df.loc[
-                    (self.df["origin"] == origin) &
-                    (self.df["destination"] == destination),
-                    "pheromone"
-                ] += deposit/ self.df.loc[
-                    (self.df["origin"] == origin) &
-                    (self.df["destination"] == destination),
-                    "duration_walking_min"]  
+                edge_rows.append(self.edge_id[self.market_index[origin], self.market_index[destination]])
+                deposits.append(deposit)
+
+        edge_rows = np.asarray(edge_rows, dtype=np.int64)
+        deposits = np.asarray(deposits, dtype=np.float64)
+        # pairs without a direct edge (start of a new day) get no pheromone
+        known = edge_rows >= 0
+        edge_rows, deposits = edge_rows[known], deposits[known]
+
+        np.add.at(self.pheromone, edge_rows, deposits / self.edge_duration[edge_rows])
+
+        if self.pheromone_recorder is not None:
+            self.pheromone_recorder.record(self.pheromone)
+
+    def record_pheromones(self, capacity:int = 256, top_k:int = 10) -> Pheromone_Recorder:
+        """
+        Starts recording the pheromones after every update_pheromones (see Pheromone_Recorder).
+
+        Args:
+            capacity (int, optional): The number of pheromone arrays kept. Defaults to 256.
+            top_k (int, optional): The number of strongest edges for the top_k_share metric. Defaults to 10.
+
+        Returns:
+            Pheromone_Recorder: The recorder, it stays readable after stop_recording_pheromones.
+        """
+        self.pheromone_recorder = Pheromone_Recorder(len(self.edge_origin), capacity, top_k)
+        return self.pheromone_recorder
+
+    def stop_recording_pheromones(self):
+        """
+        Stops the pheromone recording.
+        """
+        self.pheromone_recorder = None
+
+    def get_pheromones(self) -> np.ndarray:
+        """
+        Returns a copy of the pheromone values of all edges (in the row order of df).
+        """
+        return self.pheromone.copy()
+
+    def set_pheromones(self, pheromones:np.ndarray|None = None):
+        """
+        Replaces the pheromone values of all edges, e.g. to restore a saved state.
+
+        Args:
+            pheromones (np.ndarray | None, optional): One value per edge in the row order of df.
+                None resets all pheromones to 1. Defaults to None.
+        """
+        self.pheromone_version += 1
+        if pheromones is None:
+            self.pheromone = np.ones(len(self.edge_origin), dtype=np.float64)
+            return
+        if len(pheromones) != len(self.edge_origin):
+            raise ValueError(f"Expected {len(self.edge_origin)} pheromone values, got {len(pheromones)}")
+        self.pheromone = np.array(pheromones, dtype=np.float64)
+
+    def remap_pheromones(self, pheromones:np.ndarray, origin:np.ndarray, destination:np.ndarray) -> np.ndarray:
+        """
+        Maps pheromones saved on an older version of the graph onto the current edges.
+
+        Market ids never change (removed markets keep theirs), so the edges are matched by (origin, destination).
+        Edges that no longer exist are dropped, new edges start at 1.
+
+        Args:
+            pheromones (np.ndarray): The saved pheromone values.
+            origin (np.ndarray): The origin market id of every saved value (edge_origin at the time).
+            destination (np.ndarray): The destination market id of every saved value.
+
+        Returns:
+            np.ndarray: One value per current edge (in the row order of df).
+        """
+        remapped = np.ones(len(self.edge_origin), dtype=np.float64)
+        rows = self.edge_id[origin, destination]
+        kept = rows >= 0
+        remapped[rows[kept]] = np.asarray(pheromones)[kept]
+        return remapped
+
+    def graph_hash(self) -> str:
+        """
+        Returns a hash of the graph (markets, edges, durations and opening hours).
+
+        Pheromone arrays are stored in the row order of df, so they can only be reused on a graph with the same hash.
+        The hash is cached until the next update.
+        """
+        if self._graph_hash is None or self._graph_hash[0] != self.version:
+            content = hashlib.sha1("\n".join(self.markets).encode("utf-8"))
+            for column in (self.edge_origin, self.edge_destination, self.edge_duration, self.edge_opens, self.edge_closes):
+                content.update(np.ascontiguousarray(column, dtype=np.int32).tobytes())
+            if self.duration_buckets is not None:
+                content.update(np.ascontiguousarray(self.duration_buckets, dtype=np.int32).tobytes())
+                content.update(np.ascontiguousarray(self.edge_duration_buckets, dtype=np.int32).tobytes())
+            self._graph_hash = (self.version, content.hexdigest())
+        return self._graph_hash[1]
+
+    def save_graph_store(self, directory:str|Path):
+        """
+        Writes the graph in the columnar on-disk format that GoogleMaps(graph_store=directory) opens memory mapped.
+
+        Pheromones are not part of the store (see Pheromone_Library).
+
+        Args:
+            directory (str | Path): The directory to write to.
+        """
+        if self.closure_enabled:
+            raise ValueError("Disable the shortest-path closure before saving the graph")
+        if self._df is None:
+            distance = self._store["edge_distance"]
+            transit = self._store["edge_transit"]
+        else:
+            distance = self.df["distance_meters"].fillna(-1).to_numpy()
+            transit = (self.df["mode"] == "transit").to_numpy()
+
+        arrays = {
+            "edge_origin": self.edge_origin,
+            "edge_destination": self.edge_destination,
+            "edge_duration": self.edge_duration,
+            "edge_opens": self.edge_opens,
+            "edge_closes": self.edge_closes,
+            "edge_distance": distance,
+            "edge_transit": transit,
+            "market_opens_min": self.market_opens_min,
+            "market_closes_min": self.market_closes_min,
+            "market_active": self.market_active,
+            "edge_offsets": self.edge_offsets,
+            "edge_order": self.edge_order,
+            "edge_id": self.edge_id,
+        }
+        if self.duration_buckets is not None:
+            arrays["duration_buckets"] = self.duration_buckets
+            arrays["edge_duration_buckets"] = self.edge_duration_buckets
+        save_graph_store(arrays, self.markets, self.graph_hash(), directory)
 
     def get_all_markets(self, visited_markets:list[str]|None = None) -> tuple[list[str], list[time]]:
         """
@@ -95,9 +527,473 @@ class GoogleMaps:
         - A list of the corresponding opening times for each market in the same order as the markets list as time objects
         """
 
-        grouped = self.df.groupby("destination")["opens"].first()
+        ids = np.flatnonzero(self.market_active)
         if visited_markets is not None:
-            grouped = grouped[~grouped.index.isin(visited_markets)]
-        all_markets = grouped.index.tolist()
-        opening_times = grouped.tolist()
-        return all_markets, opening_times
\ No newline at end of file
+            visited = set(visited_markets)
+            ids = [i for i in ids if self.markets[i] not in visited]
+        all_markets = [self.markets[i] for i in ids]
+        opening_times = [time(*divmod(int(self.market_opens_min[i]), 60)) for i in ids]
+        return all_markets, opening_times
+
+    def encode(self, markets: list[str]) -> list[int]:
+        """
+        Converts a list of market names into their integer ids.
+
+        Args:
+            markets (list[str]): The market names.
+
+        Returns:
+            list[int]: The market ids in the same order.
+        """
+        return [self.market_index[m] for m in markets]
+
+    def decode(self, market_ids) -> list[str]:
+        """
+        Converts a sequence of integer market ids back into market names.
+
+        Args:
+            market_ids (Iterable[int]): The market ids.
+
+        Returns:
+            list[str]: The market names in the same order.
+        """
+        return [self.markets[i] for i in market_ids]
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _parse_minutes(t:str) -> int:
+        h, m = map(int, t.split(":"))
+        return h * 60 + m
+
+    def _refresh_windows(self, rows:np.ndarray):
+        """
+        Recomputes the cached departure windows of the given edges only.
+        """
+        for (stay_time, bucket), (earliest, latest) in self._departure_windows.items():
+            durations = self.edge_duration[rows] if bucket is None else self.edge_duration_buckets[rows, bucket] # type: ignore
+            earliest[rows] = self.edge_opens[rows] - durations
+            latest[rows] = self.edge_closes[rows] - stay_time - durations
+
+    def set_opening_hours(self, market:str, opens:str|None = None, closes:str|None = None):
+        """
+        Changes the opening and/or closing time of a market in place (e.g. a market closes early).
+
+        Only the edges into the market are touched, pheromones are kept.
+
+        Args:
+            market (str): The market.
+            opens (str | None, optional): The new opening time ("HH:MM"). Defaults to None (unchanged).
+            closes (str | None, optional): The new closing time ("HH:MM"). Defaults to None (unchanged).
+        """
+        i = self.market_index[market]
+        if opens is not None:
+            self.market_opens_min[i] = self._parse_minutes(opens)
+        if closes is not None:
+            self.market_closes_min[i] = self._parse_minutes(closes)
+
+        rows = np.flatnonzero(self.edge_destination == i)
+        opens_min, closes_min = int(self.market_opens_min[i]), int(self.market_closes_min[i])
+        self.df.loc[rows, "opens_min"] = opens_min
+        self.df.loc[rows, "closes_min"] = closes_min
+        self.df.loc[rows, "opens"] = time(*divmod(opens_min, 60))
+        self.df.loc[rows, "closes"] = time(*divmod(closes_min, 60))
+        self.edge_opens[rows] = opens_min
+        self.edge_closes[rows] = closes_min
+        self._refresh_windows(rows)
+        self.version += 1
+
+    def set_duration(self, origin:str, destination:str, minutes:int):
+        """
+        Changes the travel time of an existing edge in place (in all duration buckets). Pheromones are kept.
+
+        Args:
+            origin (str): The origin market.
+            destination (str): The destination market.
+            minutes (int): The new travel time in minutes.
+        """
+        row = self.edge_id[self.market_index[origin], self.market_index[destination]]
+        if row < 0 or self.edge_virtual[row]:
+            raise ValueError(f"No edge from {origin} to {destination}")
+        self.df.loc[row, "duration_walking_min"] = minutes
+        self.edge_duration[row] = minutes
+        if self.edge_duration_buckets is not None:
+            for start in self.duration_buckets: # type: ignore
+                self.df.loc[row, bucket_column(int(start))] = minutes
+            self.edge_duration_buckets[row] = minutes
+        self._refresh_windows(np.array([row]))
+        self.version += 1
+        self._refresh_closure()
+
+    def add_edge(self, origin:str, destination:str, minutes:int, mode:str = "walking",
+                 distance_meters:int|None = None, pheromone:float = 1.0):
+        """
+        Adds a new edge (or changes the travel time if it already exists).
+
+        The pheromones of all other edges are kept.
+
+        Args:
+            origin (str): The origin market.
+            destination (str): The destination market.
+            minutes (int): The travel time in minutes.
+            mode (str, optional): The travel mode. Defaults to "walking".
+            distance_meters (int | None, optional): The distance. Defaults to None.
+            pheromone (float, optional): The initial pheromone of the edge. Defaults to 1.0.
+        """
+        i, j = self.market_index[origin], self.market_index[destination]
+        if self.edge_id[i, j] >= 0 and not self.edge_virtual[self.edge_id[i, j]]:
+            self.set_duration(origin, destination, minutes)
+            return
+        if not (self.market_active[i] and self.market_active[j]):
+            raise ValueError(f"Cannot add an edge to a removed market ({origin} → {destination})")
+
+        opens_min, closes_min = int(self.market_opens_min[j]), int(self.market_closes_min[j])
+        row = {
+            "origin": origin,
+            "destination": destination,
+            "mode": mode,
+            "distance_meters": distance_meters,
+            "opens": time(*divmod(opens_min, 60)),
+            "closes": time(*divmod(closes_min, 60)),
+            "duration_walking_min": minutes,
+            "opens_min": opens_min,
+            "closes_min": closes_min,
+            "pheromone": pheromone,
+        }
+        self.df["pheromone"] = self.pheromone
+        # the real edge replaces a virtual one
+        self.df = self.df[~((self.df["origin"] == origin) & (self.df["destination"] == destination))]
+        self.df = pd.concat([self.df, pd.DataFrame([row])], ignore_index=True)
+        self._rebuild_edge_index()
+        self.version += 1
+        self._refresh_closure()
+
+    def remove_edge(self, origin:str, destination:str):
+        """
+        Removes an edge (e.g. a tram line is down). The pheromones of all other edges are kept.
+
+        Args:
+            origin (str): The origin market.
+            destination (str): The destination market.
+        """
+        row = self.edge_id[self.market_index[origin], self.market_index[destination]]
+        if row < 0 or self.edge_virtual[row]:
+            raise ValueError(f"No edge from {origin} to {destination}")
+        self.df["pheromone"] = self.pheromone
+        self.df = self.df.drop(index=row)
+        self._rebuild_edge_index()
+        self.version += 1
+        self._refresh_closure()
+
+    def add_market(self, market:str, opens:str, closes:str):
+        """
+        Adds a new market without edges, connect it with add_edge.
+
+        The market gets the next free id, existing ids and pheromones are unchanged.
+
+        Args:
+            market (str): The name of the market.
+            opens (str): The opening time ("HH:MM").
+            closes (str): The closing time ("HH:MM").
+        """
+        if market in self.market_index:
+            i = self.market_index[market]
+            if self.market_active[i]:
+                raise ValueError(f"Market {market} already exists")
+            # re-opening a removed market
+            self.market_active[i] = True
+            self.set_opening_hours(market, opens, closes)
+            return
+
+        self.market_index[market] = len(self.markets)
+        self.markets.append(market)
+        self.market_opens_min = np.append(self.market_opens_min, self._parse_minutes(opens)).astype(np.int32)
+        self.market_closes_min = np.append(self.market_closes_min, self._parse_minutes(closes)).astype(np.int32)
+        self.market_active = np.append(self.market_active, True)
+        self._rebuild_edge_index()
+        self.version += 1
+        self._refresh_closure()
+
+    def remove_market(self, market:str):
+        """
+        Removes a market and all its edges. The market keeps its id (so stored tours stay decodable)
+        but is no longer returned by get_all_markets. The pheromones of all other edges are kept.
+
+        Args:
+            market (str): The market to remove.
+        """
+        i = self.market_index[market]
+        self.df["pheromone"] = self.pheromone
+        self.df = self.df[(self.df["origin"] != market) & (self.df["destination"] != market)]
+        self.market_active[i] = False
+        self._rebuild_edge_index()
+        self.version += 1
+        self._refresh_closure()
+
+    # ------------------------------------------------------------------
+    # Reachability
+    # ------------------------------------------------------------------
+    def reachability(self, stay_time:int, time_limit_min:int, bucket_minutes:int = 30) -> list[list[int]]:
+        """
+        Returns which markets can still be reached from a market, per arrival time bucket, as bitsets.
+
+        masks[m][b] has bit j set if market j can be reached (over any number of moves, visited markets
+        ignored) when arriving at market m at minute b * bucket_minutes. Bucket starts stand in for every
+        arrival in the bucket before them (see reachable_mask), travel times are those of the departure
+        (duration buckets). Computed backwards over the buckets, vectorized over the edges, and cached
+        until the graph changes.
+
+        Args:
+            stay_time (int): The time spent at each market.
+            time_limit_min (int): The latest departure from a market in minutes.
+            bucket_minutes (int, optional): The width of the arrival time buckets. Defaults to 30.
+
+        Returns:
+            list[list[int]]: The bitsets (Python ints, like Ant.visited_mask) per market and bucket.
+        """
+        key = (stay_time, time_limit_min, bucket_minutes)
+        cached = self._reachability.get(key)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        n = len(self.markets)
+        buckets = -(-24 * 60 // bucket_minutes) + 1
+        reach = np.zeros((buckets + 1, n, n), dtype=bool)  # bucket index `buckets` = after the day, nothing reachable
+        earliest, latest = self.departure_windows(stay_time)
+        destination_bits = np.eye(n, dtype=bool)[self.edge_destination]
+
+        for b in range(buckets - 1, -1, -1):
+            departure = b * bucket_minutes + stay_time
+            if departure > time_limit_min:
+                continue
+            if self.minute_bucket is not None:
+                earliest, latest = self.departure_windows(stay_time, departure)
+            edges = np.flatnonzero((earliest <= departure) & (latest >= departure))
+            if len(edges) == 0:
+                continue
+            arrival = departure + self.travel_times(edges, departure)
+            # the next state is the first bucket start at or after the arrival
+            next_bucket = np.minimum(-(-arrival // bucket_minutes), buckets)
+            reached = destination_bits[edges] | reach[next_bucket, self.edge_destination[edges]]
+            np.logical_or.at(reach[b], self.edge_origin[edges], reached)
+
+        packed = np.packbits(reach[:buckets], axis=2, bitorder="little")
+        masks = [[int.from_bytes(packed[b, m].tobytes(), "little") for b in range(buckets)] for m in range(n)]
+        self._reachability[key] = (self.version, masks)
+        return masks
+
+    def reachable_mask(self, market_id:int, arrival_min:int, stay_time:int, time_limit_min:int, bucket_minutes:int = 30) -> int:
+        """
+        Returns the bitset of the markets that can still be reached after arriving at a market (see reachability).
+
+        The arrival is rounded up to the next bucket start, so later arrivals in a bucket are judged like the
+        latest one.
+        """
+        masks = self.reachability(stay_time, time_limit_min, bucket_minutes)[market_id]
+        bucket = -(-arrival_min // bucket_minutes)
+        return masks[bucket] if bucket < len(masks) else 0
+
+    # ------------------------------------------------------------------
+    # Candidate lists
+    # ------------------------------------------------------------------
+    def enable_candidate_lists(self, k:int = 5, promoted:int = 2):
+        """
+        Lets the ants look at a short candidate list per market first (see Ant.evaluate_possibilities).
+
+        The list of a market holds its k fastest out-edges plus the promoted out-edges with the most pheromone
+        that are not among them. Ants only scan all out-edges when no candidate is feasible.
+        The lists are rebuilt on first use after the pheromones (update_pheromones, set_pheromones) or the
+        graph changed.
+
+        Args:
+            k (int, optional): The fastest out-edges per market. Defaults to 5.
+            promoted (int, optional): The pheromone-promoted out-edges per market. Defaults to 2.
+        """
+        self.candidate_k = k
+        self.candidate_promoted = promoted
+        self._candidates = None
+        self.candidate_version += 1  # cached option lists depend on the candidates
+
+    def disable_candidate_lists(self):
+        """
+        Lets the ants scan all out-edges again.
+        """
+        self.candidate_k = None
+        self.candidate_promoted = 0
+        self._candidates = None
+        self.candidate_version += 1
+
+    @staticmethod
+    def _first_per_group(groups:np.ndarray, count:int) -> np.ndarray:
+        """
+        Mask of the first count entries of every run of equal values in groups (sorted).
+        """
+        starts = np.searchsorted(groups, groups, side="left")
+        return np.arange(len(groups)) - starts < count
+
+    def _build_candidates(self):
+        origin = self.edge_origin
+        # k fastest out-edges per market
+        order = np.lexsort((self.edge_duration, origin))
+        selected = np.zeros(len(origin), dtype=bool)
+        selected[order[self._first_per_group(origin[order], self.candidate_k)]] = True # type: ignore
+
+        # strongest pheromones among the remaining out-edges
+        if self.candidate_promoted > 0:
+            rest = np.flatnonzero(~selected)
+            rest = rest[np.lexsort((-self.pheromone[rest], origin[rest]))]
+            selected[rest[self._first_per_group(origin[rest], self.candidate_promoted)]] = True
+
+        # grouped by origin in df order like out_edges, so a list holding all out-edges behaves like the full scan
+        candidates = np.flatnonzero(selected)
+        candidates = candidates[np.argsort(origin[candidates], kind="stable")]
+        offsets = np.zeros(len(self.markets) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origin[candidates], minlength=len(self.markets)), out=offsets[1:])
+        # markets whose list holds all their out-edges, a full scan would not find more
+        complete = np.diff(offsets) == np.diff(self.edge_offsets)
+        self._candidates = (self._candidate_state(), offsets, candidates, complete)
+
+    def _candidate_state(self) -> tuple[int, int, int]:
+        return (self.version, self.pheromone_version, self.candidate_version)
+
+    def candidate_edges(self, market_id:int) -> np.ndarray:
+        """
+        Returns the candidate list (edge rows) of a market, all its out-edges if candidate lists are disabled.
+        """
+        if self.candidate_k is None:
+            return self.out_edges(market_id)
+        if self._candidates is None or self._candidates[0] != self._candidate_state():
+            self._build_candidates()
+        _, offsets, candidates, _ = self._candidates # type: ignore
+        return candidates[offsets[market_id]:offsets[market_id + 1]]
+
+    def candidate_list_complete(self, market_id:int) -> bool:
+        """
+        True if the candidate list of a market holds all its out-edges (or candidate lists are disabled).
+        """
+        if self.candidate_k is None:
+            return True
+        self.candidate_edges(market_id)  # rebuilds stale lists
+        return bool(self._candidates[3][market_id]) # type: ignore
+
+    # ------------------------------------------------------------------
+    # Shortest-path closure
+    # ------------------------------------------------------------------
+    def shortest_paths(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        All-pairs shortest travel times over the real edges (vectorized Floyd–Warshall on the id arrays).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: distance[i, j] in minutes (inf if unreachable) and next_hop[i, j],
+                the market after i on a shortest path to j (-1 if unreachable).
+        """
+        n = len(self.markets)
+        real = ~self.edge_virtual
+        origins, destinations = self.edge_origin[real], self.edge_destination[real]
+
+        distance = np.full((n, n), np.inf)
+        distance[origins, destinations] = self.edge_duration[real]
+        np.fill_diagonal(distance, 0)
+        next_hop = np.full((n, n), -1, dtype=np.int32)
+        next_hop[origins, destinations] = destinations
+        next_hop[np.arange(n), np.arange(n)] = np.arange(n)
+
+        for k in range(n):
+            via = distance[:, k, None] + distance[None, k, :]
+            shorter = via < distance
+            distance = np.where(shorter, via, distance)
+            next_hop = np.where(shorter, next_hop[:, k, None], next_hop)
+        return distance, next_hop
+
+    def enable_closure(self):
+        """
+        Adds a virtual edge for every market pair that has no direct edge but is reachable over other markets.
+
+        The virtual edge has the shortest travel time over the pruned graph and the opening hours of its
+        destination. The markets in between are only passed through (not visited), see expand_route.
+        Ants, pheromones and breeding treat virtual edges like real ones, so every reachable market is an option.
+        The closure is recomputed after every update of durations, edges or markets.
+        """
+        self.closure_enabled = True
+        self._refresh_closure()
+        self.version += 1
+
+    def disable_closure(self):
+        """
+        Removes all virtual edges. The pheromones of the real edges are kept.
+        """
+        self.closure_enabled = False
+        self._drop_virtual_edges()
+        self.closure_next = None
+        self.version += 1
+
+    def _drop_virtual_edges(self):
+        if not self.edge_virtual.any():
+            return
+        self.df["pheromone"] = self.pheromone
+        self.df = self.df[~self.edge_virtual].drop(columns=["virtual"])
+        self._rebuild_edge_index()
+
+    def _refresh_closure(self):
+        """
+        Recomputes the virtual edges, keeping the pheromones of virtual edges that still exist.
+        """
+        if not self.closure_enabled:
+            return
+        virtual = np.flatnonzero(self.edge_virtual)
+        saved = dict(zip(zip(self.edge_origin[virtual].tolist(), self.edge_destination[virtual].tolist()),
+                         self.pheromone[virtual]))
+        self._drop_virtual_edges()
+
+        distance, self.closure_next = self.shortest_paths()
+        active = self.market_active[:, None] & self.market_active[None, :]
+        origins, destinations = np.nonzero(np.isfinite(distance) & (self.edge_id < 0) & active)
+        keep = origins != destinations
+        origins, destinations = origins[keep], destinations[keep]
+
+        opens = self.market_opens_min[destinations]
+        closes = self.market_closes_min[destinations]
+        rows = pd.DataFrame({
+            "origin": [self.markets[i] for i in origins],
+            "destination": [self.markets[j] for j in destinations],
+            "mode": "via",
+            "distance_meters": np.nan,
+            "opens": [time(*divmod(int(m), 60)) for m in opens],
+            "closes": [time(*divmod(int(m), 60)) for m in closes],
+            "duration_walking_min": distance[origins, destinations].astype(np.int64),
+            "opens_min": opens.astype(np.int64),
+            "closes_min": closes.astype(np.int64),
+            "pheromone": [saved.get((i, j), 1.0) for i, j in zip(origins.tolist(), destinations.tolist())],
+            "virtual": True,
+        })
+        self.df["pheromone"] = self.pheromone
+        self.df["virtual"] = False
+        self.df = pd.concat([self.df, rows], ignore_index=True)
+        self._rebuild_edge_index()
+
+    def expand_route(self, markets:list[str]) -> list[str]:
+        """
+        Expands a route that may use virtual edges into the sequence of markets actually passed.
+
+        Consecutive markets joined by a real edge (or a new day start without any edge) are kept as they are.
+
+        Args:
+            markets (list[str]): The visited markets of a route.
+
+        Returns:
+            list[str]: The route including the pass-through markets of virtual edges.
+        """
+        if not markets:
+            return []
+        expanded = [markets[0]]
+        for origin, destination in zip(markets[:-1], markets[1:]):
+            i, j = self.market_index[origin], self.market_index[destination]
+            row = self.edge_id[i, j]
+            if row >= 0 and self.edge_virtual[row] and self.closure_next is not None:
+                while i != j:
+                    i = int(self.closure_next[i, j])
+                    expanded.append(self.markets[i])
+            else:
+                expanded.append(destination)
+        return expanded
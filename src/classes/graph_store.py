@@ -0,0 +1,96 @@
+import json
+import numpy as np
+from pathlib import Path
+
+# edge columns of the store, one .npy file each (index = edge row)
+EDGE_COLUMNS = {
+    "edge_origin": np.int32,
+    "edge_destination": np.int32,
+    "edge_duration": np.int32,
+    "edge_opens": np.int32,
+    "edge_closes": np.int32,
+    "edge_distance": np.int32,   # -1 if unknown
+    "edge_transit": np.bool_,    # True if the edge uses public transport
+}
+# market columns (index = market id)
+MARKET_COLUMNS = {
+    "market_opens_min": np.int32,
+    "market_closes_min": np.int32,
+    "market_active": np.bool_,
+}
+# adjacency: edge_order[edge_offsets[i]:edge_offsets[i+1]] are the rows of the edges leaving market i,
+# edge_id[i, j] is the row of the edge i → j (-1 if there is none)
+INDEX_COLUMNS = {
+    "edge_offsets": np.int64,
+    "edge_order": np.int64,
+    "edge_id": np.int32,
+}
+# time-dependent travel times (see GoogleMaps.set_duration_buckets), only stored if the graph has them
+OPTIONAL_COLUMNS = {
+    "duration_buckets": np.int16,
+    "edge_duration_buckets": np.int16,  # edges × buckets
+}
+FORMAT_VERSION = 1
+
+
+def save_graph_store(arrays:dict[str, np.ndarray], markets:list[str], graph_hash:str, directory:str|Path):
+    """
+    Writes a graph in the columnar on-disk format: one .npy file per column plus markets.json
+    (market id table) and meta.json.
+
+    Args:
+        arrays (dict[str, np.ndarray]): All EDGE_COLUMNS, MARKET_COLUMNS and INDEX_COLUMNS (and optionally OPTIONAL_COLUMNS).
+        markets (list[str]): The market names, index = market id.
+        graph_hash (str): The hash of the graph (see GoogleMaps.graph_hash).
+        directory (str | Path): The directory to write to (created if missing).
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    columns = {**EDGE_COLUMNS, **MARKET_COLUMNS, **INDEX_COLUMNS}
+    for name, dtype in columns.items():
+        np.save(directory / f"{name}.npy", np.ascontiguousarray(arrays[name], dtype=dtype))
+    for name, dtype in OPTIONAL_COLUMNS.items():
+        path = directory / f"{name}.npy"
+        if name in arrays:
+            # column-major keeps every bucket contiguous when mapped
+            np.save(path, np.asfortranarray(arrays[name], dtype=dtype))
+        elif path.exists():
+            path.unlink()
+
+    (directory / "markets.json").write_text(json.dumps(markets, ensure_ascii=False))
+    (directory / "meta.json").write_text(json.dumps({
+        "format_version": FORMAT_VERSION,
+        "num_markets": len(markets),
+        "num_edges": int(len(arrays["edge_origin"])),
+        "graph_hash": graph_hash,
+    }, indent=2))
+
+
+def open_graph_store(directory:str|Path, mmap_mode:str = "c") -> tuple[dict[str, np.ndarray], list[str], dict]:
+    """
+    Opens a graph written by save_graph_store without reading the columns into memory.
+
+    All columns are memory mapped, so processes opening the same store share the physical pages
+    and the open time does not depend on the graph size. The default copy-on-write mode ("c") lets
+    a process change its mapping (e.g. GoogleMaps.set_duration) without touching the file or other processes.
+
+    Args:
+        directory (str | Path): The store directory.
+        mmap_mode (str, optional): Passed to np.load. Defaults to "c".
+
+    Returns:
+        tuple: (arrays by column name, market names, meta data)
+    """
+    directory = Path(directory)
+    meta = json.loads((directory / "meta.json").read_text())
+    if meta["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported graph store version {meta['format_version']}")
+
+    columns = {**EDGE_COLUMNS, **MARKET_COLUMNS, **INDEX_COLUMNS}
+    arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in columns} # type: ignore
+    for name in OPTIONAL_COLUMNS:
+        if (directory / f"{name}.npy").exists():
+            arrays[name] = np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) # type: ignore
+    markets = json.loads((directory / "markets.json").read_text())
+    return arrays, markets, meta
@@ -0,0 +1,385 @@
+import queue
+import random
+import secrets
+import socket
+import threading
+import time
+import traceback
+import multiprocessing as mp
+from multiprocessing.connection import Listener, Client
+import numpy as np
+from .google_maps import GoogleMaps
+from .ant_optimizer import Ant_Optimizer
+
+
+class Queue_Channel:
+    def __init__(self, inbox, outbox):
+        """
+        Message channel of an island over multiprocessing queues (islands on one machine).
+
+        Args:
+            inbox (multiprocessing.Queue): The messages sent to this island.
+            outbox (multiprocessing.Queue): The inbox of the next island.
+        """
+        self.inbox = inbox
+        self.outbox = outbox
+
+    def send(self, message:dict):
+        self.outbox.put(message)
+
+    def receive(self) -> list[dict]:
+        """
+        Returns all waiting messages without blocking.
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        # migration is best effort, do not block the exit on messages the next island never reads
+        self.outbox.cancel_join_thread()
+
+
+class Tcp_Channel:
+    def __init__(self, listen_address:tuple[str, int], send_address:tuple[str, int], authkey:bytes):
+        """
+        Message channel of an island over TCP (multiprocessing.connection), so islands can run on several machines.
+
+        The island listens on listen_address, a background thread collects the incoming messages. Messages are
+        sent to the island at send_address, the connection is opened on the first send. Migration is best
+        effort: if the next island is not reachable (yet), the message is dropped.
+
+        Messages are pickled, so anyone who knows the key can run code on the island: use a secret key
+        (Island_Model.run generates one per run) and do not expose the port to untrusted networks.
+
+        Args:
+            listen_address (tuple[str, int]): The (host, port) this island listens on.
+            send_address (tuple[str, int]): The (host, port) of the next island.
+            authkey (bytes): The shared secret key of all islands (at least 16 bytes).
+        """
+        if len(authkey) < 16:
+            raise ValueError("authkey must be a secret of at least 16 bytes")
+        self.send_address = send_address
+        self.authkey = authkey
+        self.inbox = queue.Queue()
+        self._connection = None
+        self._listener = Listener(listen_address, authkey=authkey)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._read, args=(connection,), daemon=True).start()
+
+    def _read(self, connection):
+        try:
+            while True:
+                self.inbox.put(connection.recv())
+        except (EOFError, OSError):
+            connection.close()
+
+    def send(self, message:dict):
+        try:
+            if self._connection is None:
+                self._connection = Client(self.send_address, authkey=self.authkey)
+            self._connection.send(message)
+        except OSError:
+            self._connection = None
+
+    def receive(self) -> list[dict]:
+        """
+        Returns all waiting messages without blocking.
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+        self._listener.close()
+
+
+def free_tcp_addresses(count:int, host:str = "127.0.0.1") -> list[tuple[str, int]]:
+    """
+    Returns count (host, port) addresses with ports that are free at the moment, for local Tcp_Channels.
+    """
+    sockets = []
+    for _ in range(count):
+        s = socket.socket()
+        s.bind((host, 0))
+        sockets.append(s)
+    addresses = [s.getsockname() for s in sockets]
+    for s in sockets:
+        s.close()
+    return addresses
+
+
+def run_island(island:int, settings:dict, channel, start_wall:float) -> dict:
+    """
+    Runs one island: an Ant_Optimizer with its own graph and pheromones, exchanging migrants over channel.
+
+    Every migration_interval generations the island sends its best tour and a pheromone summary (the
+    summary_share strongest edges) to the next island. Incoming messages are read after every generation
+    without waiting, so the islands never synchronise: the pheromones of the summarised edges are blended
+    with weight pheromone_weight and the tour is seeded as DNA into the colonies with its start market.
+    Messages of a different graph (graph_hash) are ignored.
+
+    Args:
+        island (int): The island number (also offsets the random seed).
+        settings (dict): The settings of Island_Model (see Island_Model.settings).
+        channel (Queue_Channel | Tcp_Channel): The message channel.
+        start_wall (float): time.time() at the start of the run, the deadline and history are relative to it.
+
+    Returns:
+        dict: island, generations, ant_tours, best_fitness, best_markets, sent, received and
+            history [(seconds since start_wall, best fitness, ant tours)] after every generation.
+    """
+    random.seed(settings["seed"] + island)
+    maps = GoogleMaps(graph_store=settings["graph_store"]) if settings["graph_store"] else GoogleMaps()
+    graph_hash = maps.graph_hash()
+
+    optimizer = Ant_Optimizer(
+        maps_service_objekt = maps,
+        num_colonies        = settings["num_colonies"],
+        ants_per_colony     = settings["ants_per_colony"],
+        stay_time           = settings["stay_time"],
+        time_limit          = settings["time_limit"],
+        mutation            = settings["mutation"],
+        verbose             = 0,
+        ants_multiple_days  = settings["max_days"] > 1,
+        max_days            = settings["max_days"]
+    )
+    all_markets, opening_times = maps.get_all_markets()
+    optimizer.initialize_colonies(all_markets, opening_times)
+
+    num_summary = max(1, int(len(maps.edge_origin) * settings["summary_share"]))
+    deadline = start_wall + settings["seconds"] if settings["seconds"] is not None else None
+    best_fitness, best_markets = float("-inf"), []
+    history = []
+    sent = received = generations = 0
+
+    while True:
+        optimizer.run_one_generation()
+        generations += 1
+        stats = optimizer.last_stats
+        if stats.best_fitness > best_fitness and stats.best_path: # type: ignore
+            best_fitness = float(stats.best_fitness) # type: ignore
+            best_markets = [stats.best_path[0][0]] + [d for _, d in stats.best_path] # type: ignore
+        history.append((time.time() - start_wall, best_fitness, optimizer.ant_tours))
+
+        if deadline is not None and time.time() >= deadline:
+            break
+        if settings["generations"] is not None and generations >= settings["generations"]:
+            break
+
+        optimizer.advance_to_next_generation()
+
+        # immigrants, seeded into the bred generation
+        for message in channel.receive():
+            if message["graph_hash"] != graph_hash:
+                continue
+            received += 1
+            pheromones = maps.get_pheromones()
+            edges = message["edges"]
+            weight = settings["pheromone_weight"]
+            pheromones[edges] = (1 - weight) * pheromones[edges] + weight * message["pheromones"]
+            maps.set_pheromones(pheromones)
+            for colony in optimizer.colonies:
+                if message["markets"] and colony.start_market == message["markets"][0]:
+                    colony.seed_dna(message["markets"])
+
+        if generations % settings["migration_interval"] == 0 and best_markets:
+            pheromones = maps.pheromone
+            edges = np.argpartition(pheromones, -num_summary)[-num_summary:]
+            channel.send({
+                "island": island,
+                "generation": generations,
+                "graph_hash": graph_hash,
+                "markets": best_markets,
+                "fitness": best_fitness,
+                "edges": edges,
+                "pheromones": pheromones[edges].copy(),
+            })
+            sent += 1
+
+    channel.close()
+    return {
+        "island": island,
+        "generations": generations,
+        "ant_tours": optimizer.ant_tours,
+        "best_fitness": best_fitness,
+        "best_markets": best_markets,
+        "sent": sent,
+        "received": received,
+        "history": history,
+    }
+
+
+def _island_process(island:int, settings:dict, channel_spec:tuple, start_wall:float, results):
+    # always report back, so Island_Model.run never waits for an island that failed
+    try:
+        if channel_spec[0] == "tcp":
+            _, listen_address, send_address, authkey = channel_spec
+            channel = Tcp_Channel(listen_address, send_address, authkey)
+        else:
+            _, inbox, outbox = channel_spec
+            channel = Queue_Channel(inbox, outbox)
+        results.put(run_island(island, settings, channel, start_wall))
+    except BaseException:
+        results.put({"island": island, "error": traceback.format_exc()})
+
+
+class Island_Model:
+    def __init__(self,
+                 num_islands:int = 4,
+                 num_colonies:int = 10,
+                 ants_per_colony:int = 20,
+                 stay_time:int = 30,
+                 time_limit:str = "23:00",
+                 mutation:int = 3,
+                 max_days:int = 1,
+                 migration_interval:int = 5,
+                 summary_share:float = 0.1,
+                 pheromone_weight:float = 0.5,
+                 channel:str = "queue",
+                 graph_store:str|None = None,
+                 seed:int = 42):
+        """
+        Runs several Ant_Optimizers ("islands") in separate processes, connected in a ring.
+
+        Every island has its own graph, colonies and pheromones, so there is no barrier between the islands;
+        every migration_interval generations an island sends its best tour and a summary of its pheromones to
+        the next one (see run_island).
+
+        Args:
+            num_islands (int, optional): The number of islands (processes). Defaults to 4.
+            num_colonies (int, optional): The colonies per island. Defaults to 10.
+            ants_per_colony (int, optional): The ants per colony. Defaults to 20.
+            stay_time (int, optional): The time spent at each market. Defaults to 30.
+            time_limit (str, optional): The time limit of the ants. Defaults to "23:00".
+            mutation (int, optional): The mutation type of the ants. Defaults to 3.
+            max_days (int, optional): The maximum number of days. Defaults to 1.
+            migration_interval (int, optional): Generations between two migrations. Defaults to 5.
+            summary_share (float, optional): The share of the strongest edges sent as pheromone summary. Defaults to 0.1.
+            pheromone_weight (float, optional): The weight of received pheromones when blending. Defaults to 0.5.
+            channel (str, optional): "queue" (multiprocessing queues) or "tcp" (local TCP, see Tcp_Channel). Defaults to "queue".
+            graph_store (str | None, optional): Open the graph from this store (see GoogleMaps) instead of the csv. Defaults to None.
+            seed (int, optional): The random seed, island i uses seed + i. Defaults to 42.
+        """
+        if channel not in ("queue", "tcp"):
+            raise ValueError(f"Unknown channel: {channel}")
+        self.num_islands = num_islands
+        self.channel = channel
+        self.settings = {
+            "num_colonies": num_colonies,
+            "ants_per_colony": ants_per_colony,
+            "stay_time": stay_time,
+            "time_limit": time_limit,
+            "mutation": mutation,
+            "max_days": max_days,
+            "migration_interval": migration_interval,
+            "summary_share": summary_share,
+            "pheromone_weight": pheromone_weight,
+            "graph_store": graph_store,
+            "seed": seed,
+        }
+
+    def run(self, seconds:float|None = 10, generations:int|None = None) -> dict:
+        """
+        Runs all islands until the wall-clock budget or the number of generations is reached.
+
+        Args:
+            seconds (float | None, optional): The wall-clock budget (including the start of the processes). Defaults to 10.
+            generations (int | None, optional): The generations per island. Defaults to None.
+
+        If an island fails (raises or its process dies), the other islands are terminated and a RuntimeError
+        is raised.
+
+        Returns:
+            dict: best_fitness, best_markets, ant_tours, seconds, tours_per_second, the merged
+                best_fitness_history [(seconds, best fitness over all islands)] and the results of every
+                island (see run_island).
+        """
+        if seconds is None and generations is None:
+            raise ValueError("Give seconds or generations")
+        settings = {**self.settings, "seconds": seconds, "generations": generations}
+
+        results = mp.Queue()
+        if self.channel == "tcp":
+            addresses = free_tcp_addresses(self.num_islands)
+            authkey = secrets.token_bytes(32)
+            specs = [("tcp", addresses[i], addresses[(i + 1) % self.num_islands], authkey) for i in range(self.num_islands)]
+        else:
+            inboxes = [mp.Queue() for _ in range(self.num_islands)]
+            specs = [("queue", inboxes[i], inboxes[(i + 1) % self.num_islands]) for i in range(self.num_islands)]
+
+        start_wall = time.time()
+        processes = [
+            mp.Process(target=_island_process, args=(i, settings, specs[i], start_wall, results))
+            for i in range(self.num_islands)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            islands = sorted(self._collect(processes, results), key=lambda r: r["island"])
+        except BaseException:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+            raise
+        for process in processes:
+            process.join()
+        elapsed = time.time() - start_wall
+
+        # best fitness over all islands at every point in time an island finished a generation
+        events = sorted((t, fitness) for island in islands for t, fitness, _ in island["history"])
+        history = list(zip([t for t, _ in events], np.maximum.accumulate([f for _, f in events]).tolist()))
+
+        best = max(islands, key=lambda r: r["best_fitness"])
+        tours = sum(island["ant_tours"] for island in islands)
+        return {
+            "best_fitness": best["best_fitness"],
+            "best_markets": best["best_markets"],
+            "ant_tours": tours,
+            "seconds": elapsed,
+            "tours_per_second": tours / elapsed if elapsed > 0 else float("inf"),
+            "best_fitness_history": history,
+            "islands": islands,
+        }
+
+    @staticmethod
+    def _collect(processes:list, results, poll_seconds:float = 1.0) -> list[dict]:
+        """
+        Waits for the result of every island. Raises RuntimeError as soon as an island reports an error
+        or its process exited without a result.
+        """
+        collected = {}
+        while len(collected) < len(processes):
+            try:
+                result = results.get(timeout=poll_seconds)
+            except queue.Empty:
+                for island, process in enumerate(processes):
+                    if island not in collected and process.exitcode is not None:
+                        # the result may still be on its way through the queue
+                        try:
+                            result = results.get(timeout=poll_seconds)
+                        except queue.Empty:
+                            raise RuntimeError(f"Island {island} exited with code {process.exitcode} without a result")
+                        break
+                else:
+                    continue
+            if "error" in result:
+                raise RuntimeError(f"Island {result['island']} failed:\n{result['error']}")
+            collected[result["island"]] = result
+        return list(collected.values())
@@ -0,0 +1,128 @@
+import os
+import tracemalloc
+from .generation_stats import Generation_Stats
+
+# component -> source file, allocations are attributed to the innermost frame in one of these files
+COMPONENT_FILES = {
+    "Ant": "ant.py",
+    "Ant_Colony": "ant_colony.py",
+    "Ant_Optimizer": "ant_optimizer.py",
+    "GoogleMaps": "google_maps.py",
+    "driver": "main.py",
+}
+
+class Memory_Profiler:
+    def __init__(self, generations:list[int]|None = None, every:int|None = None, nframes:int = 25):
+        """
+        Opt-in memory instrumentation for optimizer runs, based on tracemalloc.
+
+        Register it as an observer (Ant_Optimizer.add_observer) and call start() before the run.
+        At the selected generations a snapshot is taken and the live memory is attributed to Ant, Ant_Colony,
+        Ant_Optimizer, GoogleMaps, the driver loop (main.py) or "other", using the innermost frame of each
+        allocation that lies in one of these files.
+
+        Args:
+            generations (list[int] | None, optional): Generations (1-based, as printed by test_1) to snapshot. Defaults to None.
+            every (int | None, optional): Additionally snapshot every n-th generation. Defaults to None (only generations,
+                or every generation if both are None).
+            nframes (int, optional): Traceback depth stored by tracemalloc. Defaults to 25.
+
+        Attributes:
+            rows (list[tuple[int, int, int, dict[str, int]]]): (generation, current, peak, bytes per component) per snapshot.
+        """
+        self.generations = set(generations or [])
+        self.every = every if (every is not None or generations) else 1
+        self.nframes = nframes
+        self.rows = []
+        self._started_here = False
+
+    def start(self):
+        """
+        Starts tracing (if not already running) and resets the peak.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+            self._started_here = True
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        """
+        Stops tracing if this profiler started it.
+        """
+        if self._started_here:
+            tracemalloc.stop()
+            self._started_here = False
+
+    def wants(self, generation:int) -> bool:
+        return generation in self.generations or (self.every is not None and generation % self.every == 0)
+
+    def __call__(self, stats:Generation_Stats):
+        """
+        Observer hook, snapshots the selected generations.
+        """
+        generation = stats.generation + 1
+        if tracemalloc.is_tracing() and self.wants(generation):
+            self.snapshot(generation)
+
+    def snapshot(self, generation:int):
+        """
+        Takes a snapshot and records current/peak memory and the live bytes per component.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+
+        by_component = {name: 0 for name in COMPONENT_FILES}
+        by_component["other"] = 0
+        for stat in snapshot.statistics("traceback"):
+            by_component[self._component(stat.traceback)] += stat.size
+
+        self.rows.append((generation, current, peak, by_component))
+
+    @staticmethod
+    def _component(traceback) -> str:
+        # frames are ordered from the oldest to the most recent call
+        for frame in reversed(traceback):
+            name = os.path.basename(frame.filename)
+            for component, file_name in COMPONENT_FILES.items():
+                if name == file_name:
+                    return component
+        return "other"
+
+    def report(self) -> str:
+        """
+        Formats the snapshots: peak, current and live bytes per component with the delta to the previous snapshot.
+        """
+        if not self.rows:
+            return "No memory snapshots taken.\n"
+
+        components = list(self.rows[0][3])
+        lines = [f"Peak traced memory: {max(peak for _, _, peak, _ in self.rows) / 1024:.1f} KiB", ""]
+        header = f"{'gen':>5} {'current KiB':>12} {'peak KiB':>10}" + "".join(f" {c:>16}" for c in components)
+        lines.append(header)
+        lines.append("-" * len(header))
+
+        previous = None
+        for generation, current, peak, by_component in self.rows:
+            cells = []
+            for c in components:
+                kib = by_component[c] / 1024
+                if previous is None:
+                    cells.append(f" {kib:>16.1f}")
+                else:
+                    delta = (by_component[c] - previous[c]) / 1024
+                    cells.append(f" {f'{kib:.1f} ({delta:+.1f})':>16}")
+            lines.append(f"{generation:>5} {current / 1024:>12.1f} {peak / 1024:>10.1f}" + "".join(cells))
+            previous = by_component
+
+        lines.append("")
+        lines.append("Component columns: live KiB (delta to the previous snapshot).")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path:str):
+        """
+        Writes the report to a text file.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report())
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from .google_maps import GoogleMaps
+
+class Option_Cache:
+    def __init__(self, maps_service_objekt:GoogleMaps, max_size:int = 4096):
+        """
+        Bounded LRU cache of the option lists of Ant.evaluate_possibilities.
+
+        The options after leaving a market only depend on the market, the departure minute and the visited
+        markets (for fixed stay time and time limit), so ants of a colony that share a tour prefix can reuse
+        them. The key is (market id, departure minute, visited bitmask). An entry is [options, weights], where
+        the weights of the pheromone rule are filled in by the first ant that needs them.
+        All entries are dropped when the pheromones, the graph or the candidate lists change
+        (GoogleMaps.pheromone_version / version / candidate_version).
+
+        Args:
+            maps_service_objekt (GoogleMaps): The graph the options are computed on.
+            max_size (int, optional): The maximum number of entries. Defaults to 4096.
+
+        Attributes:
+            hits (int): Lookups served from the cache.
+            misses (int): Lookups that were not cached.
+            evictions (int): Entries dropped because the cache was full.
+            invalidations (int): Times the cache was cleared because pheromones, graph or candidate lists changed.
+        """
+        self.maps = maps_service_objekt
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._state = (self.maps.version, self.maps.pheromone_version, self.maps.candidate_version)
+
+    def _check_state(self):
+        state = (self.maps.version, self.maps.pheromone_version, self.maps.candidate_version)
+        if state != self._state:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self._state = state
+
+    def get(self, key:tuple[int, int, int]) -> list|None:
+        """
+        Returns the cached [options, weights] entry of a state, None if it is not cached.
+        """
+        self._check_state()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key:tuple[int, int, int], options:list) -> list:
+        """
+        Stores the options of a state and returns the new [options, weights] entry.
+        """
+        entry = [options, None]
+        self.entries[key] = entry
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns the hit-rate statistics (hits, misses, hit_rate, size, evictions, invalidations).
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
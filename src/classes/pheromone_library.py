@@ -0,0 +1,114 @@
+import json
+import numpy as np
+from pathlib import Path
+from .google_maps import GoogleMaps
+
+class Pheromone_Library:
+    def __init__(self, directory:str|Path|None = None):
+        """
+        Persistent store of final pheromone arrays for warm-starting new optimisations.
+
+        Every entry is keyed by (graph hash, stay_time, time_limit, mutation, max_days).
+        The arrays are stored as .npy files next to an index.json holding the keys.
+
+        Args:
+            directory (str | Path | None, optional): Where the library is stored. Defaults to data/pheromone_library.
+        """
+        if directory is None:
+            directory = Path(__file__).resolve().parents[2] / "data" / "pheromone_library"
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+
+        # file name -> key (as dict)
+        self.index = {}
+        if self.index_path.exists():
+            self.index = json.loads(self.index_path.read_text())
+
+    @staticmethod
+    def make_key(graph_hash:str, stay_time:int, time_limit:str, mutation:int, max_days:int) -> dict:
+        """
+        Builds the key of an entry.
+        """
+        return {
+            "graph_hash": graph_hash,
+            "stay_time": int(stay_time),
+            "time_limit": time_limit,
+            "mutation": int(mutation),
+            "max_days": int(max_days),
+        }
+
+    @staticmethod
+    def _file_name(key:dict) -> str:
+        limit = key["time_limit"].replace(":", "")
+        return f"{key['graph_hash'][:12]}_s{key['stay_time']}_t{limit}_m{key['mutation']}_d{key['max_days']}.npy"
+
+    def store(self, maps:GoogleMaps, stay_time:int, time_limit:str, mutation:int, max_days:int,
+              pheromones:np.ndarray|None = None):
+        """
+        Stores a pheromone array, replacing an existing entry with the same key.
+
+        Args:
+            maps (GoogleMaps): The graph the pheromones belong to.
+            stay_time (int): The stay time of the run.
+            time_limit (str): The time limit of the run ("HH:MM").
+            mutation (int): The mutation type of the run.
+            max_days (int): The multi-day limit of the run.
+            pheromones (np.ndarray | None, optional): The pheromones to store. Defaults to the current pheromones of maps.
+        """
+        if pheromones is None:
+            pheromones = maps.get_pheromones()
+        key = self.make_key(maps.graph_hash(), stay_time, time_limit, mutation, max_days)
+        name = self._file_name(key)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        np.save(self.directory / name, np.asarray(pheromones, dtype=np.float64))
+        self.index[name] = key
+        self.index_path.write_text(json.dumps(self.index, indent=2))
+
+    @staticmethod
+    def distance(a:dict, b:dict) -> float:
+        """
+        Distance between two keys of the same graph, used for the nearest-neighbour lookup.
+
+        One unit is 30 minutes stay time, 60 minutes time limit, a different mutation type or one day.
+        """
+        def to_minutes(t):
+            h, m = map(int, t.split(":"))
+            return h * 60 + m
+        return (
+            abs(a["stay_time"] - b["stay_time"]) / 30
+            + abs(to_minutes(a["time_limit"]) - to_minutes(b["time_limit"])) / 60
+            + (a["mutation"] != b["mutation"])
+            + abs(a["max_days"] - b["max_days"])
+        )
+
+    def lookup(self, maps:GoogleMaps, stay_time:int, time_limit:str, mutation:int, max_days:int,
+               max_distance:float|None = None) -> tuple[np.ndarray, dict, float] | None:
+        """
+        Finds the stored pheromones for the given parameters, or the nearest stored parameter set of the same graph.
+
+        Args:
+            maps (GoogleMaps): The graph to find pheromones for.
+            stay_time (int): The stay time.
+            time_limit (str): The time limit ("HH:MM").
+            mutation (int): The mutation type.
+            max_days (int): The multi-day limit.
+            max_distance (float | None, optional): Ignore entries farther away than this. Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, dict, float] | None: (pheromones, key of the entry, distance), None if nothing matches.
+        """
+        wanted = self.make_key(maps.graph_hash(), stay_time, time_limit, mutation, max_days)
+
+        best_name, best_distance = None, float("inf")
+        for name, key in self.index.items():
+            if key["graph_hash"] != wanted["graph_hash"]:
+                continue
+            d = self.distance(wanted, key)
+            if d < best_distance:
+                best_name, best_distance = name, d
+
+        if best_name is None or (max_distance is not None and best_distance > max_distance):
+            return None
+        pheromones = np.load(self.directory / best_name)
+        return pheromones, self.index[best_name], best_distance
@@ -0,0 +1,112 @@
+import numpy as np
+from pathlib import Path
+
+# summary metrics computed after every pheromone update
+METRICS = ["entropy", "top_k_share", "min", "max", "total"]
+
+
+class Pheromone_Recorder:
+    def __init__(self, num_edges:int, capacity:int = 256, top_k:int = 10):
+        """
+        Records the pheromones after every GoogleMaps.update_pheromones (see GoogleMaps.record_pheromones).
+
+        The last capacity pheromone arrays are kept in a preallocated float32 ring buffer (capacity × edges).
+        For every update the summary metrics are stored for the whole run:
+
+        - entropy: Shannon entropy of the pheromone distribution, divided by log(edges)
+          (1 = uniform, towards 0 = the mass concentrates on few edges).
+        - top_k_share: the share of the total pheromone on the top_k strongest edges.
+        - min, max, total: of the pheromone array.
+
+        Every record is a few vectorized O(edges) passes; no Python objects are created per edge.
+
+        Args:
+            num_edges (int): The number of edges of the graph.
+            capacity (int, optional): The number of pheromone arrays kept. Defaults to 256.
+            top_k (int, optional): The number of strongest edges for top_k_share. Defaults to 10.
+
+        Attributes:
+            updates (int): The number of recorded updates.
+        """
+        self.capacity = capacity
+        self.top_k = top_k
+        self.updates = 0
+        self._buffer = np.zeros((capacity, num_edges), dtype=np.float32)
+        self._update_of_slot = np.full(capacity, -1, dtype=np.int64)
+        self._metrics = np.zeros((len(METRICS), 64), dtype=np.float64)
+
+    def record(self, pheromone:np.ndarray):
+        """
+        Stores one pheromone array and its summary metrics.
+
+        If the number of edges changed (edges added or removed), the stored arrays are dropped, the metrics are kept.
+        """
+        if len(pheromone) != self._buffer.shape[1]:
+            self._buffer = np.zeros((self.capacity, len(pheromone)), dtype=np.float32)
+            self._update_of_slot.fill(-1)
+
+        slot = self.updates % self.capacity
+        self._buffer[slot] = pheromone
+        self._update_of_slot[slot] = self.updates
+
+        if self.updates == self._metrics.shape[1]:
+            self._metrics = np.concatenate([self._metrics, np.zeros_like(self._metrics)], axis=1)
+
+        total = float(pheromone.sum())
+        k = min(self.top_k, len(pheromone))
+        top = np.partition(pheromone, len(pheromone) - k)[len(pheromone) - k:].sum() if k > 0 else 0.0
+        if total > 0 and len(pheromone) > 1:
+            share = pheromone / total
+            positive = share[share > 0]
+            entropy = float(-(positive * np.log(positive)).sum() / np.log(len(pheromone)))
+        else:
+            entropy = 0.0
+
+        column = self._metrics[:, self.updates]
+        column[:] = (entropy, top / total if total > 0 else 0.0, pheromone.min(), pheromone.max(), total)
+        self.updates += 1
+
+    def metric(self, name:str) -> np.ndarray:
+        """
+        Returns a summary metric (see METRICS) for every recorded update.
+        """
+        return self._metrics[METRICS.index(name), :self.updates].copy()
+
+    def snapshots(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the kept pheromone arrays, oldest first.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The update numbers (0-based) and the arrays (updates × edges, float32).
+        """
+        slots = np.flatnonzero(self._update_of_slot >= 0)
+        slots = slots[np.argsort(self._update_of_slot[slots])]
+        return self._update_of_slot[slots], self._buffer[slots]
+
+    def save(self, path:str|Path):
+        """
+        Writes the metrics and the kept pheromone arrays to a compressed .npz file.
+        """
+        updates, arrays = self.snapshots()
+        np.savez_compressed(
+            path,
+            snapshot_updates=updates,
+            snapshots=arrays,
+            **{name: self.metric(name) for name in METRICS}
+        )
+
+    def plot(self, names:list[str]|None = None, axes=None):
+        """
+        Plots the summary metrics over the updates, one axis per metric.
+        """
+        import matplotlib.pyplot as plt
+        names = names or ["entropy", "top_k_share", "max"]
+        if axes is None:
+            _, axes = plt.subplots(len(names), 1, figsize=(8, 2.5 * len(names)), sharex=True, squeeze=False)
+            axes = axes[:, 0]
+        x = np.arange(1, self.updates + 1)
+        for ax, name in zip(axes, names):
+            ax.plot(x, self.metric(name), marker="o")
+            ax.set_ylabel(name)
+        axes[-1].set_xlabel("Pheromone update")
+        return axes
@@ -0,0 +1,151 @@
+import copy
+import threading
+import numpy as np
+from collections import OrderedDict
+from .google_maps import GoogleMaps
+from .tour_evaluator import Tour_Evaluator, to_minutes
+
+
+class Route_Cache:
+    def __init__(self, maps_service_objekt:GoogleMaps, max_size:int = 256, tolerance_min:int = 15):
+        """
+        Bounded LRU cache of planned routes, in front of the optimizer of Route_Planning_Service.
+
+        A query is normalised to (start market, start minute, stay time, time limit minute, max days, engine);
+        the time budget is not part of it. A query is answered from the cache
+
+        - as a hit if the same query was planned before,
+        - as a reuse if a single-day route was planned for the same query with a start time at most
+          tolerance_min minutes away and that route is still feasible from the new start time. All such routes
+          are checked in one batch with the Tour_Evaluator (same rules as the ants) and the feasible one with
+          the best fitness is returned with its arrival times and fitness for the new start.
+
+        All entries are dropped when the graph changes (GoogleMaps.version). Results are deep-copied in and out,
+        so callers can change them without touching the cache. Thread-safe.
+
+        Args:
+            maps_service_objekt (GoogleMaps): The graph the routes were planned on.
+            max_size (int, optional): The maximum number of routes. Defaults to 256.
+            tolerance_min (int, optional): The maximum start time difference for reusing a route. Defaults to 15.
+
+        Attributes:
+            hits (int): Queries answered with the route of the same query.
+            reuses (int): Queries answered with a feasible route of a nearby start time.
+            misses (int): Queries that had to be planned.
+            evictions (int): Routes dropped because the cache was full.
+            invalidations (int): Times the cache was cleared because the graph changed.
+        """
+        self.maps = maps_service_objekt
+        self.max_size = max_size
+        self.tolerance_min = tolerance_min
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.reuses = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._version = self.maps.version
+        self._lock = threading.Lock()
+
+    def _check_state(self):
+        if self.maps.version != self._version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self._version = self.maps.version
+
+    def get(self, start_market:str, start_time:str, stay_time:int, time_limit:str, max_days:int,
+            engine:str) -> tuple[str, dict]|None:
+        """
+        Looks up a query.
+
+        Returns:
+            tuple[str, dict] | None: ("hit" or "reuse", route result as stored by put, for a reuse with the route,
+                visited and fitness of the new start time), None on a miss.
+        """
+        start_min = to_minutes(start_time)
+        query = (start_market, stay_time, to_minutes(time_limit), max_days, engine)
+        with self._lock:
+            self._check_state()
+            result = self.entries.get(query + (start_min,))
+            if result is not None:
+                self.entries.move_to_end(query + (start_min,))
+                self.hits += 1
+                return "hit", copy.deepcopy(result)
+
+            if max_days == 1:
+                found = self._reuse(query, start_min, start_time, stay_time, time_limit)
+                if found is not None:
+                    self.reuses += 1
+                    return "reuse", found
+
+            self.misses += 1
+            return None
+
+    def _reuse(self, query:tuple, start_min:int, start_time:str, stay_time:int, time_limit:str) -> dict|None:
+        """
+        The best cached route of a nearby start time that is feasible from start_min, None if there is none.
+        """
+        keys = [
+            query + (minute,)
+            for minute in range(start_min - self.tolerance_min, start_min + self.tolerance_min + 1)
+            if query + (minute,) in self.entries
+        ]
+        if not keys:
+            return None
+
+        routes = [[stop["market"] for stop in self.entries[key]["route"]] for key in keys]
+        sequences = np.full((len(routes), max(len(r) for r in routes)), -1, dtype=np.int64)
+        for i, route in enumerate(routes):
+            sequences[i, :len(route)] = self.maps.encode(route)
+
+        evaluator = Tour_Evaluator(self.maps, stay_time, time_limit)
+        arrival, first_infeasible, fitness = evaluator.evaluate(sequences, start_min)
+        feasible = first_infeasible == np.array([len(r) for r in routes])
+        if not feasible.any():
+            return None
+
+        best = int(np.where(feasible, fitness, -np.inf).argmax())
+        self.entries.move_to_end(keys[best])
+        route = routes[best]
+        return {
+            **copy.deepcopy(self.entries[keys[best]]),
+            "start_time": start_time,
+            "route": [
+                {"market": market, "arrival": f"{minute // 60:02d}:{minute % 60:02d}"}
+                for market, minute in zip(route, arrival[best, :len(route)].tolist())
+            ],
+            "visited": len(route),
+            "fitness": float(fitness[best]),
+        }
+
+    def put(self, start_market:str, start_time:str, stay_time:int, time_limit:str, max_days:int, engine:str,
+            result:dict):
+        """
+        Stores the route result of a planned query (a dict with at least "route": [{"market", "arrival"}, ...]).
+        """
+        key = (start_market, stay_time, to_minutes(time_limit), max_days, engine, to_minutes(start_time))
+        with self._lock:
+            self._check_state()
+            self.entries[key] = copy.deepcopy(result)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns the hit-rate statistics (hits, reuses, misses, hit_rate, size, evictions, invalidations).
+        hit_rate counts hits and reuses.
+        """
+        with self._lock:
+            lookups = self.hits + self.reuses + self.misses
+            return {
+                "hits": self.hits,
+                "reuses": self.reuses,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.reuses) / lookups if lookups else 0.0,
+                "size": len(self.entries),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,343 @@
+import time
+import numpy as np
+from abc import ABC, abstractmethod
+from .google_maps import GoogleMaps
+from .ant_optimizer import Ant_Optimizer
+
+class Route_Result:
+    def __init__(self, engine:str, markets:list[str], arrival_min:list[int], fitness:float, days:int = 1, seconds:float = 0.0):
+        """
+        The route found by a Route_Solver.
+
+        Args:
+            engine (str): The name of the engine that found the route.
+            markets (list[str]): The visited markets in order (the start market first).
+            arrival_min (list[int]): The arrival minute at every market (same order).
+            fitness (float): The fitness of the route (see Ant_Colony.fitness).
+            days (int, optional): The number of days the route uses. Defaults to 1.
+            seconds (float, optional): The time the solver needed. Defaults to 0.0.
+        """
+        self.engine = engine
+        self.markets = markets
+        self.arrival_min = arrival_min
+        self.fitness = fitness
+        self.days = days
+        self.seconds = seconds
+
+    @property
+    def path(self) -> list[tuple[str, str]]:
+        """
+        The route as (market, "HH:MM") tuples, like Ant.path.
+        """
+        return [(m, f"{t // 60:02d}:{t % 60:02d}") for m, t in zip(self.markets, self.arrival_min)]
+
+    @property
+    def edges(self) -> list[tuple[str, str]]:
+        """
+        The route as edges [(m0, m1), (m1, m2), ...], like the paths of Ant_Colony.move_ants.
+        """
+        return list(zip(self.markets[:-1], self.markets[1:]))
+
+
+class Route_Solver(ABC):
+    name = "base"
+
+    def __init__(
+        self,
+        maps_service_objekt:GoogleMaps,
+        start_market:str,
+        start_time:str,
+        stay_time:int = 30,
+        time_limit:str = "23:00" # cause latest market closes there
+    ):
+        """
+        Common interface of the route engines: build it for one query and call solve().
+        Abstract, engines implement solve.
+
+        Args:
+            maps_service_objekt (GoogleMaps): The graph.
+            start_market (str): The starting market.
+            start_time (str): The starting time ("HH:MM").
+            stay_time (int, optional): The time spent at each market. Defaults to 30.
+            time_limit (str, optional): The latest departure from a market ("HH:MM"). Defaults to "23:00".
+        """
+        if start_market not in maps_service_objekt.market_index:
+            raise ValueError(f"Unknown market: {start_market}")
+        self.maps = maps_service_objekt
+        self.start_market = start_market
+        self.start_time = start_time
+        self.stay_time = stay_time
+        self.time_limit = time_limit
+
+        h, m = map(int, start_time.split(":"))
+        self.start_min = h*60 + m
+        h, m = map(int, time_limit.split(":"))
+        self.time_limit_min = h*60 + m
+
+    @abstractmethod
+    def solve(self) -> Route_Result:
+        """
+        Finds a route. Implemented by the engines.
+        """
+
+    def fitness(self, visited:int, last_arrival:int) -> float:
+        """
+        The fitness of a single-day route, equal to Ant_Colony.fitness of an ant that walked it
+        (the ant stops after staying at its last market).
+        """
+        return visited * 100 - (last_arrival + self.stay_time) / 60
+
+    def candidates(self, market_id:int, arrival:int, visited:set[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The feasible moves after staying at a market, with the same rules as Ant.evaluate_possibilities.
+
+        Args:
+            market_id (int): The current market.
+            arrival (int): The arrival minute at the current market.
+            visited (set[int]): The markets visited so far.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The destination ids, the travel times and the slack
+                (minutes the departure could still be delayed before the destination gets infeasible).
+        """
+        departure = arrival + self.stay_time
+        if departure > self.time_limit_min:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+
+        edges = self.maps.feasible_edges(self.maps.markets[market_id], departure, self.stay_time)
+        destinations = self.maps.edge_destination[edges]
+        keep = np.fromiter((d not in visited for d in destinations), dtype=bool, count=len(destinations))
+        edges = edges[keep]
+
+        _, latest = self.maps.departure_windows(self.stay_time, departure)
+        return self.maps.edge_destination[edges], self.maps.durations_at(departure)[edges], latest[edges] - departure
+
+
+class Greedy_Solver(Route_Solver):
+    name = "greedy"
+
+    def __init__(self, *args, slack_weight:float = 0.5, **kwargs):
+        """
+        Deterministic constructive engine: always moves to the reachable market with the lowest
+        travel time + slack_weight * slack, so markets that are about to become unreachable come first.
+
+        Args:
+            slack_weight (float, optional): The weight of the time-window slack. Defaults to 0.5.
+            See Route_Solver for the other arguments.
+        """
+        super().__init__(*args, **kwargs)
+        self.slack_weight = slack_weight
+
+    def solve(self) -> Route_Result:
+        started = time.perf_counter()
+        current = self.maps.market_index[self.start_market]
+        route = [current]
+        arrivals = [self.start_min]
+        visited = {current}
+
+        while True:
+            destinations, durations, slack = self.candidates(current, arrivals[-1], visited)
+            if len(destinations) == 0:
+                break
+            best = int(np.argmin(durations + self.slack_weight * slack))
+            current = int(destinations[best])
+            route.append(current)
+            arrivals.append(arrivals[-1] + self.stay_time + int(durations[best]))
+            visited.add(current)
+
+        return Route_Result(
+            engine=self.name,
+            markets=self.maps.decode(route),
+            arrival_min=arrivals,
+            fitness=self.fitness(len(route), arrivals[-1]),
+            seconds=time.perf_counter() - started
+        )
+
+
+class Beam_Search_Solver(Route_Solver):
+    name = "beam"
+
+    def __init__(self, *args, beam_width:int = 16, slack_weight:float = 0.1, **kwargs):
+        """
+        Deterministic beam search: extends the beam_width best partial routes by every feasible move per step.
+
+        All partial routes of a step have the same length and are ranked by the greedy score
+        (travel time + slack_weight * slack) accumulated over their moves. Of several partial routes
+        with the same visited set and position only the earliest is kept.
+
+        Args:
+            beam_width (int, optional): The number of partial routes kept per step. Defaults to 16.
+            slack_weight (float, optional): The weight of the time-window slack. Defaults to 0.1.
+            See Route_Solver for the other arguments.
+        """
+        super().__init__(*args, **kwargs)
+        self.beam_width = beam_width
+        self.slack_weight = slack_weight
+
+    def solve(self) -> Route_Result:
+        started = time.perf_counter()
+        start = self.maps.market_index[self.start_market]
+        # partial route: (cost, route, arrivals, visited)
+        beam = [(0.0, [start], [self.start_min], frozenset([start]))]
+        best_route, best_arrivals = [start], [self.start_min]
+        best_fitness = self.fitness(1, self.start_min)
+
+        while beam:
+            extended = {}
+            for cost, route, arrivals, visited in beam:
+                destinations, durations, slack = self.candidates(route[-1], arrivals[-1], visited) # type: ignore
+                scores = durations + self.slack_weight * slack
+                for d, duration, score in zip(destinations.tolist(), durations.tolist(), scores.tolist()):
+                    arrival = arrivals[-1] + self.stay_time + duration
+                    key = (visited | {d}, d)
+                    known = extended.get(key)
+                    if known is None or arrival < known[2][-1]:
+                        extended[key] = (cost + score, route + [d], arrivals + [arrival], key[0])
+
+            beam = sorted(extended.values(), key=lambda r: (r[0], r[2][-1]))[:self.beam_width]
+            for _, route, arrivals, _ in beam:
+                fitness = self.fitness(len(route), arrivals[-1])
+                if fitness > best_fitness:
+                    best_route, best_arrivals, best_fitness = route, arrivals, fitness
+
+        return Route_Result(
+            engine=self.name,
+            markets=self.maps.decode(best_route),
+            arrival_min=best_arrivals,
+            fitness=best_fitness,
+            seconds=time.perf_counter() - started
+        )
+
+
+class ACO_Solver(Route_Solver):
+    name = "aco"
+
+    def __init__(
+        self,
+        *args,
+        ants_per_colony:int = 20,
+        generations:int = 20,
+        mutation:int = 3,
+        max_days:int = 1,
+        initial_DNA:list[str]|None = None,
+        seed_engine:str|None = None,
+        budget_ms:float|None = None,
+        **kwargs
+    ):
+        """
+        The Ant_Optimizer behind the solver interface, with a single colony at the start market.
+
+        The pheromones of the graph are used as they are (warm or reset by the caller) and updated by the run.
+
+        Args:
+            ants_per_colony (int, optional): The number of ants. Defaults to 20.
+            generations (int, optional): The number of generations. Defaults to 20.
+            mutation (int, optional): The mutation type of the ants. Defaults to 3.
+            max_days (int, optional): The maximum number of days. Defaults to 1.
+            initial_DNA (list[str] | None, optional): The initial DNA of the ants. Defaults to None.
+            seed_engine (str | None, optional): Runs this engine ("greedy" or "beam") first and uses its route as
+                initial DNA. The DNA only biases the mutation types 2 and 4. Defaults to None.
+            budget_ms (float | None, optional): Run until this wall-clock budget is used up instead of a fixed
+                number of generations, with the ants scaled so that about generations generations fit
+                (see Ant_Optimizer.run_anytime). Defaults to None.
+            See Route_Solver for the other arguments.
+        """
+        super().__init__(*args, **kwargs)
+        self.ants_per_colony = ants_per_colony
+        self.generations = generations
+        self.mutation = mutation
+        self.max_days = max_days
+        self.initial_DNA = initial_DNA
+        self.seed_engine = seed_engine
+        self.budget_ms = budget_ms
+
+    def solve(self) -> Route_Result:
+        started = time.perf_counter()
+        initial_DNA = self.initial_DNA
+        if self.seed_engine is not None:
+            seed = make_solver(self.seed_engine, self.maps, self.start_market, self.start_time,
+                               self.stay_time, self.time_limit).solve()
+            initial_DNA = seed.markets
+
+        optimizer = Ant_Optimizer(
+            maps_service_objekt = self.maps,
+            num_colonies        = 1,
+            ants_per_colony     = self.ants_per_colony,
+            stay_time           = self.stay_time,
+            time_limit          = self.time_limit,
+            initial_DNA         = initial_DNA,
+            mutation            = self.mutation,
+            verbose             = 0,
+            ants_multiple_days  = self.max_days > 1,
+            max_days            = self.max_days
+        )
+        optimizer.initialize_colonies([self.start_market], [self.start_time])
+
+        if self.budget_ms is not None:
+            remaining_ms = self.budget_ms - (time.perf_counter() - started) * 1000
+            result = optimizer.run_anytime(remaining_ms, target_generations=self.generations)
+            return Route_Result(
+                engine=self.name,
+                markets=result["markets"],
+                arrival_min=result["arrival_min"],
+                fitness=result["fitness"],
+                days=result["days"],
+                seconds=time.perf_counter() - started
+            )
+
+        best_ant, best_fitness = None, float("-inf")
+        for gen in range(self.generations):
+            optimizer.run_one_generation()
+            colony = optimizer.colonies[0]
+            index = int(colony.fitness_values.argmax())
+            if colony.fitness_values[index] > best_fitness:
+                best_fitness = float(colony.fitness_values[index])
+                best_ant = colony.get_ant(index)
+            if gen != self.generations - 1:
+                optimizer.advance_to_next_generation()
+
+        return Route_Result(
+            engine=self.name,
+            markets=list(best_ant.visited), # type: ignore
+            arrival_min=list(best_ant.arrival_min), # type: ignore
+            fitness=best_fitness,
+            days=best_ant.days, # type: ignore
+            seconds=time.perf_counter() - started
+        )
+
+
+SOLVERS = {
+    Greedy_Solver.name: Greedy_Solver,
+    Beam_Search_Solver.name: Beam_Search_Solver,
+    ACO_Solver.name: ACO_Solver,
+}
+
+
+def make_solver(
+    engine:str,
+    maps_service_objekt:GoogleMaps,
+    start_market:str,
+    start_time:str,
+    stay_time:int = 30,
+    time_limit:str = "23:00",
+    **options
+) -> Route_Solver:
+    """
+    Builds the solver of an engine by name ("greedy", "beam" or "aco").
+
+    Args:
+        engine (str): The engine.
+        maps_service_objekt (GoogleMaps): The graph.
+        start_market (str): The starting market.
+        start_time (str): The starting time ("HH:MM").
+        stay_time (int, optional): The time spent at each market. Defaults to 30.
+        time_limit (str, optional): The latest departure from a market ("HH:MM"). Defaults to "23:00".
+        **options: Engine specific arguments (e.g. beam_width, generations).
+
+    Returns:
+        Route_Solver: The solver.
+    """
+    if engine not in SOLVERS:
+        raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(SOLVERS)})")
+    return SOLVERS[engine](maps_service_objekt, start_market, start_time, stay_time, time_limit, **options)
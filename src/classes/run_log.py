@@ -0,0 +1,209 @@
+import json
+import queue
+import threading
+import numpy as np
+from pathlib import Path
+from .generation_stats import Generation_Stats
+
+# columns of one generation record (per-colony columns are lists aligned with colony_markets)
+GENERATION_COLUMNS = [
+    "generation", "avg_fitness", "max_fitness", "best_fitness", "best_path",
+    "colony_markets", "colony_avg_visited", "colony_max_visited", "colony_avg_fitness", "colony_max_fitness",
+]
+FORMAT_VERSION = 1
+
+
+class Run_Log_Writer:
+    def __init__(self, path:str|Path, markets:list[str], meta:dict|None = None, batch_size:int = 10,
+                 optimizer=None, log_tours:bool = False):
+        """
+        Observer that streams the Generation_Stats of a run to an append-only log file.
+
+        The file is compact JSONL: the first line is a header (markets, meta data), every further line is one
+        batch of batch_size generations stored column-wise ({"column": [value per generation], ...}).
+        Markets are stored as ids (index into markets). Batches are serialised and written by a background
+        thread, so the optimizer only hands over the records. Call close() at the end of the run.
+
+        Args:
+            path (str | Path): The log file (overwritten).
+            markets (list[str]): All markets, defines the market ids of the log.
+            meta (dict | None, optional): Run parameters stored in the header. Defaults to None.
+            batch_size (int, optional): Generations per written batch. Defaults to 10.
+            optimizer (Ant_Optimizer | None, optional): Needed for log_tours. Defaults to None.
+            log_tours (bool, optional): Also log the tour (market ids) and fitness of every ant. Defaults to False.
+        """
+        if log_tours and optimizer is None:
+            raise ValueError("log_tours needs the optimizer")
+        self.path = Path(path)
+        self.markets = markets
+        self.market_index = {market: i for i, market in enumerate(markets)}
+        self.batch_size = batch_size
+        self.optimizer = optimizer
+        self.log_tours = log_tours
+
+        self.columns = GENERATION_COLUMNS + (["tours", "tour_fitness"] if log_tours else [])
+        self._batch = {name: [] for name in self.columns}
+        self._count = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps({
+            "format_version": FORMAT_VERSION,
+            "markets": markets,
+            "columns": self.columns,
+            "meta": meta or {},
+        }, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_batches, daemon=True)
+        self._thread.start()
+
+    def __call__(self, stats:Generation_Stats):
+        """
+        Observer hook, records one generation.
+        """
+        ids = self.market_index
+        best_path = [ids[stats.best_path[0][0]]] + [ids[d] for _, d in stats.best_path] if stats.best_path else []
+        record = {
+            "generation": stats.generation,
+            "avg_fitness": float(stats.avg_fitness),
+            "max_fitness": float(stats.max_fitness),
+            "best_fitness": float(stats.best_fitness),
+            "best_path": best_path,
+            "colony_markets": [ids[m] for m in stats.colony_markets],
+            "colony_avg_visited": stats.colony_avg_visited.tolist(),
+            "colony_max_visited": stats.colony_max_visited.tolist(),
+            "colony_avg_fitness": stats.colony_avg_fitness.tolist(),
+            "colony_max_fitness": stats.colony_max_fitness.tolist(),
+        }
+        if self.log_tours:
+            colonies = self.optimizer.colonies[:len(stats.colony_markets)] # type: ignore
+            record["tours"] = [
+                colony.tours[i, :colony.visited_counts[i]].tolist()
+                for colony in colonies for i in range(colony.number_of_ants)
+            ]
+            record["tour_fitness"] = np.concatenate([colony.fitness_values for colony in colonies]).tolist()
+
+        for name in self.columns:
+            self._batch[name].append(record[name])
+        self._count += 1
+        if self._count == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Hands the buffered generations to the writer thread.
+        """
+        if self._count == 0:
+            return
+        self._queue.put(self._batch)
+        self._batch = {name: [] for name in self.columns}
+        self._count = 0
+
+    def _write_batches(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+            self._file.write(json.dumps(batch, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    def close(self):
+        """
+        Writes the remaining generations and closes the file.
+        """
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+
+class Run_Log:
+    def __init__(self, path:str|Path):
+        """
+        Lazy reader of a log written by Run_Log_Writer.
+
+        Opening only reads the header and the byte offsets of the batches. Columns are parsed when they are
+        first requested and cached, so plotting one column of a long run does not keep the whole run in memory.
+
+        Args:
+            path (str | Path): The log file.
+
+        Attributes:
+            markets (list[str]): The markets, index = market id.
+            columns (list[str]): The logged columns.
+            meta (dict): The run parameters stored in the header.
+        """
+        self.path = Path(path)
+        self._offsets = []
+        with open(self.path, "rb") as f:
+            header = json.loads(f.readline())
+            if header["format_version"] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported run log version {header['format_version']}")
+            offset = f.tell()
+            for line in f:
+                self._offsets.append(offset)
+                offset += len(line)
+        self.markets = header["markets"]
+        self.columns = header["columns"]
+        self.meta = header["meta"]
+        self.market_index = {market: i for i, market in enumerate(self.markets)}
+        self._cache = {}
+
+    def _batches(self):
+        with open(self.path, "rb") as f:
+            for offset in self._offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def column(self, name:str) -> list:
+        """
+        Returns the values of a column, one per generation.
+        """
+        if name not in self.columns:
+            raise KeyError(f"Unknown column: {name}")
+        if name not in self._cache:
+            values = []
+            for batch in self._batches():
+                values.extend(batch[name])
+            self._cache[name] = values
+        return self._cache[name]
+
+    def __len__(self) -> int:
+        return len(self.column("generation"))
+
+    def series(self, name:str) -> np.ndarray:
+        """
+        Returns a scalar column (e.g. "max_fitness") as an array.
+        """
+        return np.asarray(self.column(name), dtype=np.float64)
+
+    def market_series(self, name:str, market:str) -> np.ndarray:
+        """
+        Returns a per-colony column (e.g. "colony_avg_visited") for the colony starting at market,
+        NaN in generations without such a colony.
+        """
+        market_id = self.market_index[market]
+        values = np.full(len(self), np.nan)
+        for row, (markets, column) in enumerate(zip(self.column("colony_markets"), self.column(name))):
+            if market_id in markets:
+                values[row] = column[markets.index(market_id)]
+        return values
+
+    def best_path(self, row:int) -> list[str]:
+        """
+        Returns the best path of a logged generation as market names.
+        """
+        return [self.markets[i] for i in self.column("best_path")[row]]
+
+    def plot(self, name:str = "max_fitness", label:str|None = None, ax=None):
+        """
+        Plots a scalar column over the generations, e.g. to compare several runs on one axis.
+        """
+        import matplotlib.pyplot as plt
+        ax = ax or plt.gca()
+        ax.plot(np.arange(1, len(self) + 1), self.series(name), marker="o", label=label or self.path.stem)
+        ax.set_xlabel("Generation")
+        ax.set_ylabel(name)
+        return ax
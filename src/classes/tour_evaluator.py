@@ -0,0 +1,124 @@
+import numpy as np
+from datetime import time
+from .google_maps import GoogleMaps
+
+class Tour_Evaluator:
+    def __init__(self, maps_service_objekt:GoogleMaps, stay_time:int = 30, time_limit:str = "23:00"):
+        """
+        Checks and scores many single-day tours at once, with the same rules as the ants.
+
+        Moving from a market at minute d (arrival + stay_time) to the next one is feasible iff d is not after the
+        time limit, the edge exists, the next market was not visited yet and d lies in the departure window of
+        the edge (GoogleMaps.departure_windows, with time-dependent travel times if the graph has duration buckets). The fitness of the feasible prefix equals Ant_Colony.fitness of
+        an ant that walked it.
+
+        Args:
+            maps_service_objekt (GoogleMaps): The graph.
+            stay_time (int, optional): The time spent at each market. Defaults to 30.
+            time_limit (str, optional): The latest departure from a market ("HH:MM"). Defaults to "23:00".
+        """
+        self.maps = maps_service_objekt
+        self.stay_time = stay_time
+        self.time_limit = time_limit
+        self.time_limit_min = to_minutes(time_limit)
+
+    def evaluate(self, sequences:np.ndarray, start_min:int|np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluates a batch of encoded tours, one position at a time for all tours together.
+
+        Args:
+            sequences (np.ndarray): tours × positions market ids, padded with -1 (the first market is the start).
+            start_min (int | np.ndarray): The start minute of all tours or of every tour.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The arrival minute per position (-1 after the feasible
+                prefix), the first infeasible position (= tour length if the whole tour is feasible, i.e. the
+                number of feasible markets) and the fitness of the feasible prefix (0 for empty tours).
+        """
+        sequences = np.asarray(sequences)
+        num, width = sequences.shape
+        rows = np.arange(num)
+
+        padding = sequences < 0
+        lengths = np.where(padding.any(axis=1), padding.argmax(axis=1), width)
+
+        arrival = np.full((num, width), -1, dtype=np.int64)
+        arrival[:, 0] = start_min
+        first_infeasible = lengths.copy()
+        alive = lengths > 0
+
+        seen = np.zeros((num, len(self.maps.markets)), dtype=bool)
+        seen[rows[alive], sequences[alive, 0]] = True
+
+        opens, closes = self.maps.edge_opens, self.maps.edge_closes
+        for p in range(1, width):
+            active = alive & (p < lengths)
+            if not active.any():
+                break
+            previous = sequences[:, p - 1].clip(0)
+            current = sequences[:, p].clip(0)
+            departure = arrival[:, p - 1] + self.stay_time
+
+            edge = self.maps.edge_id[previous, current]
+            safe_edge = edge.clip(0)
+            # same as the departure windows, with the travel time of every tour's departure bucket
+            reach = departure + self.maps.travel_times(safe_edge, departure)
+            ok = (active & (edge >= 0) & (departure <= self.time_limit_min) & ~seen[rows, current]
+                  & (opens[safe_edge] <= reach) & (reach + self.stay_time <= closes[safe_edge]))
+
+            failed = active & ~ok
+            first_infeasible[failed] = p
+            alive &= ~failed
+
+            arrival[ok, p] = reach[ok]
+            seen[rows[ok], current[ok]] = True
+
+        last_arrival = arrival[rows, (first_infeasible - 1).clip(0)]
+        fitness = np.where(
+            first_infeasible > 0,
+            first_infeasible * 100 - (last_arrival + self.stay_time) / 60,
+            0.0
+        )
+        return arrival, first_infeasible, fitness
+
+    def score_routes(self, routes:list[list[str]], start_time:str|time|list) -> list[dict]:
+        """
+        Scores externally proposed routes given as market names.
+
+        Args:
+            routes (list[list[str]]): The routes (start market first).
+            start_time (str | time | list): The start time of all routes or one per route.
+
+        Returns:
+            list[dict]: Per route: feasible (bool), feasible_length, fitness and arrival times ("HH:MM") of the feasible prefix.
+        """
+        width = max((len(r) for r in routes), default=0)
+        sequences = np.full((len(routes), max(width, 1)), -1, dtype=np.int64)
+        for i, route in enumerate(routes):
+            sequences[i, :len(route)] = self.maps.encode(route)
+
+        if isinstance(start_time, list):
+            start_min = np.array([to_minutes(t) for t in start_time])
+        else:
+            start_min = to_minutes(start_time)
+
+        arrival, first_infeasible, fitness = self.evaluate(sequences, start_min)
+        return [
+            {
+                "feasible": bool(first_infeasible[i] == len(route)),
+                "feasible_length": int(first_infeasible[i]),
+                "fitness": float(fitness[i]),
+                "arrivals": [f"{m // 60:02d}:{m % 60:02d}" for m in arrival[i, :first_infeasible[i]].tolist()],
+            }
+            for i, route in enumerate(routes)
+        ]
+
+
+def to_minutes(t:str|time) -> int:
+    """
+    Converts "HH:MM" or a datetime.time to minutes after midnight.
+    """
+    if isinstance(t, time):
+        return t.hour * 60 + t.minute
+    h, m = map(int, t.split(":"))
+    return h*60 + m
@@ -5,6 +5,11 @@ from src.classes.google_maps import GoogleMaps
 from src.classes.ant import Ant
 from src.classes.ant_colony import Ant_Colony
 from src.classes.ant_optimizer import Ant_Optimizer
+from src.classes.generation_stats import Generation_History
+from src.classes.pheromone_library import Pheromone_Library
+from src.classes.memory_profiler import Memory_Profiler
+from src.classes.route_solver import make_solver
+from src.classes.run_log import Run_Log_Writer
 import os
 import pandas as pd
 import networkx as nx
@@ -30,7 +35,18 @@ def test_1(mutation: int,
            set_multiple_days: bool = False,
            time_to_set_mult_days: int | None = None,
            multiple_days_limit: int = 2,
-           time_to_switch_pheromones: int | None = None) -> None:
+           time_to_switch_pheromones: int | None = None,
+           pheromone_library: Pheromone_Library | None = None,
+           use_closure: bool = False,
+           memory_profile_generations: list[int] | None = None,
+           memory_profile_every: int | None = None,
+           adaptive_budget: bool = False,
+           total_ants: int | None = None,
+           option_cache_size: int = 0,
+           run_log: str | None = None,
+           log_tours: bool = False,
+           pheromone_history: int = 0,
+           day_planning: bool = False) -> None:
     
     """
     Runs a simulation of the Ant Colony Optimization algorithm on the given parameters.
@@ -49,6 +65,18 @@ def test_1(mutation: int,
     set_multiple_days (bool, optional): Whether the ants can visit markets multiple times in a single day. Defaults to False.
     time_to_set_mult_days (int | None, optional): The generation in which ants are allowed to visit markets over multiple days. Defaults to None.
     time_to_switch_pheromones (int | None, optional): The generation in which the algorithm switches to pheromone-based behavior (for plotting markers only). Defaults to None.
+    pheromone_library (Pheromone_Library | None, optional): Warm-start the pheromones from this library and store the learned ones after the run. Defaults to None.
+    use_closure (bool, optional): Let ants route through intermediate markets via shortest-path virtual edges. Defaults to False.
+    memory_profile_generations (list[int] | None, optional): Generations at which to take tracemalloc snapshots; enables memory profiling. Defaults to None.
+    memory_profile_every (int | None, optional): Take a snapshot every n-th generation; enables memory profiling. Defaults to None.
+    adaptive_budget (bool, optional): Re-allocate the ants across start markets every generation instead of culling (time_to_cull is ignored). Defaults to False.
+    total_ants (int | None, optional): Ants per generation over all start markets with adaptive_budget. Defaults to one colony's worth per market.
+    option_cache_size (int, optional): Size of the per-colony cache of option lists, 0 disables it. Defaults to 0.
+    run_log (str | None, optional): Stream every generation to this log file (read it with Run_Log). Defaults to None.
+    log_tours (bool, optional): Also log every ant's tour to the run log. Defaults to False.
+    pheromone_history (int, optional): Record the pheromones after every generation, keeping this many arrays
+        (see Pheromone_Recorder), and plot the convergence metrics. 0 disables it. Defaults to 0.
+    day_planning (bool, optional): Choose the start of every further day with a learned Day_Planner instead of at random. Defaults to False.
 
     Returns:
     None
@@ -59,14 +87,13 @@ def test_1(mutation: int,
     # 1) Load Google Maps
     # ------------------------------------------------------------------
     maps = GoogleMaps()
+    if use_closure:
+        maps.enable_closure()
 
     # All markets and opening times
     all_markets, opening_times  = maps.get_all_markets()
-    # Establish history logging
-    gen_avg_fitness = []
-    gen_max_fitness = []
-    avg_visited_history = {market: [] for market in all_markets}
-    max_visited_history = {market: [] for market in all_markets}
+    # Establish history logging (filled by the optimizer after every generation)
+    history = Generation_History(all_markets, generations)
 
     # Prepare directory for plots
     base_dir = os.path.dirname(__file__)
@@ -76,6 +103,7 @@ def test_1(mutation: int,
     # Track best overall path across generations
     best_overall_path = None
     best_overall_fitness = float("-inf")
+    best_overall_days = [] # markets per day of the best tour
 
     # ------------------------------------------------------------------
     # 2) Initialize Optimizer therefore Colonies
@@ -88,13 +116,43 @@ def test_1(mutation: int,
         time_limit          = time_limit,
         mutation            = mutation,
         ants_multiple_days  = set_multiple_days,
-        verbose             = verbose_ants
+        verbose             = verbose_ants,
+        pheromone_library   = pheromone_library,
+        adaptive_budget     = adaptive_budget,
+        total_ants          = total_ants,
+        option_cache_size   = option_cache_size,
+        day_planning        = day_planning
     )
+    if optimizer.warm_start_key is not None:
+        print("Warm start from pheromones of", optimizer.warm_start_key)
     optimizer.initialize_colonies(all_markets, opening_times)
+    optimizer.add_observer(history)
+
+    # Optional streaming run log
+    log_writer = None
+    if run_log is not None:
+        log_writer = Run_Log_Writer(
+            run_log, all_markets, optimizer=optimizer, log_tours=log_tours,
+            meta={"mutation": mutation, "generations": generations, "ants_per_colony": ants_per_colony,
+                  "stay_time": stay_time, "time_limit": time_limit, "seed": seed}
+        )
+        optimizer.add_observer(log_writer)
+
+    # Optional pheromone history (convergence plot is written next to the plots)
+    recorder = maps.record_pheromones(capacity=pheromone_history) if pheromone_history > 0 else None
+
+    # Optional memory profiling (report is written next to the plots)
+    profiler = None
+    if memory_profile_generations is not None or memory_profile_every is not None:
+        profiler = Memory_Profiler(memory_profile_generations, memory_profile_every)
+        optimizer.add_observer(profiler)
+        profiler.start()
 
     # ------------------------------------------------------------------
     # Determine generations at which special events occur (for plotting)
     # ------------------------------------------------------------------
+    if adaptive_budget:
+        time_to_cull = None  # the scheduler shifts ants instead of dropping colonies
     cull_generation = time_to_cull if time_to_cull is not None else None
 
     # When multiple days are enabled:
@@ -122,52 +180,32 @@ def test_1(mutation: int,
                 set_multiple_days = True
 
 
-        paths = optimizer.run_one_generation()  # gives paths for each colony
+        optimizer.run_one_generation()  # notifies the history observer
         print(f"Generation {gen} finished.")
 
         # ------------------------------------------------------------------
         # 4) Evaluate Results, either print or cull
         # ------------------------------------------------------------------
-        # fitness across all ants / colonies
-        fitness_values = [fitness for (_, fitness) in paths]
-        avg_f = sum(fitness_values) / len(fitness_values)
-        max_f = max(fitness_values)
-
-        gen_avg_fitness.append(avg_f)
-        gen_max_fitness.append(max_f)
-
-        # per-colony visited stats
-        results = []
-        for colony in optimizer.colonies:
-            visited_counts = [len(ant.visited) for ant in colony.ants]
-            avg_visited = sum(visited_counts) / len(visited_counts)
-            max_visited = max(visited_counts)
-            results.append((colony.start_market, avg_visited))
-
-            # log per-start-market stats
-            avg_visited_history[colony.start_market].append(avg_visited)
-            max_visited_history[colony.start_market].append(max_visited)
+        # fitness and per-colony visited stats are aggregated by the optimizer
+        stats = optimizer.last_stats
 
-        # Sort descending (best → worst)
-        results.sort(key=lambda x: x[1], reverse=True)
-
-        # Determine how many markets to return
-        cutoff_count = max(1, int(len(results) * cut_off))
-        top_markets = results[:cutoff_count]
+        # Colonies ranked best → worst by avg visited markets
+        top_markets = stats.top_markets(cut_off)
+        cutoff_count = len(top_markets)
 
         if gen == time_to_cull and time_to_cull is not None:
             cull_colonies(optimizer, top_markets) 
             print("Colonies culled")
 
-        # Find best path of this generation (by fitness)
-        best_path, best_fitness = max(paths, key=lambda x: x[1])
+        # Best path of this generation (by fitness)
+        best_path, best_fitness = stats.best_path, stats.best_fitness
 
         if gen == generations or verbose == 2:
             print(best_path)
             print("Best fitness:", best_fitness)
             
             print("\n=== Colony Ranking by Avg Visited Markets ===")
-            print(f"Top {cut_off * 100:.0f}% ({cutoff_count} von {len(results)} Startlocations)\n")
+            print(f"Top {cut_off * 100:.0f}% ({cutoff_count} von {len(stats.colony_markets)} Startlocations)\n")
 
             for market, avg_score in top_markets:
                 print(f"- {market:25s}  Ø visited: {avg_score:.2f}")
@@ -177,6 +215,8 @@ def test_1(mutation: int,
         if best_fitness > best_overall_fitness:
             best_overall_fitness = best_fitness
             best_overall_path = best_path
+            best_colony = max(optimizer.colonies, key=lambda c: c.fitness_values.max())
+            best_overall_days = best_colony.get_ant(int(best_colony.fitness_values.argmax())).markets_per_day()
 
             # best_overall_path is already a list of (origin, destination)
             edges = [(edge[0], edge[1]) for edge in best_overall_path]
@@ -206,14 +246,45 @@ def test_1(mutation: int,
         if gen != generations:
             optimizer.advance_to_next_generation()
 
+    if pheromone_library is not None:
+        optimizer.store_pheromones()
+
+    print(f"Ant tours: {optimizer.ant_tours} | best fitness: {best_overall_fitness}")
+    if len(best_overall_days) > 1:
+        print("Markets per day of the best tour:", best_overall_days)
+    if log_writer is not None:
+        log_writer.close()
+    if option_cache_size > 0:
+        print("Option cache:", optimizer.option_cache_stats())
+    if optimizer.scheduler is not None:
+        print("Final ants per start market:", {c.start_market: c.number_of_ants for c in optimizer.colonies})
+
+    if recorder is not None:
+        maps.stop_recording_pheromones()
+        print(f"Pheromones: entropy {recorder.metric('entropy')[-1]:.3f} | "
+              f"top-{recorder.top_k} share {recorder.metric('top_k_share')[-1]:.3f}")
+        recorder.plot()
+        plt.tight_layout()
+        plt.savefig(os.path.join(data_dir, f"pheromone_history_mut{mutation}_gen{generations}.png"), dpi=150)
+        plt.close()
+
+    if profiler is not None:
+        profiler.stop()
+        report_path = os.path.join(
+            data_dir,
+            f"memory_report_mut{mutation}_gen{generations}.txt"
+        )
+        profiler.write_report(report_path)
+        print(profiler.report())
+
     # ------------------------------------------------------------------
     # 5) Plot fitness development over generations
     # ------------------------------------------------------------------
     generations_range = range(1, generations + 1)
 
     plt.figure()
-    plt.plot(generations_range, gen_avg_fitness, marker='o', label='Average fitness')
-    plt.plot(generations_range, gen_max_fitness, marker='o', label='Max fitness')
+    plt.plot(generations_range, history.avg_fitness[:history.count], marker='o', label='Average fitness')
+    plt.plot(generations_range, history.max_fitness[:history.count], marker='o', label='Max fitness')
 
     # Mark special generations (if any)
     if cull_generation is not None and 1 <= cull_generation <= generations:
@@ -241,10 +312,10 @@ def test_1(mutation: int,
     top_market_names = [m for m, _ in top_markets] #type: ignore
 
     plt.figure()
-    for market, series in avg_visited_history.items():
-        if market in top_market_names and series:
-            gens = range(1, len(series) + 1)
-            plt.plot(gens, series, marker='o', label=market)
+    for market in top_market_names:
+        series = history.market_series(history.avg_visited, market)
+        gens = range(1, len(series) + 1)
+        plt.plot(gens, series, marker='o', label=market)
 
     # Mark special generations (if any)
     if cull_generation is not None and 1 <= cull_generation <= generations:
@@ -270,10 +341,10 @@ def test_1(mutation: int,
     # 7) Plot max visited per starting market over generations
     # ------------------------------------------------------------------
     plt.figure()
-    for market, series in max_visited_history.items():
-        if market in top_market_names and series:
-            gens = range(1, len(series) + 1)
-            plt.plot(gens, series, marker='o', label=market)
+    for market in top_market_names:
+        series = history.market_series(history.max_visited, market)
+        gens = range(1, len(series) + 1)
+        plt.plot(gens, series, marker='o', label=market)
 
     # Mark special generations (if any)
     if cull_generation is not None and 1 <= cull_generation <= generations:
@@ -400,5 +471,43 @@ def test_pure_pheromones_long():
         stay_time=30,
     )
 
+def test_engines(engines: tuple[str, ...] = ("greedy", "beam", "aco"),
+                 stay_time: int = 30,
+                 time_limit: str = "23:00",
+                 seed: int = 42,
+                 engine_options: dict[str, dict] | None = None) -> dict[str, tuple[float, float]]:
+    """
+    Plans a route from every market (starting at its opening time) with each engine and compares them.
+
+    Parameters:
+    engines (tuple[str, ...], optional): The engines to compare ("greedy", "beam", "aco"). Defaults to all.
+    stay_time (int, optional): The time spent at each market. Defaults to 30.
+    time_limit (str, optional): The overall time limit. Defaults to "23:00".
+    seed (int, optional): The random seed to use. Defaults to 42.
+    engine_options (dict[str, dict] | None, optional): Extra arguments per engine, e.g.
+        {"aco": {"seed_engine": "beam", "mutation": 4}} to seed the ACO DNA with the beam route. Defaults to None.
+
+    Returns:
+    dict: engine → (mean fitness, mean milliseconds per route)
+    """
+    random.seed(seed)
+    maps = GoogleMaps()
+    all_markets, opening_times = maps.get_all_markets()
+    engine_options = engine_options or {}
+
+    results = {}
+    for engine in engines:
+        fitness, seconds = [], []
+        for market, opens in zip(all_markets, opening_times):
+            maps.set_pheromones()  # every ACO route starts from scratch
+            solver = make_solver(engine, maps, market, opens.strftime("%H:%M"), stay_time, time_limit,
+                                 **engine_options.get(engine, {}))
+            result = solver.solve()
+            fitness.append(result.fitness)
+            seconds.append(result.seconds)
+        results[engine] = (sum(fitness) / len(fitness), sum(seconds) * 1000 / len(seconds))
+        print(f"{engine:8s} mean fitness {results[engine][0]:7.1f} | {results[engine][1]:7.1f} ms per route")
+    return results
+
 if __name__ == "__main__":
     test_pure_pheromones_long()
\ No newline at end of file
@@ -0,0 +1,349 @@
+import json
+import random
+import threading
+import time
+import numpy as np
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qs
+from urllib.request import urlopen
+from src.classes.google_maps import GoogleMaps
+from src.classes.ant_optimizer import Ant_Optimizer
+from src.classes.pheromone_library import Pheromone_Library
+from src.classes.route_solver import make_solver
+from src.classes.route_cache import Route_Cache
+
+
+class Route_Planning_Service:
+    def __init__(
+        self,
+        maps_service_objekt:GoogleMaps|None = None,
+        ants_per_colony:int = 20,
+        mutation:int = 3,
+        time_limit:str = "23:00", # cause latest market closes there
+        default_budget_ms:int = 500,
+        max_generations:int = 50,
+        pheromone_library:Pheromone_Library|None = None,
+        result_cache_size:int = 0,
+        cache_tolerance_min:int = 15
+    ):
+        """
+        Answers "best route starting at market X at time T with stay S" queries on a warm graph.
+
+        The graph is loaded once. The pheromones learned by every query are stored per parameter set
+        (stay time, time limit, max days) and restored for the next query with the same parameters,
+        so repeated queries continue learning instead of starting from scratch. After graph updates
+        (add_edge, remove_market, ...) they are carried over to the edges that still exist.
+
+        Args:
+            maps_service_objekt (GoogleMaps | None, optional): The graph to use. Loaded from the csv if None.
+            ants_per_colony (int, optional): The number of ants per generation. Defaults to 20.
+            mutation (int, optional): The mutation type of the ants. Defaults to 3.
+            time_limit (str, optional): The default overall time limit. Defaults to "23:00".
+            default_budget_ms (int, optional): The default optimisation time per query. Defaults to 500.
+            max_generations (int, optional): The maximum number of generations per query. Defaults to 50.
+            pheromone_library (Pheromone_Library | None, optional): Used to warm-start parameter sets the
+                service has not seen yet. Defaults to None.
+            result_cache_size (int, optional): Size of the LRU cache of planned routes (see Route_Cache),
+                0 disables it. Defaults to 0.
+            cache_tolerance_min (int, optional): Start time difference up to which a cached route is reused if it
+                is still feasible. Defaults to 15.
+        """
+        self.maps = maps_service_objekt or GoogleMaps()
+        self.ants_per_colony = ants_per_colony
+        self.mutation = mutation
+        self.time_limit = time_limit
+        self.default_budget_ms = default_budget_ms
+        self.max_generations = max_generations
+        self.pheromone_library = pheromone_library
+
+        # parameter set -> (graph version, pheromones, edge origins, edge destinations) of the last query with these parameters
+        self.pheromones = {}
+        # the graph is shared, so only one optimisation runs at a time
+        self.lock = threading.Lock()
+
+        # planned routes, answered without optimising (see Route_Cache)
+        self.route_cache = Route_Cache(self.maps, result_cache_size, cache_tolerance_min) if result_cache_size > 0 else None
+        self.cache_latencies = {outcome: deque(maxlen=10000) for outcome in ("hit", "reuse", "miss")}
+
+    @property
+    def opening_times(self) -> dict:
+        """
+        The active markets and their opening times, read from the graph on every access,
+        so markets added, removed or rescheduled after the service started are seen.
+        """
+        all_markets, opening_times = self.maps.get_all_markets()
+        return dict(zip(all_markets, opening_times))
+
+    def plan_route(
+        self,
+        start_market:str,
+        start_time:str|None = None,
+        stay_time:int = 30,
+        time_limit:str|None = None,
+        max_days:int = 1,
+        budget_ms:int|None = None,
+        engine:str = "aco"
+    ) -> dict:
+        """
+        Runs a bounded-time optimisation for one start market and returns the best route.
+
+        Generations are run until the time budget is used up (at least one generation, see Ant_Optimizer.run_anytime).
+        The deterministic engines ("greedy", "beam", see route_solver) answer in a few milliseconds
+        and ignore the budget, they only plan single-day routes.
+        With a result cache, repeated and near-identical queries are answered from it (see Route_Cache).
+
+        Args:
+            start_market (str): The starting market.
+            start_time (str | None, optional): The starting time ("HH:MM"). Defaults to the opening time of the market.
+            stay_time (int, optional): The time spent at each market. Defaults to 30.
+            time_limit (str | None, optional): The overall time limit ("HH:MM"). Defaults to the service default.
+            max_days (int, optional): The maximum number of days. Defaults to 1.
+            budget_ms (int | None, optional): The optimisation time budget. Defaults to the service default.
+            engine (str, optional): "aco", "greedy" or "beam". Defaults to "aco".
+
+        Returns:
+            dict: The route (market and arrival time per stop), its fitness, the cache outcome ("hit", "reuse",
+                "miss" or "off") and the timings of the query.
+        """
+        received = time.perf_counter()
+        opening_times = self.opening_times
+        if start_market not in opening_times:
+            raise ValueError(f"Unknown market: {start_market}")
+        start_time = start_time or opening_times[start_market].strftime("%H:%M")
+        time_limit = time_limit or self.time_limit
+        budget_ms = self.default_budget_ms if budget_ms is None else budget_ms
+
+        if self.route_cache is not None:
+            found = self.route_cache.get(start_market, start_time, stay_time, time_limit, max_days, engine)
+            if found is not None:
+                outcome, result = found
+                total_ms = (time.perf_counter() - received) * 1000
+                self.cache_latencies[outcome].append(total_ms)
+                return {**result, "cache": outcome, "timings": {"queue_ms": 0.0, "optimise_ms": 0.0, "total_ms": total_ms}}
+
+        if engine != "aco":
+            result = self._plan_route_constructive(engine, start_market, start_time, stay_time, time_limit, max_days, received)
+        else:
+            result = self._plan_route_aco(start_market, start_time, stay_time, time_limit, max_days, budget_ms, received)
+
+        if self.route_cache is None:
+            result["cache"] = "off"
+            return result
+        self.route_cache.put(start_market, start_time, stay_time, time_limit, max_days, engine,
+                             {k: v for k, v in result.items() if k != "timings"})
+        self.cache_latencies["miss"].append(result["timings"]["total_ms"])
+        result["cache"] = "miss"
+        return result
+
+    def cache_stats(self) -> dict:
+        """
+        Returns the statistics of the result cache (see Route_Cache.stats) and the latency report
+        (see latency_report) of the last 10000 hits, reuses and misses.
+        """
+        if self.route_cache is None:
+            raise ValueError("No result cache configured")
+        return {
+            **self.route_cache.stats(),
+            "latency_ms": {
+                outcome: latency_report(latencies)
+                for outcome, latencies in self.cache_latencies.items() if latencies
+            },
+        }
+
+    def _plan_route_aco(self, start_market, start_time, stay_time, time_limit, max_days, budget_ms, received) -> dict:
+        key = (stay_time, time_limit, max_days)
+
+        with self.lock:
+            started = time.perf_counter()
+            warm = key in self.pheromones
+            self.maps.set_pheromones(self._restore_pheromones(key))
+            if not warm and self.pheromone_library is not None:
+                found = self.pheromone_library.lookup(self.maps, stay_time, time_limit, self.mutation, max_days)
+                if found is not None:
+                    self.maps.set_pheromones(found[0])
+                    warm = True
+
+            optimizer = Ant_Optimizer(
+                maps_service_objekt = self.maps,
+                num_colonies        = 1,
+                ants_per_colony     = self.ants_per_colony,
+                stay_time           = stay_time,
+                time_limit          = time_limit,
+                mutation            = self.mutation,
+                verbose             = 0,
+                ants_multiple_days  = max_days > 1,
+                max_days            = max_days,
+                option_cache_size   = 4096,
+                day_planning        = max_days > 1
+            )
+            optimizer.initialize_colonies([start_market], [start_time])
+
+            result = optimizer.run_anytime(budget_ms, max_generations=self.max_generations)
+
+            self.pheromones[key] = (
+                self.maps.version, self.maps.get_pheromones(), self.maps.edge_origin.copy(), self.maps.edge_destination.copy()
+            )
+            finished = time.perf_counter()
+
+        route = [{"market": market, "arrival": arrival} for market, arrival in result["path"]]
+        return {
+            "start_market": start_market,
+            "start_time": start_time,
+            "stay_time": stay_time,
+            "route": route,
+            "visited": len(route),
+            "days": result["days"],
+            "markets_per_day": result["markets_per_day"],
+            "fitness": result["fitness"],
+            "generations": result["generations"],
+            "warm": warm,
+            "engine": "aco",
+            "timings": {
+                "queue_ms": (started - received) * 1000,
+                "optimise_ms": (finished - started) * 1000,
+                "total_ms": (finished - received) * 1000,
+            },
+        }
+
+    def _restore_pheromones(self, key:tuple) -> np.ndarray|None:
+        """
+        The stored pheromones of a parameter set, remapped onto the current edges if the graph changed since
+        (see GoogleMaps.remap_pheromones). None if there are none.
+        """
+        stored = self.pheromones.get(key)
+        if stored is None:
+            return None
+        version, pheromones, origin, destination = stored
+        if version == self.maps.version:
+            return pheromones
+        return self.maps.remap_pheromones(pheromones, origin, destination)
+
+    def _plan_route_constructive(self, engine, start_market, start_time, stay_time, time_limit, max_days, received) -> dict:
+        if max_days != 1:
+            raise ValueError(f"Engine {engine} only plans single-day routes")
+        solver = make_solver(engine, self.maps, start_market, start_time, stay_time, time_limit)
+
+        with self.lock:
+            started = time.perf_counter()
+            result = solver.solve()
+            finished = time.perf_counter()
+
+        return {
+            "start_market": start_market,
+            "start_time": start_time,
+            "stay_time": stay_time,
+            "route": [{"market": market, "arrival": arrival} for market, arrival in result.path],
+            "visited": len(result.markets),
+            "days": result.days,
+            "markets_per_day": [len(result.markets)],
+            "fitness": result.fitness,
+            "generations": 0,
+            "warm": False,
+            "engine": engine,
+            "timings": {
+                "queue_ms": (started - received) * 1000,
+                "optimise_ms": (finished - started) * 1000,
+                "total_ms": (finished - received) * 1000,
+            },
+        }
+
+
+def make_handler(service:Route_Planning_Service):
+    """
+    Builds the HTTP request handler class for a service.
+
+    Endpoints:
+        GET /markets  → list of markets with opening times
+        GET /route?market=...&start=HH:MM&stay=30&limit=HH:MM&days=1&budget_ms=500&engine=aco  → planned route
+        GET /cache  → result cache statistics (only with a result cache)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == "/markets":
+                    body = {m: t.strftime("%H:%M") for m, t in service.opening_times.items()}
+                elif url.path == "/cache":
+                    body = service.cache_stats()
+                elif url.path == "/route":
+                    body = service.plan_route(
+                        start_market = params["market"],
+                        start_time   = params.get("start"),
+                        stay_time    = int(params.get("stay", 30)),
+                        time_limit   = params.get("limit"),
+                        max_days     = int(params.get("days", 1)),
+                        budget_ms    = int(params["budget_ms"]) if "budget_ms" in params else None,
+                        engine       = params.get("engine", "aco"),
+                    )
+                else:
+                    self._send(404, {"error": f"Unknown path: {url.path}"})
+                    return
+            except (KeyError, ValueError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(200, body)
+
+        def _send(self, status:int, body:dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass # keep stdout clean
+
+    return Handler
+
+
+def make_server(service:Route_Planning_Service, host:str = "127.0.0.1", port:int = 8765) -> ThreadingHTTPServer:
+    """
+    Creates (but does not start) the HTTP server for a service. Use port 0 for a free port.
+    """
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def query_route(base_url:str, market:str, **params) -> dict:
+    """
+    Local client: requests a route from a running service.
+
+    Args:
+        base_url (str): e.g. "http://127.0.0.1:8765".
+        market (str): The starting market.
+        **params: Optional query parameters (start, stay, limit, days, budget_ms, engine).
+
+    Returns:
+        dict: The decoded response.
+    """
+    query = urlencode({"market": market, **params})
+    with urlopen(f"{base_url}/route?{query}") as response:
+        return json.loads(response.read())
+
+
+def latency_report(latencies_ms:list[float]) -> dict[str, float]:
+    """
+    Summarises request latencies (nearest-rank percentiles).
+
+    Returns:
+        dict[str, float]: count, mean, p50, p99 and max in milliseconds.
+    """
+    ordered = sorted(latencies_ms)
+    def percentile(p):
+        return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(50),
+        "p99": percentile(99),
+        "max": ordered[-1],
+    }
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    server = make_server(Route_Planning_Service())
+    print(f"Serving routes on http://{server.server_address[0]}:{server.server_address[1]}")
+    server.serve_forever()
@@ -0,0 +1,39 @@
+import os
+import sys
+import random
+import pytest
+
+# the tests import the package as src.classes..., like the drivers in src/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.classes.google_maps import GoogleMaps
+from src.classes.ant_optimizer import Ant_Optimizer
+
+
+@pytest.fixture(scope="module")
+def maps():
+    return GoogleMaps()
+
+
+@pytest.fixture(scope="module")
+def walk_generation(maps):
+    """
+    Factory that walks one generation with one colony per market and returns the colonies.
+    """
+    def walk(mutation=3, stay_time=30, time_limit="23:00", seed=7):
+        random.seed(seed)
+        maps.set_pheromones()
+        all_markets, opening_times = maps.get_all_markets()
+        optimizer = Ant_Optimizer(
+            maps_service_objekt = maps,
+            num_colonies        = len(all_markets),
+            ants_per_colony     = 5,
+            stay_time           = stay_time,
+            time_limit          = time_limit,
+            mutation            = mutation,
+            verbose             = 0
+        )
+        optimizer.initialize_colonies(all_markets, opening_times)
+        optimizer.run_one_generation()
+        return optimizer.colonies
+    return walk
@@ -0,0 +1,20 @@
+from src.classes.google_maps import GoogleMaps
+from src.classes.option_cache import Option_Cache
+
+
+def test_toggling_candidate_lists_keeps_the_graph_version():
+    maps = GoogleMaps()
+    cache = Option_Cache(maps)
+    cache.put((0, 600, 1), [])
+    version, graph_hash = maps.version, maps.graph_hash()
+
+    maps.enable_candidate_lists(k=2, promoted=1)
+    assert maps.version == version and maps.graph_hash() == graph_hash
+    # the option lists depend on the candidates, so they are dropped anyway
+    assert cache.get((0, 600, 1)) is None
+    assert cache.stats()["invalidations"] == 1
+    assert len(maps.candidate_edges(0)) <= 3
+
+    maps.disable_candidate_lists()
+    assert maps.version == version
+    assert len(maps.candidate_edges(0)) == len(maps.out_edges(0))
@@ -0,0 +1,28 @@
+import numpy as np
+from src.classes.generation_stats import Generation_Stats, Generation_History
+
+
+def stats(colony_markets, avg_visited, max_visited):
+    return Generation_Stats(
+        generation          = 0,
+        colony_markets      = colony_markets,
+        colony_avg_visited  = np.array(avg_visited, dtype=np.float64),
+        colony_max_visited  = np.array(max_visited, dtype=np.float64),
+        colony_avg_fitness  = np.zeros(len(colony_markets)),
+        colony_max_fitness  = np.zeros(len(colony_markets)),
+        avg_fitness         = 0.0,
+        max_fitness         = 0.0,
+        best_path           = [],
+        best_fitness        = 0.0
+    )
+
+
+def test_colonies_sharing_a_start_market_are_aggregated():
+    history = Generation_History(["a", "b", "c"], generations=1)
+    history(stats(["a", "b", "a"], [4.0, 3.0, 6.0], [7, 3, 6]))
+    history(stats(["b"], [2.0], [2]))
+
+    np.testing.assert_array_equal(history.market_series(history.avg_visited, "a"), [5.0, np.nan])
+    np.testing.assert_array_equal(history.market_series(history.max_visited, "a"), [7.0, np.nan])
+    np.testing.assert_array_equal(history.market_series(history.avg_visited, "b"), [3.0, 2.0])
+    assert np.isnan(history.market_series(history.max_visited, "c")).all()
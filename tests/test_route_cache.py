@@ -0,0 +1,130 @@
+import pytest
+from src.classes.google_maps import GoogleMaps
+from src.classes.route_cache import Route_Cache
+from src.classes.tour_evaluator import Tour_Evaluator
+
+
+def hhmm(minute:int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+@pytest.fixture(scope="module")
+def walked_routes(walk_generation):
+    """
+    The best walked tour of every start market, as route results of the service.
+    """
+    routes = []
+    for colony in walk_generation(3, seed=11):
+        ant = colony.get_ant(int(colony.fitness_values.argmax()))
+        routes.append((colony.start_market, colony.start_min, {
+            "route": [{"market": m, "arrival": hhmm(t)} for m, t in zip(ant.visited, ant.arrival_min)],
+            "visited": len(ant.visited),
+            "fitness": colony.fitness(ant),
+        }))
+    return routes
+
+
+def put(cache, market, start_min, result, max_days=1):
+    cache.put(market, hhmm(start_min), 30, "23:00", max_days, "aco", result)
+
+
+def get(cache, market, start_min, max_days=1):
+    return cache.get(market, hhmm(start_min), 30, "23:00", max_days, "aco")
+
+
+def test_hit_returns_the_stored_route(maps, walked_routes):
+    cache = Route_Cache(maps)
+    market, start_min, result = walked_routes[0]
+    put(cache, market, start_min, result)
+    assert get(cache, market, start_min) == ("hit", result)
+    assert cache.stats()["hits"] == 1
+
+
+def test_reuse_only_returns_feasible_routes(maps, walked_routes):
+    evaluator = Tour_Evaluator(maps)
+    reused = missed = 0
+    for market, start_min, result in walked_routes:
+        markets = [stop["market"] for stop in result["route"]]
+        for shift in range(-15, 16, 3):
+            if shift == 0:
+                continue
+            cache = Route_Cache(maps, tolerance_min=15)
+            put(cache, market, start_min, result)
+            found = get(cache, market, start_min + shift)
+            check = evaluator.score_routes([markets], hhmm(start_min + shift))[0]
+            if found is None:
+                # a miss only if the cached route is infeasible from the new start
+                assert not check["feasible"]
+                missed += 1
+                continue
+            outcome, route = found
+            assert outcome == "reuse"
+            assert check["feasible"]
+            assert [stop["arrival"] for stop in route["route"]] == check["arrivals"]
+            assert route["fitness"] == pytest.approx(check["fitness"])
+            assert route["start_time"] == hhmm(start_min + shift)
+            reused += 1
+    assert reused > 0 and missed > 0
+
+
+def test_reuse_picks_the_best_feasible_route(maps, walked_routes):
+    market, start_min, result = walked_routes[0]
+    shorter = {**result, "route": result["route"][:2], "visited": 2}
+    cache = Route_Cache(maps, tolerance_min=15)
+    put(cache, market, start_min - 1, shorter)
+    put(cache, market, start_min, result)
+    outcome, route = get(cache, market, start_min + 1)
+    evaluator = Tour_Evaluator(maps)
+    best = max(
+        (evaluator.score_routes([[s["market"] for s in r["route"]]], hhmm(start_min + 1))[0] for r in (shorter, result)),
+        key=lambda r: r["fitness"] if r["feasible"] else float("-inf"),
+    )
+    assert outcome == "reuse"
+    assert route["fitness"] == pytest.approx(best["fitness"])
+
+
+def test_no_reuse_outside_tolerance_or_for_multiple_days(maps, walked_routes):
+    market, start_min, result = walked_routes[0]
+    cache = Route_Cache(maps, tolerance_min=5)
+    put(cache, market, start_min, result)
+    put(cache, market, start_min, result, max_days=2)
+    assert get(cache, market, start_min + 6) is None
+    assert get(cache, market, start_min + 1, max_days=2) is None
+    assert get(cache, market, start_min, max_days=2)[0] == "hit"
+
+
+def test_graph_update_invalidates(walked_routes):
+    # a private graph, the update must not leak into the shared fixture
+    maps = GoogleMaps()
+    cache = Route_Cache(maps)
+    market, start_min, result = walked_routes[0]
+    put(cache, market, start_min, result)
+    maps.set_opening_hours(market, opens="06:00")
+    assert get(cache, market, start_min) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_lru_eviction(maps, walked_routes):
+    cache = Route_Cache(maps, max_size=2, tolerance_min=0)
+    (a, a_min, a_result), (b, b_min, b_result), (c, c_min, c_result) = walked_routes[:3]
+    put(cache, a, a_min, a_result)
+    put(cache, b, b_min, b_result)
+    get(cache, a, a_min)  # a is now the most recently used
+    put(cache, c, c_min, c_result)
+    assert get(cache, b, b_min) is None
+    assert get(cache, a, a_min)[0] == "hit"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_results_are_copied_in_and_out(maps, walked_routes):
+    cache = Route_Cache(maps, tolerance_min=15)
+    market, start_min, result = walked_routes[0]
+    stored = {**result, "route": [dict(stop) for stop in result["route"]]}
+    put(cache, market, start_min, stored)
+    stored["route"].clear()
+
+    _, hit = get(cache, market, start_min)
+    assert hit == result
+    hit["route"][0]["market"] = "changed"
+    hit["route"].append({"market": "extra", "arrival": "23:00"})
+    assert get(cache, market, start_min) == ("hit", result)
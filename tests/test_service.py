@@ -0,0 +1,38 @@
+import pytest
+from src.classes.google_maps import GoogleMaps
+from src.service import Route_Planning_Service
+
+
+@pytest.fixture
+def service():
+    # every test updates the graph, so each gets a private one
+    return Route_Planning_Service(GoogleMaps(), ants_per_colony=5)
+
+
+def test_removed_market_is_rejected(service):
+    market = next(iter(service.opening_times))
+    service.plan_route(market, engine="greedy")
+    service.maps.remove_market(market)
+    with pytest.raises(ValueError, match="Unknown market"):
+        service.plan_route(market, engine="greedy")
+    assert market not in service.opening_times
+
+
+def test_default_start_follows_opening_hours(service):
+    market = next(iter(service.opening_times))
+    service.maps.set_opening_hours(market, opens="15:00")
+    for engine in ("greedy", "aco"):
+        result = service.plan_route(market, engine=engine, budget_ms=0)
+        assert result["start_time"] == "15:00"
+        assert result["route"][0] == {"market": market, "arrival": "15:00"}
+
+
+def test_added_market_is_planned(service):
+    neighbor = next(iter(service.opening_times))
+    service.maps.add_market("New Market", opens="10:00", closes="18:00")
+    service.maps.add_edge("New Market", neighbor, 5)
+    service.maps.add_edge(neighbor, "New Market", 5)
+    for engine in ("greedy", "aco"):
+        result = service.plan_route("New Market", engine=engine, budget_ms=0)
+        assert result["start_time"] == "10:00"
+        assert result["route"][0]["market"] == "New Market"
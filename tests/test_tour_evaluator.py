@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from src.classes.tour_evaluator import Tour_Evaluator
+
+
+def assert_matches_walked_tours(maps, colonies, stay_time=30, time_limit="23:00"):
+    evaluator = Tour_Evaluator(maps, stay_time, time_limit)
+    for colony in colonies:
+        arrival, first_infeasible, fitness = evaluator.evaluate(colony.tours, colony.start_min)
+        # every walked tour is feasible as a whole, with the arrivals and fitness of the ant
+        np.testing.assert_array_equal(first_infeasible, colony.visited_counts)
+        for i, count in enumerate(colony.visited_counts):
+            np.testing.assert_array_equal(arrival[i, :count], colony.arrival_min[i, :count])
+        np.testing.assert_allclose(fitness, colony.fitness_values)
+
+
+@pytest.mark.parametrize("mutation", [1, 3])
+def test_evaluate_matches_walked_tours(maps, walk_generation, mutation):
+    colonies = walk_generation(mutation)
+    assert_matches_walked_tours(maps, colonies)
+
+
+def test_evaluate_matches_walked_tours_with_stay_time_and_limit(maps, walk_generation):
+    colonies = walk_generation(3, stay_time=45, time_limit="20:00")
+    assert_matches_walked_tours(maps, colonies, stay_time=45, time_limit="20:00")
+
+
+def test_evaluate_cuts_infeasible_suffix(maps, walk_generation):
+    colony = walk_generation(3)[0]
+    i = int(colony.visited_counts.argmax())
+    count = int(colony.visited_counts[i])
+    tour = colony.tours[i:i + 1].copy()
+    # revisiting the start market is never feasible
+    tour[0, count] = tour[0, 0]
+
+    evaluator = Tour_Evaluator(maps)
+    arrival, first_infeasible, fitness = evaluator.evaluate(tour, colony.start_min)
+    assert first_infeasible[0] == count
+    assert (arrival[0, count:] == -1).all()
+    assert fitness[0] == pytest.approx(colony.fitness_values[i])
+
+
+def test_evaluate_matches_walked_tours_with_duration_buckets(maps, walk_generation):
+    # rush hour: travel times grow by half between 16:00 and 19:00
+    static = maps.edge_duration.astype(np.int64)
+    durations = np.stack([static, static + static // 2, static], axis=1)
+    maps.set_duration_buckets(["00:00", "16:00", "19:00"], durations)
+    try:
+        colonies = walk_generation(3)
+        assert_matches_walked_tours(maps, colonies)
+    finally:
+        maps.set_duration_buckets(None)